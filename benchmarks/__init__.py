@@ -0,0 +1,8 @@
+"""Offline benchmark suite for the hot paths of strategy_backtester.
+
+    python -m benchmarks run --size small --out bench.json
+    python -m benchmarks compare baseline.json bench.json --threshold 1.25
+
+Every case runs on seeded synthetic panels (`benchmarks.data`), so no Alpha Vantage key or
+network access is needed and two runs on the same machine see identical inputs.
+"""
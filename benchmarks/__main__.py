@@ -0,0 +1,46 @@
+from __future__ import annotations
+import argparse, sys
+from .cases import CASES, SIZES
+from .data import FREQS
+from . import runner
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m benchmarks", description="strategy_backtester benchmarks")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("run", help="time and memory-profile the benchmark cases")
+    r.add_argument("--size", choices=list(SIZES), default="small")
+    r.add_argument("--freq", choices=list(FREQS), default="D")
+    r.add_argument("--only", nargs="*", help="case names or prefixes (e.g. engine portfolio.hrp_weights)")
+    r.add_argument("--repeat", type=int, default=3)
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--out", default=None, help="write results JSON here")
+    r.add_argument("--baseline", default=None, help="compare against this results JSON after running")
+    r.add_argument("--threshold", type=float, default=1.25, help="max allowed time ratio (with --baseline)")
+    r.add_argument("--mem-threshold", type=float, default=1.25, help="max allowed peak-memory ratio (with --baseline)")
+    c = sub.add_parser("compare", help="flag regressions of CURRENT against BASELINE")
+    c.add_argument("baseline"); c.add_argument("current")
+    c.add_argument("--threshold", type=float, default=1.25, help="max allowed time ratio")
+    c.add_argument("--mem-threshold", type=float, default=1.25, help="max allowed peak-memory ratio")
+    sub.add_parser("list", help="list case names")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "list":
+        print("\n".join(CASES)); return 0
+    if args.cmd == "run":
+        report = runner.run(args.only, args.size, args.repeat, args.freq, args.seed)
+        if args.out: print(f"saved {runner.save(report, args.out)}")
+        if not args.baseline: return 0
+        baseline, current = runner.load(args.baseline), report
+    else:
+        baseline, current = runner.load(args.baseline), runner.load(args.current)
+    threshold, mem_threshold = args.threshold, args.mem_threshold
+    if baseline["meta"]["spec"] != current["meta"]["spec"]:
+        print(f"warning: comparing different specs {baseline['meta']['spec']} vs {current['meta']['spec']}")
+    table = runner.compare(baseline, current, threshold, mem_threshold)
+    print(table.to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    bad = table[table["regression"]] if len(table) else table
+    if len(bad): print(f"{len(bad)} regression(s): {', '.join(bad['case'])}")
+    return 1 if len(bad) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Benchmark cases. Each case takes a size spec and returns a zero-argument callable; data
+generation and other setup happen before the callable is returned and are not timed."""
+from __future__ import annotations
+import tempfile
+from pathlib import Path
+import numpy as np, pandas as pd
+from .data import synthetic_prices, synthetic_volume, synthetic_factor, synthetic_signals
+
+# symbols x trading days per size; `freq` multiplies bars for intraday runs
+SIZES = {
+    "small": {"n_symbols": 20, "n_days": 1260},
+    "medium": {"n_symbols": 200, "n_days": 2520},
+    "large": {"n_symbols": 1000, "n_days": 5040},
+}
+
+CASES: dict[str, callable] = {}
+_SCRATCH: list[tempfile.TemporaryDirectory] = []
+
+def scratch_dir() -> Path:
+    """Temporary directory for a case's setup, removed by `cleanup()` once the case is timed."""
+    d = tempfile.TemporaryDirectory(prefix="sbe-bench-")
+    _SCRATCH.append(d)
+    return Path(d.name)
+
+def cleanup():
+    while _SCRATCH: _SCRATCH.pop().cleanup()
+
+def case(name: str):
+    def deco(fn):
+        CASES[name] = fn
+        return fn
+    return deco
+
+def _prices(spec: dict) -> pd.DataFrame:
+    return synthetic_prices(spec["n_symbols"], spec["n_days"], spec.get("freq", "D"), spec.get("seed", 0))
+
+def _returns(spec: dict) -> pd.DataFrame:
+    return _prices(spec).pct_change().iloc[1:]
+
+# --- engine ---
+
+@case("engine.run_single")
+def _run_single(spec):
+    from strategy_backtester.backtest.engine import BacktestEngine
+    from strategy_backtester.strategies import ma_crossover
+    px, eng = _prices(spec).iloc[:, 0], BacktestEngine(target_ann_vol=0.1)
+    return lambda: eng.run_single(px, ma_crossover.signals, short=20, long=100)
+
+@case("engine.run_multi_equal_weight")
+def _run_multi(spec):
+    from strategy_backtester.backtest.engine import BacktestEngine
+    from strategy_backtester.strategies import momentum
+    px, eng = _prices(spec), BacktestEngine(target_ann_vol=0.1)
+    fns = {c: momentum.signals for c in px.columns}
+    return lambda: eng.run_multi_equal_weight(px, fns, lookback=126)
+
+@case("engine.run_portfolio")
+def _run_portfolio(spec):
+    from strategy_backtester.backtest.engine import BacktestEngine
+    px = _prices(spec)
+    sigs, eng = synthetic_signals(px), BacktestEngine(target_ann_vol=0.1)
+    return lambda: eng.run_portfolio(px, sigs, weighter="inverse_vol", sparse=True)
+
+@case("engine.execution")
+def _execution(spec):
+    from strategy_backtester.backtest.engine import BacktestEngine
+    from strategy_backtester.backtest.execution import ExecutionModel
+    px = _prices(spec)
+    sigs = synthetic_signals(px)
+    eng = BacktestEngine(execution=ExecutionModel(synthetic_volume(px), schedule="pov"))
+    return lambda: eng.run_portfolio(px, sigs)
+
+@case("engine.run_chunked")
+def _run_chunked(spec):
+    from strategy_backtester.backtest.engine import BacktestEngine
+    from strategy_backtester.data.store import PriceStore
+    from strategy_backtester.research.factor_graph import field
+    store = PriceStore(scratch_dir() / "store")
+    store.write({"adj_close": _prices(spec)})
+    eng = BacktestEngine(target_ann_vol=0.1, freq=spec.get("freq", "D"))
+    expr = field().pct_change(126).xs_zscore() * 0.01
+    return lambda: eng.run_chunked(store, expr, chunk_rows=4096, weighter=None)
+
+@case("engine.sweep")
+def _sweep(spec):
+    from strategy_backtester.backtest.engine import BacktestEngine
+    from strategy_backtester.strategies import ma_crossover
+    px, eng = _prices(spec).iloc[:, :5], BacktestEngine()
+    grid = {"short": range(5, 60, 5), "long": range(50, 260, 10)}
+    return lambda: eng.sweep(px, ma_crossover.signals, grid)
+
+# --- indicators ---
+
+@case("indicators.kernels")
+def _kernels(spec):
+    from strategy_backtester.indicators import kernels as K
+    r = _returns(spec).to_numpy()
+    def run():
+        K.rolling_std(r, 63); K.rolling_zscore(r, 20); K.rolling_skew(r, 21); K.ema(r, 50)
+    return run
+
+# --- research ---
+
+@case("research.ic_panel")
+def _ic(spec):
+    from strategy_backtester.research.ic import ic_panel
+    px = _prices(spec)
+    fac = synthetic_factor(px)
+    return lambda: ic_panel(fac, px, horizons=(1, 5, 21))
+
+@case("research.factor_graph")
+def _factor_graph(spec):
+    from strategy_backtester.research.factor_graph import FactorGraph, field
+    px = _prices(spec)
+    r = field().pct_change()
+    exprs = {f"f{w}": (r.rolling_mean(w) / r.rolling_std(63)).rank(pct=True) for w in (5, 10, 21, 63, 126)}
+    return lambda: FactorGraph(px, chunk_rows=256, cache_bytes=0).evaluate(exprs)
+
+@case("research.neutralize_panel")
+def _neutralize_panel(spec):
+    from strategy_backtester.research.ic import neutralize_panel
+    px = _prices(spec)
+    fac = synthetic_factor(px)
+    rng = np.random.default_rng(spec.get("seed", 0))
+    beta = pd.DataFrame(rng.normal(1.0, 0.3, px.shape), index=px.index, columns=px.columns)
+    size = beta.resample("ME").first().reindex(px.index, method="ffill")  # slow-moving exposure
+    sectors = pd.Series(rng.integers(0, 11, px.shape[1]), index=px.columns)
+    return lambda: neutralize_panel(fac, {"beta": beta, "size": size}, sectors=sectors)
+
+@case("research.kmeans_regimes")
+def _regimes(spec):
+    from strategy_backtester.research.regime import kmeans_regimes
+    r = _returns(spec).iloc[:, 0]
+    return lambda: kmeans_regimes(r, k=3)
+
+@case("research.regime_panel")
+def _regime_panel(spec):
+    from strategy_backtester.research.regime import RegimeModel
+    r = _returns(spec)
+    m = RegimeModel(k=3).fit(r.iloc[:, :5])
+    return lambda: m.predict(r)
+
+@case("research.trial_registry")
+def _trial_registry(spec):
+    from strategy_backtester.research.trials import TrialRegistry
+    R = _returns(spec).to_numpy()
+    rng = np.random.default_rng(spec.get("seed", 0))
+    trials = R[:, rng.integers(0, R.shape[1], 50 * R.shape[1])] + rng.normal(0, 0.004, (len(R), 50 * R.shape[1]))
+    def run():
+        reg = TrialRegistry()
+        reg.add_matrix(trials)
+        return reg.stats()
+    return run
+
+@case("research.splits")
+def _splits(spec):
+    from strategy_backtester.research.splits import walk_forward_ranges, purged_kfold_ranges, cpcv_ranges
+    idx = _prices(spec).index
+    def run():
+        walk_forward_ranges(idx); purged_kfold_ranges(idx); cpcv_ranges(idx, n_groups=8, n_test_groups=2)
+    return run
+
+# --- portfolio ---
+
+@case("portfolio.constraint_pipeline")
+def _constraint_pipeline(spec):
+    from strategy_backtester.portfolio.constraints import ConstraintPipeline
+    px = _prices(spec)
+    rng = np.random.default_rng(spec.get("seed", 0))
+    w = synthetic_signals(px)
+    w = w.div(w.abs().sum(axis=1).replace(0, 1), axis=0)
+    sectors = pd.Series(rng.integers(0, 11, px.shape[1]), index=px.columns)
+    betas = pd.Series(rng.normal(1.0, 0.3, px.shape[1]), index=px.columns)
+    pipe = ConstraintPipeline(max_weight=0.05, sectors=sectors, max_sector=0.2, max_net=0.0, betas=betas,
+                              max_beta=0.05, max_gross=1.0, max_turnover=0.5)
+    pipe.apply(w.iloc[:5])  # compile the turnover kernel outside the timing
+    return lambda: pipe.apply(w)
+
+@case("portfolio.ledoit_wolf_cov")
+def _lw(spec):
+    from strategy_backtester.portfolio.risk_models import ledoit_wolf_cov
+    r = _returns(spec).iloc[-504:]
+    return lambda: ledoit_wolf_cov(r)
+
+@case("portfolio.hrp_weights")
+def _hrp(spec):
+    from strategy_backtester.portfolio.risk_models import hrp_weights
+    r = _returns(spec).iloc[-504:]
+    return lambda: hrp_weights(r)
+
+@case("portfolio.naive_max_sharpe")
+def _max_sharpe(spec):
+    from strategy_backtester.portfolio.optimization import naive_max_sharpe
+    r = _returns(spec).iloc[-504:]
+    return lambda: naive_max_sharpe(r)
+
+@case("portfolio.rolling_optimizer")
+def _rolling(spec):
+    from strategy_backtester.portfolio.rolling import RollingOptimizer
+    r = _returns(spec).fillna(0)
+    return lambda: RollingOptimizer(window=252, rebalance="ME", method="min_var").run(r)
+
+@case("portfolio.bootstrap_metrics")
+def _bootstrap(spec):
+    from strategy_backtester.portfolio.monte_carlo import bootstrap_metrics
+    r = _returns(spec).mean(axis=1)
+    return lambda: bootstrap_metrics(r, n_sims=spec["n_symbols"] * 10, method="stationary")
+
+# --- reporting ---
+
+@case("report.write_html_report")
+def _report(spec):
+    import matplotlib
+    matplotlib.use("Agg")
+    from strategy_backtester.utils.report import write_html_report
+    r = _returns(spec).mean(axis=1)
+    out = scratch_dir() / "report.html"
+    return lambda: write_html_report(r, "bench", str(out))
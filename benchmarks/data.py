@@ -0,0 +1,46 @@
+from __future__ import annotations
+import numpy as np, pandas as pd
+
+# bars per trading day and the pandas frequency of the generated index
+FREQS = {"D": (1, "B"), "H": (7, "h"), "min": (390, "min")}
+
+def _index(n: int, freq: str) -> pd.DatetimeIndex:
+    per_day, step = FREQS[freq]
+    if per_day == 1: return pd.bdate_range("2000-01-03", periods=n)
+    days = pd.bdate_range("2000-01-03", periods=-(-n // per_day))
+    bars = (pd.Timedelta(hours=9, minutes=30) + pd.to_timedelta(np.arange(per_day), unit=step)).to_numpy()
+    return pd.DatetimeIndex((days.to_numpy()[:, None] + bars[None, :]).ravel()[:n])
+
+def synthetic_prices(n_symbols: int=50, n_days: int=2520, freq: str="D", seed: int=0, n_factors: int=3) -> pd.DataFrame:
+    """Seeded factor-model GBM panel (bars x symbols) with heterogeneous vols and drifts.
+    For intraday `freq`, `n_days` trading days are expanded into bars."""
+    rng = np.random.default_rng(seed)
+    per_day = FREQS[freq][0]
+    n = n_days * per_day
+    scale = 1 / np.sqrt(per_day)
+    beta = rng.normal(1.0, 0.4, (n_factors, n_symbols)) / np.sqrt(n_factors)
+    vol = rng.uniform(0.01, 0.03, n_symbols) * scale
+    drift = rng.normal(0.0003, 0.0003, n_symbols) / per_day
+    f = rng.normal(0, 0.008 * scale, (n, n_factors))
+    r = f @ beta + rng.standard_t(5, (n, n_symbols)) * vol * np.sqrt(3 / 5) + drift
+    px = 100 * np.exp(np.cumsum(r, axis=0))
+    return pd.DataFrame(px, index=_index(n, freq), columns=[f"S{i:04d}" for i in range(n_symbols)])
+
+def synthetic_volume(prices: pd.DataFrame, seed: int=0) -> pd.DataFrame:
+    """Share volume with a per-symbol level and lognormal day-to-day noise."""
+    rng = np.random.default_rng(seed + 1)
+    level = rng.lognormal(13, 1, prices.shape[1])
+    return pd.DataFrame(level * rng.lognormal(0, 0.3, prices.shape), index=prices.index, columns=prices.columns)
+
+def synthetic_factor(prices: pd.DataFrame, ic: float=0.05, horizon: int=5, seed: int=0) -> pd.DataFrame:
+    """Noisy score that carries roughly `ic` information about `horizon`-bar forward returns."""
+    rng = np.random.default_rng(seed + 2)
+    fwd = prices.shift(-horizon) / prices - 1
+    z = (fwd - fwd.mean(axis=1).to_numpy()[:, None]) / fwd.std(axis=1).to_numpy()[:, None]
+    return ic * z.fillna(0) + rng.normal(0, 1, prices.shape)
+
+def synthetic_signals(prices: pd.DataFrame, density: float=0.2, seed: int=0) -> pd.DataFrame:
+    """Sparse -1/0/+1 signal panel with the given fraction of active names."""
+    rng = np.random.default_rng(seed + 3)
+    s = rng.choice([-1.0, 1.0], prices.shape) * (rng.random(prices.shape) < density)
+    return pd.DataFrame(s, index=prices.index, columns=prices.columns)
@@ -0,0 +1,62 @@
+from __future__ import annotations
+import datetime as dt, gc, json, platform, time, tracemalloc
+from pathlib import Path
+import numpy as np, pandas as pd
+from .cases import CASES, SIZES, cleanup
+
+def _meta(size: str, spec: dict) -> dict:
+    from strategy_backtester.indicators.kernels import USE_NUMBA
+    return {"created": dt.datetime.now().isoformat(timespec="seconds"), "size": size, "spec": spec,
+            "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "numba": USE_NUMBA, "machine": platform.machine(), "platform": platform.platform()}
+
+def time_call(fn, repeat: int=3, warmup: int=1) -> dict:
+    """Wall-clock seconds over `repeat` calls after `warmup` untimed calls (JIT, caches), plus the
+    peak traced Python/NumPy allocation of one extra call."""
+    for _ in range(warmup): fn()
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter(); fn(); times.append(time.perf_counter() - t0)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn(); peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {"min_s": min(times), "median_s": float(np.median(times)), "repeat": repeat, "peak_mb": peak / 2**20}
+
+def run(names=None, size: str="small", repeat: int=3, freq: str="D", seed: int=0, log=print) -> dict:
+    """Run the selected cases (name or prefix match, e.g. "engine") at one size; each case's
+    scratch directories are removed after it is timed."""
+    spec = dict(SIZES[size], freq=freq, seed=seed)
+    selected = [n for n in CASES if not names or any(n.startswith(p) for p in names)]
+    results = {}
+    for name in selected:
+        try:
+            results[name] = time_call(CASES[name](spec), repeat)
+        finally:
+            cleanup()
+        if log: log(f"{name:32s} {results[name]['min_s']:9.4f}s  {results[name]['peak_mb']:9.1f} MB")
+    return {"meta": _meta(size, spec), "results": results}
+
+def save(report: dict, path: str|Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    return path
+
+def load(path: str|Path) -> dict: return json.loads(Path(path).read_text())
+
+def compare(baseline: dict, current: dict, threshold: float=1.25, mem_threshold: float=1.25) -> pd.DataFrame:
+    """Per-case time/memory ratios current / baseline; `regression` is set when either ratio
+    exceeds its threshold. Cases missing on one side are skipped."""
+    rows = []
+    for name in sorted(set(baseline["results"]) & set(current["results"])):
+        b, c = baseline["results"][name], current["results"][name]
+        t_ratio = c["min_s"] / b["min_s"] if b["min_s"] > 0 else np.inf
+        m_ratio = c["peak_mb"] / b["peak_mb"] if b["peak_mb"] > 0 else 1.0
+        rows.append({"case": name, "base_s": b["min_s"], "cur_s": c["min_s"], "time_ratio": t_ratio,
+                     "base_mb": b["peak_mb"], "cur_mb": c["peak_mb"], "mem_ratio": m_ratio,
+                     "regression": t_ratio > threshold or m_ratio > mem_threshold})
+    return pd.DataFrame(rows)
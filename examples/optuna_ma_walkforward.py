@@ -1,21 +1,24 @@
-import optuna, pandas as pd
+import optuna
 from strategy_backtester.data.alpha_vantage import fetch_daily_adjusted
 from strategy_backtester.strategies import ma_crossover
 from strategy_backtester.backtest.engine import BacktestEngine
 from strategy_backtester.research.splits import walk_forward_splits
-from strategy_backtester.backtest.metrics import sharpe as sharpe_fn
+from strategy_backtester.research.walkforward import WalkForwardEvaluator
+from strategy_backtester.research.trials import TrialRegistry
 
 SYMBOL="IBM"
 df = fetch_daily_adjusted(SYMBOL)
 px = df["adj_close"]; idx = px.index
 
+# one full-history backtest per trial; folds are scored by position
+# every trial's out-of-sample returns land in the registry for the DSR at the end
+trials = TrialRegistry()
+wf = WalkForwardEvaluator(BacktestEngine(), px, ma_crossover.signals,
+                          splits=walk_forward_splits(idx, train_years=3, test_months=6, step_months=6, embargo_days=5),
+                          registry=trials)
+
 def wf_score(short, long):
-    engine = BacktestEngine()
-    scores = []
-    for tr, te in walk_forward_splits(idx, train_years=3, test_months=6, step_months=6, embargo_days=5):
-        r = engine.run_single(px.loc[tr.union(te)], ma_crossover.signals, short=short, long=long).returns
-        scores.append(sharpe_fn(r.loc[te]))
-    return float(pd.Series(scores).mean())
+    return wf.score("Sharpe", short=short, long=long)
 
 def obj(trial):
     short = trial.suggest_int("short", 5, 80)
@@ -26,3 +29,6 @@ def obj(trial):
 study = optuna.create_study(direction="maximize")
 study.optimize(obj, n_trials=30)
 print("Best:", study.best_params, "Score", study.best_value)
+stats = trials.stats()
+best = stats.loc[stats["sr"].idxmax()]
+print(f"Effective trials: {stats.attrs['n_trials']}  best PSR {best['psr']:.3f}  DSR {best['dsr']:.3f}")
@@ -1,2 +1,10 @@
+import importlib
+
 __all__ = ["backtest","data","indicators","portfolio","strategies","utils"]
 __version__ = "0.1.0"
+
+def __getattr__(name: str):
+    # subpackages load on first attribute access, so `import strategy_backtester` stays cheap
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,193 @@
+"""Out-of-core backtests over price histories that do not fit in memory (e.g. years of minute bars).
+
+`run_chunked` streams a `PriceStore` field (a read-only memmap) in blocks of `chunk_rows` bars.
+Each block is read together with the `warmup` bars before it, so rolling signals see full windows
+at the block edge; the state that spans blocks (each symbol's last valid price for the forward
+fill, the last target and held weights, the previous price, and the vol-targeting window of
+portfolio returns) is carried from one block to the next.
+Peak memory is a handful of (chunk_rows + warmup) x symbols buffers plus one float per bar for the
+portfolio returns, and the result matches `BacktestEngine.run_multi_from_signals` (or
+`run_weights`) on the same prices loaded in full.
+"""
+from __future__ import annotations
+import numpy as np, pandas as pd
+from .engine import _filtered_kwargs
+from ..indicators.kernels import rolling_std
+from ..strategies import ma_crossover, momentum, mean_reversion
+
+# bars of history the built-in strategies read before a bar's signal
+WARMUP = {
+    ma_crossover.signals: lambda short=50, long=200: max(short, long),
+    momentum.signals: lambda lookback=126: lookback,
+    mean_reversion.signals: lambda z_window=20, z_entry=1.0: z_window,
+}
+
+def _panel(source, field: str):
+    """(dates x symbols) array, dates and symbols of a PriceStore field or a price DataFrame."""
+    if isinstance(source, pd.DataFrame): return source.to_numpy(dtype=float), source.index, list(source.columns)
+    return source.array(field), source.dates, source.symbols
+
+def signal_warmup(signals, sig_kwargs: dict, warmup: int|None=None) -> int:
+    """Bars of history `signals` needs: `warmup` if given, the lookback of a factor expression, or
+    the `WARMUP` entry of a built-in strategy."""
+    from ..research.factor_graph import Node, reach
+    if isinstance(signals, Node):
+        back, ahead = reach(signals)
+        if ahead: raise ValueError(f"signal expression reads {ahead} bars ahead")
+        return back if warmup is None else int(warmup)
+    if warmup is not None: return int(warmup)
+    if signals in WARMUP: return int(WARMUP[signals](**_filtered_kwargs(WARMUP[signals], **sig_kwargs)))
+    raise ValueError("pass warmup= (bars of history the signal function reads) for custom signals")
+
+def _signal_block(signals, px: pd.DataFrame, sig_kwargs: dict) -> np.ndarray:
+    from ..research.factor_graph import FactorGraph, Node
+    if isinstance(signals, Node): return FactorGraph(px, cache_bytes=0).evaluate(signals, cache=False).to_numpy()
+    kw = _filtered_kwargs(signals, **sig_kwargs)
+    return np.column_stack([signals(px[c], **kw).reindex(px.index).to_numpy(dtype=float) for c in px.columns])
+
+def _ffill(px: np.ndarray, seed: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down the rows of px in place, starting from the `seed` row (NaN = none)."""
+    x = np.vstack([seed[None], px])
+    pos = np.where(np.isnan(x), 0, np.arange(len(x))[:, None])
+    np.maximum.accumulate(pos, axis=0, out=pos)
+    px[:] = np.take_along_axis(x, pos, axis=0)[1:]
+    return px
+
+def _kept_rows(arr, a0: int, b0: int, ix, chunk_rows: int) -> np.ndarray:
+    """Rows of [a0, b0) the in-memory `.dropna(how="all").ffill().dropna()` keeps: rows where some
+    symbol has a price, from the first row at which every symbol has had one. One streaming pass."""
+    some, first = [], None
+    for a in range(a0, b0, chunk_rows):
+        blk = np.asarray(arr[a:min(a + chunk_rows, b0)])
+        ok = ~np.isnan(blk if ix is None else blk[:, ix])
+        some.append(ok.any(axis=1))
+        seen = np.where(ok.any(axis=0), a + ok.argmax(axis=0), -1)
+        first = seen if first is None else np.where(first >= 0, first, seen)
+    if first is None or (first < 0).any(): return np.empty(0, dtype=np.intp)
+    rows = a0 + np.flatnonzero(np.concatenate(some))
+    return rows[rows >= first.max()]
+
+def _last_prices(arr, a0: int, r: int, ix, chunk_rows: int) -> np.ndarray:
+    """Each symbol's last price in rows [a0, r), NaN if none; scans backward from r."""
+    out = None
+    for b in range(r, a0, -chunk_rows):
+        blk = np.asarray(arr[max(b - chunk_rows, a0):b], dtype=float)
+        blk = blk if ix is None else blk[:, ix]
+        last = _ffill(blk.copy(), np.full(blk.shape[1], np.nan))[-1]
+        out = last if out is None else np.where(np.isnan(out), last, out)
+        if not np.isnan(out).any(): break
+    return out
+
+def run_chunked(engine, source, signals, field: str="adj_close", symbols: list[str]|None=None, start=None, end=None,
+                chunk_rows: int=8192, warmup: int|None=None, weighter: str|None="equal", ffill: bool=True,
+                **sig_kwargs):
+    """Backtest `signals` over a `PriceStore` field (or a price DataFrame) `chunk_rows` bars at a time.
+
+    signals: a per-symbol strategy function (`price: Series -> signal Series`, as in
+    `run_multi_equal_weight`) or a `research.factor_graph` expression over `field("prices")`
+    evaluated on whole blocks. warmup: bars of history prepended to each block (inferred for
+    expressions and the built-in strategies). weighter: "equal" weights the nonzero signals equally
+    (`run_multi_from_signals`); None takes the signals as target weights (`run_weights`).
+    ffill: carry each symbol's last price across gaps (and across blocks), dropping bars where no
+    symbol trades and bars before every symbol has a price, so the result equals the in-memory run
+    on `prices.dropna(how="all").ffill().dropna()` (the CLI's `--store` load); False runs on the
+    raw rows, where a gap is a zero return and signals see the NaN prices.
+    Gross cap, `ConstraintPipeline`, vol targeting and `SimpleCostModel` costs follow the engine.
+    Returns a `BacktestResult` of portfolio returns (weights are not kept).
+    """
+    with engine._entry("run_chunked") as profile:
+        res = _run_chunked(engine, source, signals, field, symbols, start, end, chunk_rows, warmup, weighter, ffill,
+                           sig_kwargs)
+    return engine._attach(res, profile)
+
+def _run_chunked(engine, source, signals, field, symbols, start, end, chunk_rows, warmup, weighter, ffill, sig_kwargs):
+    if engine.execution is not None:
+        raise ValueError("run_chunked does not model an ExecutionModel; use run_weights in memory")
+    if chunk_rows < 1: raise ValueError("chunk_rows must be >= 1")
+    arr, dates, cols = _panel(source, field)
+    a0 = 0 if start is None else dates.searchsorted(pd.Timestamp(start), "left")
+    b0 = len(dates) if end is None else dates.searchsorted(pd.Timestamp(end), "right")
+    ix = None
+    if symbols is not None:
+        pos = {s: i for i, s in enumerate(cols)}
+        missing = [s for s in symbols if s not in pos]
+        if missing: raise KeyError(f"symbols not in source: {missing}")
+        ix, cols = np.array([pos[s] for s in symbols], dtype=np.intp), list(symbols)
+    back = max(signal_warmup(signals, sig_kwargs, warmup), 1)  # >= 1 for the previous close
+    N, P = len(cols), engine.profiler
+    if ffill:
+        with P.stage("scan", rows=(b0 - a0) * N): rows = _kept_rows(arr, a0, b0, ix, chunk_rows)
+    else: rows = np.arange(a0, b0)
+    index = dates[rows]
+    T = len(rows)
+    n_per_year = engine.periods_per_year(index) if T > 1 else engine.periods_per_year()
+    net = np.zeros(T)
+    target = np.zeros(N)  # constrained target decided at the previous bar
+    held = np.zeros(N)    # weights held over the previous bar (after vol scaling)
+    tail = np.empty(0)    # unscaled portfolio returns of the last vol_window bars
+    seed = np.full(N, np.nan)  # last price before the block's first row (ffill state)
+    if ffill and T and rows[0] > a0:
+        last = _last_prices(arr, a0, int(rows[0]), ix, chunk_rows)
+        if last is not None: seed = last
+    with P.stage("run_chunked", rows=T * N):
+        for a in range(0, T, chunk_rows):
+            b = min(a + chunk_rows, T)
+            lo = max(a - back, 0)
+            k = a - lo  # warm-up rows at the top of the block
+            r0, r1 = rows[lo], rows[b - 1] + 1
+            with P.stage("read", rows=(b - lo) * N):
+                px = np.array(arr[r0:r1], dtype=float) if ix is None else np.asarray(arr[r0:r1])[:, ix].astype(float)
+                if r1 - r0 != b - lo: px = px[rows[lo:b] - r0]
+                if ffill:
+                    _ffill(px, seed)
+                    nxt = max(b - back, 0)  # the next block starts reading at row nxt
+                    if nxt > lo: seed = px[nxt - 1 - lo].copy()
+            with P.stage("signals", rows=(b - lo) * N):
+                W = _signal_block(signals, pd.DataFrame(px, index=index[lo:b], columns=cols, copy=False), sig_kwargs)[k:]
+                W = np.array(W, dtype=float)
+                W[np.isnan(W)] = 0
+            with P.stage("constraints", rows=(b - a) * N):
+                if not engine.allow_short: np.clip(W, 0, 1, out=W)
+                if weighter == "equal":
+                    nz = (W != 0).sum(axis=1)
+                    W /= np.maximum(nz, 1)[:, None]
+                elif weighter is not None:
+                    raise ValueError(f"weighter must be 'equal' or None, got {weighter!r}")
+                g = np.abs(W).sum(axis=1)
+                with np.errstate(divide="ignore"):
+                    W *= np.where(g > 0, np.minimum(engine.max_leverage / g, 1.0), 1.0)[:, None]
+                if engine.constraints is not None:
+                    engine.constraints.apply_array(W, index[a:b], cols, max_gross=engine.max_leverage, w0=target)
+                # trade on the next bar: row i holds the target decided at bar i - 1
+                last = W[-1].copy()
+                W[1:] = W[:-1]; W[0] = target
+                target = last
+
+            R = np.empty_like(W)  # pct_change().fillna(0), continuing from the block's warm-up rows
+            with np.errstate(invalid="ignore", divide="ignore"):
+                if k: np.divide(px[k:], px[k - 1:-1], out=R)
+                else: R[0] = np.nan; np.divide(px[1:], px[:-1], out=R[1:])
+            del px
+            R -= 1
+            R[np.isnan(R)] = 0
+            port = np.einsum("ij,ij->i", W, R)
+            del R
+
+            if engine.target_ann_vol is not None:
+                with P.stage("vol_target", rows=b - a):
+                    ext = np.concatenate([tail, port])
+                    rv = rolling_std(ext, engine.vol_window, ddof=0)
+                    with np.errstate(divide="ignore"):
+                        sc = np.minimum(engine.target_ann_vol / (rv * np.sqrt(n_per_year)), 10)
+                    # lagged: bar i is scaled from the window ending at bar i - 1
+                    scale = np.concatenate([sc[len(tail) - 1:len(tail)] if len(tail) else [np.nan], sc[len(tail):-1]])
+                    scale[np.isnan(scale)] = 1.0
+                    tail = ext[-engine.vol_window:]
+                    W *= scale[:, None]; port *= scale
+
+            with P.stage("costs", rows=(b - a) * N):
+                turnover = np.abs(np.diff(W, axis=0, prepend=held[None])).sum(axis=1)
+                short = -np.minimum(W, 0).sum(axis=1)
+                net[a:b] = port - engine.cost_model.cost_from_turnover(turnover, short)
+                held = W[-1].copy()
+    return engine._result(pd.Series(net, index=index))
@@ -1,5 +1,5 @@
 from __future__ import annotations
-import pandas as pd
+import numpy as np, pandas as pd
 
 class SimpleCostModel:
     """Cost per day = (fee_bps + half_spread_bps) * turnover + impact_k * turnover^2."""
@@ -13,10 +13,20 @@ class SimpleCostModel:
         # turnover = sum_i |Δw_i|
         if isinstance(w, pd.DataFrame):
             d = (w - w_prev).abs().sum(axis=1)
-            short_borrow = w.clip(upper=0).abs().sum(axis=1) * (self.borrow_bps / 10000.0)
+            short_gross = w.clip(upper=0).abs().sum(axis=1)
         else:
             d = (w - w_prev).abs()
-            short_borrow = w.clip(upper=0).abs() * (self.borrow_bps / 10000.0)
-        linear = (self.fee_bps + self.half_spread_bps) / 10000.0 * d
-        impact = self.impact_k * (d ** 2)
-        return linear + impact + short_borrow
+            short_gross = w.clip(upper=0).abs()
+        return self.cost_from_turnover(d, short_gross)
+
+    def cost_from_turnover(self, turnover, short_gross):
+        """Same formula from precomputed per-day turnover sum|Δw| and short gross sum|min(w, 0)|."""
+        linear = (self.fee_bps + self.half_spread_bps) / 10000.0 * turnover
+        impact = self.impact_k * (turnover ** 2)
+        return linear + impact + short_gross * (self.borrow_bps / 10000.0)
+
+    def cost_array(self, w_prev: np.ndarray, w: np.ndarray) -> np.ndarray:
+        """Elementwise cost on raw arrays (no cross-sectional sum), e.g. (dates x params) sweeps."""
+        d = np.abs(w - w_prev)
+        short_borrow = np.abs(np.minimum(w, 0.0)) * (self.borrow_bps / 10000.0)
+        return (self.fee_bps + self.half_spread_bps) / 10000.0 * d + self.impact_k * d * d + short_borrow
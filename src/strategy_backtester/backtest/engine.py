@@ -1,8 +1,13 @@
 from __future__ import annotations
 import inspect, numpy as np, pandas as pd
+from contextlib import contextmanager, nullcontext
 from ..backtest import metrics as M
 from .costs import SimpleCostModel
+from .execution import ExecutionModel
 from ..utils.risk import target_vol_scale
+from ..utils.cache import ResultCache, make_key
+from ..utils.profiling import Profiler, NULL_PROFILER
+from ..portfolio.constraints import ConstraintPipeline
 
 def _filtered_kwargs(fn, **kwargs):
     allowed = set(inspect.signature(fn).parameters.keys())
@@ -10,64 +15,283 @@ def _filtered_kwargs(fn, **kwargs):
     return {k: v for k, v in kwargs.items() if k in allowed}
 
 class BacktestResult:
-    def __init__(self, returns: pd.Series, weights: pd.DataFrame|None=None):
+    def __init__(self, returns: pd.Series, weights: pd.DataFrame|None=None, profile: dict|None=None,
+                 freq: str|float|None="daily"):
         self.returns, self.weights = returns, weights
+        self.profile = profile  # Profiler.report() snapshot when the engine ran with a profiler
+        self.freq = freq  # bar frequency the metrics annualize with
+    def derived(self, window: int=126) -> dict:
+        """`metrics.derived_series` for this result, computed once per window and kept for reuse
+        by reports and plots."""
+        cache = self.__dict__.setdefault("_derived", {})
+        if window not in cache: cache[window] = M.derived_series(self.returns, window, self.freq)
+        return cache[window]
+
     def summary(self) -> dict:
-        return {"CAGR": M.annualized_return(self.returns),
-                "Volatility": M.annualized_vol(self.returns),
-                "Sharpe": M.sharpe(self.returns),
+        n = M.periods_per_year(self.freq, self.returns.index)
+        return {"CAGR": M.annualized_return(self.returns, n),
+                "Volatility": M.annualized_vol(self.returns, n),
+                "Sharpe": M.sharpe(self.returns, freq=n),
                 "MaxDrawdown": M.max_drawdown(self.returns)}
 
 class BacktestEngine:
+    """Vectorized backtests over in-memory price panels (see `run_chunked` for stores on disk).
+
+    freq: bar frequency ("minute", "hourly", "daily", an offset alias such as "5min", a bars-per-year
+    number, or "infer" from the price index; `metrics.periods_per_year`). It sets how vol targeting
+    and result metrics annualize; `vol_window` and strategy windows are counted in bars.
+    """
     def __init__(self, cost_model: SimpleCostModel|None=None, allow_short: bool=True,
-                 max_leverage: float=1.0, target_ann_vol: float|None=None, vol_window: int=63):
+                 max_leverage: float=1.0, target_ann_vol: float|None=None, vol_window: int=63,
+                 cache: ResultCache|None=None, execution: ExecutionModel|None=None, profiler: Profiler|None=None,
+                 constraints: ConstraintPipeline|None=None, freq: str|float|None="daily"):
         self.cost_model = cost_model or SimpleCostModel()
         self.allow_short, self.max_leverage = allow_short, max_leverage
         self.target_ann_vol, self.vol_window = target_ann_vol, vol_window
+        self.cache = cache
+        self.execution = execution  # optional schedule + Almgren-Chriss impact on top of cost_model
+        self.profiler = profiler or NULL_PROFILER
+        self.constraints = constraints  # optional ConstraintPipeline run after the gross cap
+        self.freq = freq
+        self._depth = 0  # nesting of public entry points; only the outermost attaches a profile
+
+    def _settings(self) -> tuple:
+        # everything besides prices/strategy that changes a result; part of every result cache key
+        return (type(self.cost_model).__name__, vars(self.cost_model), self.allow_short,
+                self.max_leverage, self.target_ann_vol, self.vol_window,
+                None if self.execution is None else vars(self.execution),
+                None if self.constraints is None else self.constraints.cache_key(), self.freq)
+
+    def periods_per_year(self, index: pd.Index|None=None) -> float:
+        """Bars per year for this engine's `freq` (`index` resolves "infer")."""
+        return M.periods_per_year(self.freq, index)
+
+    def _result(self, net: pd.Series, **kw) -> BacktestResult:
+        # an inferred frequency is resolved once here and stored as a number on the result
+        return BacktestResult(net, freq=self.periods_per_year(net.index) if self.freq == "infer" else self.freq, **kw)
+
+    def _signals(self, price: pd.Series, fn, kwargs: dict) -> pd.Series:
+        kw = _filtered_kwargs(fn, **kwargs)
+        with self.profiler.stage("signals", rows=len(price)):
+            if self.cache is None: return fn(price, **kw)
+            return self.cache.get_or_compute(make_key("signals", price, fn, kw), lambda: fn(price, **kw))
+
+    @contextmanager
+    def _entry(self, name: str, rows: int|None=None):
+        # stage for a public entry point; the outermost one yields this call's captured profile
+        outer = self._depth == 0
+        self._depth += 1
+        try:
+            with self.profiler.capture() if outer else nullcontext(None) as profile, self.profiler.stage(name, rows=rows):
+                yield profile
+        finally:
+            self._depth -= 1
+
+    def _attach(self, res: BacktestResult, profile: dict|None) -> BacktestResult:
+        # results may be shared cache entries: put this run's profile (or none) on a shallow copy
+        if profile is None and res.profile is None: return res
+        return BacktestResult(res.returns, res.weights, profile=profile, freq=res.freq)
 
     def _apply_constraints(self, w: pd.Series|pd.DataFrame) -> pd.Series|pd.DataFrame:
         # cap gross leverage per day
         if isinstance(w, pd.DataFrame):
             gross = w.abs().sum(axis=1).replace(0, np.nan)
             scale = (self.max_leverage / gross).clip(upper=1).fillna(1.0)
-            return (w.T * scale).T
-        gross = w.abs().replace(0, np.nan)
-        scale = (self.max_leverage / gross).clip(upper=1).fillna(1.0)
-        return w * scale
+            w = w.mul(scale, axis=0)
+        else:
+            gross = w.abs().replace(0, np.nan)
+            scale = (self.max_leverage / gross).clip(upper=1).fillna(1.0)
+            w = w * scale
+        if self.constraints is not None: w = self.constraints.apply(w, max_gross=self.max_leverage)
+        return w
+
+    def _cost(self, w: pd.Series|pd.DataFrame, prices: pd.Series|pd.DataFrame) -> pd.Series:
+        w_prev = w.shift(1).fillna(0)
+        cost = self.cost_model.cost(w_prev, w)
+        if self.execution is not None: cost = cost + self.execution.cost(w_prev, w, prices)
+        return cost
 
     def run_single(self, price: pd.Series, signals_fn, **sig_kwargs) -> BacktestResult:
-        sig = signals_fn(price, **_filtered_kwargs(signals_fn, **sig_kwargs)).reindex(price.index).fillna(0)
+        with self._entry("run_single", rows=len(price)) as profile:
+            if self.cache is not None:
+                key = make_key("single", price, signals_fn, _filtered_kwargs(signals_fn, **sig_kwargs), self._settings())
+                res = self.cache.get_or_compute(key, lambda: self.run_single_from_signals(price, self._signals(price, signals_fn, sig_kwargs)))
+            else:
+                res = self.run_single_from_signals(price, self._signals(price, signals_fn, sig_kwargs))
+        return self._attach(res, profile)
+
+    def run_single_from_signals(self, price: pd.Series, sig: pd.Series) -> BacktestResult:
+        """Single-asset path for a precomputed signal series."""
+        sig = sig.reindex(price.index).fillna(0)
         if not self.allow_short: sig = sig.clip(lower=0, upper=1)  # else assume -1/0/1
         ret = price.pct_change().fillna(0)
         w_target = sig.astype(float)
-        w = self._apply_constraints(w_target).shift(1).fillna(0)
+        P, n = self.profiler, len(price)
+        with P.stage("constraints", rows=n):
+            w = self._apply_constraints(w_target).shift(1).fillna(0)
 
         # Vol targeting
         if self.target_ann_vol is not None:
-            port_ret = (w * ret).rename("r")
-            scale = target_vol_scale(port_ret, self.target_ann_vol, self.vol_window)
-            w = w * scale
+            with P.stage("vol_target", rows=n):
+                port_ret = (w * ret).rename("r")
+                scale = target_vol_scale(port_ret, self.target_ann_vol, self.vol_window, self.periods_per_year(price.index))
+                w = w * scale
 
-        turnover = (w - w.shift(1).fillna(0))
-        cost = self.cost_model.cost(w.shift(1).fillna(0), w)
+        with P.stage("costs", rows=n):
+            cost = self._cost(w, price)
         net = (w * ret) - cost
-        return BacktestResult(net)
+        return self._result(net)
 
     def run_multi_equal_weight(self, prices: pd.DataFrame, signals_map: dict, **kwargs) -> BacktestResult:
-        rets = prices.pct_change().fillna(0)
-        sigs = {sym: fn(prices[sym], **_filtered_kwargs(fn, **kwargs)) for sym, fn in signals_map.items()}
-        sigs = pd.DataFrame(sigs).reindex(prices.index).fillna(0)
+        run = lambda: self.run_multi_from_signals(
+            prices, pd.DataFrame({sym: self._signals(prices[sym], fn, kwargs) for sym, fn in signals_map.items()}))
+        with self._entry("run_multi", rows=prices.size) as profile:
+            if self.cache is None: res = run()
+            else:
+                kw = {sym: _filtered_kwargs(fn, **kwargs) for sym, fn in signals_map.items()}
+                res = self.cache.get_or_compute(make_key("multi", prices, signals_map, kw, self._settings()), run)
+        return self._attach(res, profile)
+
+    def run_multi_from_signals(self, prices: pd.DataFrame, sigs: pd.DataFrame) -> BacktestResult:
+        """Equal-weight portfolio path for precomputed (dates x symbols) signals."""
+        sigs = sigs.reindex(prices.index).fillna(0)
         if not self.allow_short: sigs = sigs.clip(lower=0, upper=1)
 
         nz = (sigs != 0).sum(axis=1).replace(0, np.nan)
         w_target = sigs.div(nz, axis=0).fillna(0)  # equal weight among nonzero signals (sign preserved)
-        w = self._apply_constraints(w_target).shift(1).fillna(0)
+        return self.run_weights(prices, w_target)
+
+    def run_weights(self, prices: pd.DataFrame, w_target: pd.DataFrame) -> BacktestResult:
+        """Portfolio path for a target-weights panel (dates x symbols) decided at each close,
+        e.g. the output of `portfolio.rolling.RollingOptimizer`."""
+        P, n = self.profiler, w_target.size
+        with self._entry("run_weights", rows=n) as profile:
+            rets = prices[w_target.columns].pct_change().fillna(0)
+            w_target = w_target.reindex(prices.index).fillna(0)
+            with P.stage("constraints", rows=n):
+                w = self._apply_constraints(w_target).shift(1).fillna(0)
+
+            if self.target_ann_vol is not None:
+                with P.stage("vol_target", rows=n):
+                    port_ret = (w * rets).sum(axis=1).rename("r")
+                    scale = target_vol_scale(port_ret, self.target_ann_vol, self.vol_window,
+                                             self.periods_per_year(prices.index))
+                    w = w.mul(scale, axis=0)
+
+            with P.stage("costs", rows=n):
+                cost = self._cost(w, prices)
+            net = (w * rets).sum(axis=1) - cost
+        return self._attach(self._result(net, weights=w), profile)
+
+    def run_portfolio(self, prices: pd.DataFrame, sigs=None, weighter="equal", dtype=np.float64, sparse: bool=False,
+                      chunk_rows: int=256, **weighter_kwargs) -> BacktestResult:
+        """Multi-asset path on NumPy buffers with a pluggable cross-sectional weighter.
+
+        sigs: (dates x symbols) signals as a DataFrame (dense or pandas-sparse) or a scipy.sparse
+        matrix over `prices.columns`; None means every name is active. weighter: a name in
+        `portfolio.weighting.WEIGHTERS` ("equal", "signal", "inverse_vol", "risk_parity"), a
+        callable `(S, R, **kw) -> S`, or a target-weights DataFrame such as `RollingOptimizer.run`
+        output (applied to the active names). Signals are rescaled in place into the weights
+        buffer. With `sparse=True` weights stay CSR, and turnover, cost and execution are
+        evaluated `chunk_rows` dates at a time. Peak memory is then about the returns panel plus
+        the nonzero weights. `dtype=np.float32` halves the dense buffers.
+        """
+        with self._entry("run_portfolio", rows=prices.size) as profile:
+            res = self._run_portfolio(prices, sigs, weighter, dtype, sparse, chunk_rows, weighter_kwargs)
+        return self._attach(res, profile)
+
+    def _run_portfolio(self, prices, sigs, weighter, dtype, sparse, chunk_rows, weighter_kwargs) -> BacktestResult:
+        from scipy import sparse as sp
+        from ..portfolio import weighting as WT
+        cols = prices.columns if sigs is None or sp.issparse(sigs) else sigs.columns
+        px = (prices if prices.columns.equals(cols) else prices[cols]).to_numpy(dtype=dtype)
+        R = np.empty(px.shape, dtype=dtype)  # pct_change().fillna(0) without intermediate frames
+        R[0] = 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            np.divide(px[1:], px[:-1], out=R[1:])
+        R[1:] -= 1
+        R[np.isnan(R)] = 0
+        del px
+        T, N = R.shape
+        if sigs is None:
+            S = sp.csr_matrix(np.ones((T, N), dtype=dtype)) if sparse else np.ones((T, N), dtype=dtype)
+        elif sp.issparse(sigs):
+            S = sp.csr_matrix(sigs, dtype=dtype) if sparse else sigs.toarray().astype(dtype, copy=False)
+        elif sparse and isinstance(sigs.dtypes.iloc[0], pd.SparseDtype):
+            S = sp.csr_matrix(sigs.reindex(prices.index).sparse.to_coo(), dtype=dtype)
+        else:
+            S = sigs.reindex(prices.index).to_numpy(dtype=dtype, copy=True)
+            S[np.isnan(S)] = 0
+            if sparse: S = sp.csr_matrix(S)
+        if sparse: S.sum_duplicates(); np.nan_to_num(S.data, copy=False)
+        v = S.data if sparse else S
+        if not self.allow_short: np.clip(v, 0, 1, out=v)
+
+        P = self.profiler
+        with P.stage("weights", rows=T * N):
+            if isinstance(weighter, pd.DataFrame):
+                W = WT.from_panel(S, weighter.reindex(index=prices.index, columns=cols).fillna(0).to_numpy(dtype=dtype))
+            else:
+                fn = WT.WEIGHTERS[weighter] if isinstance(weighter, str) else weighter
+                W = fn(S, R, index=prices.index, **weighter_kwargs)
+            if sparse: W.eliminate_zeros()
+
+        # gross cap, then trade on the next bar
+        with P.stage("constraints", rows=T * N):
+            g = WT.row_sum(W, np.abs(W.data if sparse else W))
+            with np.errstate(divide="ignore"):
+                WT.scale_rows(W, np.where(g > 0, np.minimum(self.max_leverage / g, 1.0), 1.0))
+            if self.constraints is not None:  # the pipeline works on a dense float64 panel
+                C = self.constraints.apply_array(W.toarray().astype(np.float64) if sparse else W.astype(np.float64),
+                                                 prices.index, cols, max_gross=self.max_leverage)
+                if sparse: W = sp.csr_matrix(C.astype(dtype, copy=False))
+                else: W[:] = C
+            if sparse:
+                W = sp.vstack([sp.csr_matrix((1, N), dtype=W.dtype), W[:-1]], format="csr")
+            else:
+                for hi in range(T, 1, -chunk_rows):  # in-place shift, bounded temporaries
+                    lo = max(hi - chunk_rows, 1)
+                    W[lo:hi] = W[lo - 1:hi - 1]
+                W[:1] = 0
+            port = (WT.row_sum(W, W.data * R[WT.row_ids(W), W.indices]) if sparse
+                    else np.einsum("ij,ij->i", W, R, dtype=np.float64))
 
         if self.target_ann_vol is not None:
-            port_ret = (w * rets).sum(axis=1).rename("r")
-            scale = target_vol_scale(port_ret, self.target_ann_vol, self.vol_window)
-            w = (w.T * scale).T
+            with P.stage("vol_target", rows=T * N):
+                scale = target_vol_scale(pd.Series(port, index=prices.index), self.target_ann_vol, self.vol_window,
+                                         self.periods_per_year(prices.index)).to_numpy()
+                WT.scale_rows(W, scale); port = port * scale
+
+        with P.stage("costs", rows=T * N):
+            exec_inputs = None if self.execution is None else self.execution._inputs(prices[cols])
+            turnover, short, impact = np.zeros(T), np.zeros(T), np.zeros(T)
+            prev = np.zeros((1, N))
+            for lo in range(0, T, chunk_rows):
+                hi = min(lo + chunk_rows, T)
+                blk = W[lo:hi].toarray() if sparse else W[lo:hi]
+                dw = np.diff(blk, axis=0, prepend=prev).astype(np.float64, copy=False)
+                turnover[lo:hi] = np.abs(dw).sum(axis=1)
+                short[lo:hi] = -np.minimum(blk, 0).sum(axis=1)
+                if exec_inputs is not None:
+                    px, adv, sigma = (a[lo:hi] for a in exec_inputs)
+                    impact[lo:hi] = self.execution.impact_array(dw, px, adv, sigma).sum(axis=1)
+                prev = blk[-1:]
+        net = port - self.cost_model.cost_from_turnover(turnover, short) - impact
+
+        weights = (pd.DataFrame.sparse.from_spmatrix(W, index=prices.index, columns=cols) if sparse
+                   else pd.DataFrame(W, index=prices.index, columns=cols, copy=False))
+        return self._result(pd.Series(net, index=prices.index), weights=weights)
+
+    def run_chunked(self, source, signals, chunk_rows: int=8192, **kwargs) -> BacktestResult:
+        """Out-of-core portfolio run over a `PriceStore` (memmap) streamed `chunk_rows` bars at a time,
+        with rolling state carried across chunks; see `chunked.run_chunked` for the arguments."""
+        from .chunked import run_chunked
+        return run_chunked(self, source, signals, chunk_rows=chunk_rows, **kwargs)
 
-        cost = self.cost_model.cost(w.shift(1).fillna(0), w)
-        net = (w * rets).sum(axis=1) - cost
-        return BacktestResult(net, weights=w)
+    def sweep(self, prices: pd.Series|pd.DataFrame, signals_fn, grid: dict|list[dict], chunk_size: int=2048,
+              registry=None) -> pd.DataFrame:
+        """Vectorized parameter sweep: every grid combination as one (dates x params) batch.
+        Returns a tidy table of `BacktestResult.summary()` metrics per (symbol, combination);
+        `registry` (a `TrialRegistry`) collects every combination's returns."""
+        from .sweep import sweep
+        return sweep(self, prices, signals_fn, grid, chunk_size=chunk_size, registry=registry)
@@ -1,21 +1,109 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
 
-def schedule_twap(qty: float, n_slices: int) -> np.ndarray:
-    return np.full(n_slices, qty / n_slices)
+# schedules and impact take a scalar parent order or an array of them; slices run along a new last axis
 
-def schedule_pov(qty: float, vols: np.ndarray, participation: float=0.1) -> np.ndarray:
-    vols = np.asarray(vols); w = vols / vols.sum()
-    return qty * w * participation / w.mean()
+def schedule_twap(qty: float|np.ndarray, n_slices: int) -> np.ndarray:
+    q = np.asarray(qty, dtype=float)
+    return np.repeat(q[..., None] / n_slices, n_slices, axis=-1)
 
-def schedule_vwap(qty: float, dollar_vol: np.ndarray) -> np.ndarray:
-    dv = np.asarray(dollar_vol); w = dv / dv.sum()
-    return qty * w
+def schedule_pov(qty: float|np.ndarray, vols: np.ndarray, participation: float=0.1) -> np.ndarray:
+    vols = np.asarray(vols, dtype=float); w = vols / vols.sum(axis=-1, keepdims=True)
+    return np.asarray(qty, dtype=float)[..., None] * w * participation / w.mean(axis=-1, keepdims=True)
 
-def almgren_chriss_impact(shares: np.ndarray, sigma: float, adv: float, gamma: float=1e-6, eta: float=1e-6):
-    """Very simple AC: temporary cost ~ eta * (v/ADV), permanent ~ gamma * cumulative participation."""
-    shares = np.asarray(shares)
-    v = np.abs(shares)
+def schedule_vwap(qty: float|np.ndarray, dollar_vol: np.ndarray) -> np.ndarray:
+    dv = np.asarray(dollar_vol, dtype=float); w = dv / dv.sum(axis=-1, keepdims=True)
+    return np.asarray(qty, dtype=float)[..., None] * w
+
+def almgren_chriss_impact(shares: np.ndarray, sigma: float, adv: float|np.ndarray, gamma: float|np.ndarray=1e-6,
+                          eta: float|np.ndarray=1e-6):
+    """Very simple AC: temporary cost ~ eta * (v/ADV), permanent ~ gamma * cumulative participation.
+    shares: (..., S) slices; adv/gamma/eta: scalars or one per order. `sigma` is not applied; for
+    impact proportional to daily vol pass gamma*sigma and eta*sigma (as `ExecutionModel` does)."""
+    v = np.abs(np.asarray(shares, dtype=float))
+    adv, gamma, eta = (np.asarray(x, dtype=float)[..., None] for x in (adv, gamma, eta))
     temp = eta * (v / adv)
-    perm = gamma * np.cumsum(v) / adv
+    perm = gamma * np.cumsum(v, axis=-1) / adv
     return temp + perm  # fraction of price as cost
+
+def intraday_profile(n_slices: int=13) -> np.ndarray:
+    """U-shaped intraday volume curve (heavier open/close), normalized to sum to 1."""
+    x = np.linspace(-1, 1, n_slices)
+    p = 1.0 + 1.5 * x ** 2
+    return p / p.sum()
+
+def slice_fractions(qty: np.ndarray, profile: np.ndarray, schedule: str="vwap", adv: np.ndarray|None=None,
+                    participation: float=0.1) -> np.ndarray:
+    """Fraction of each parent order executed in each bucket, (...,) orders -> (..., S).
+
+    twap: equal slices; vwap: follow the volume profile; pov: trade `participation` of each bucket's
+    expected volume (adv * profile) until filled, with any remainder forced into the last bucket
+    (unlike `schedule_pov`, which sizes slices from relative bucket volume with no fill cap).
+    """
+    qty = np.abs(np.asarray(qty, dtype=float))
+    S = len(profile)
+    if schedule == "twap": return np.broadcast_to(schedule_twap(1.0, S), qty.shape + (S,))
+    if schedule == "vwap": return np.broadcast_to(schedule_vwap(1.0, profile), qty.shape + (S,))
+    if schedule != "pov": raise ValueError(f"Unknown schedule: {schedule}")
+    cap = participation * adv[..., None] * np.cumsum(profile / profile.sum())  # cumulative bucket capacity
+    with np.errstate(invalid="ignore", divide="ignore"):
+        filled = np.minimum(cap / qty[..., None], 1.0)
+    filled = np.where(qty[..., None] > 0, np.nan_to_num(filled, nan=1.0), 1.0)
+    filled[..., -1] = 1.0
+    return np.diff(filled, prepend=0.0, axis=-1)
+
+class ExecutionModel:
+    """Execution stage for `BacktestEngine`: each day's weight change becomes a parent order of
+    capital*|Δw|/price shares, split over intraday volume buckets by `schedule`, and every child
+    slice pays `almgren_chriss_impact` with gamma and eta scaled by trailing daily volatility,
+    against trailing ADV (both lagged one day, so only information available before the trade is
+    used).
+
+    `volume` is a share-volume Series/DataFrame aligned with the prices. Whole (dates x symbols x
+    buckets) blocks are computed at once, `chunk_rows` dates at a time to bound memory. Days with
+    no ADV/vol history yet (warm-up) are charged no impact.
+    """
+    def __init__(self, volume: pd.Series|pd.DataFrame, capital: float=1e7, schedule: str="vwap", n_slices: int=13,
+                 profile: np.ndarray|None=None, participation: float=0.1, gamma: float=0.1, eta: float=0.5,
+                 adv_window: int=20, vol_window: int=20, chunk_rows: int=256):
+        self.volume, self.capital, self.schedule = volume, capital, schedule
+        self.profile = intraday_profile(n_slices) if profile is None else np.asarray(profile, dtype=float)
+        self.participation, self.gamma, self.eta = participation, gamma, eta
+        self.adv_window, self.vol_window, self.chunk_rows = adv_window, vol_window, chunk_rows
+
+    def _inputs(self, prices: pd.DataFrame) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        vol = self.volume.to_frame(prices.columns[0]) if isinstance(self.volume, pd.Series) else self.volume
+        vol = vol.reindex(index=prices.index, columns=prices.columns)
+        adv = vol.rolling(self.adv_window).mean().shift(1).to_numpy(dtype=float)
+        sigma = prices.pct_change().rolling(self.vol_window).std().shift(1).to_numpy(dtype=float)
+        return prices.to_numpy(dtype=float), adv, sigma
+
+    def impact_array(self, dw: np.ndarray, px: np.ndarray, adv: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+        """(dates x symbols) impact cost in weight units (fraction of capital) for trades `dw`."""
+        out = np.zeros(dw.shape)
+        for lo in range(0, len(dw), self.chunk_rows):
+            sl = slice(lo, lo + self.chunk_rows)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                shares = self.capital * np.abs(dw[sl]) / px[sl]
+            ok = (shares > 0) & (adv[sl] > 0) & np.isfinite(sigma[sl]) & np.isfinite(shares)
+            q, a, s = np.where(ok, shares, 0.0), np.where(ok, adv[sl], 1.0), np.where(ok, sigma[sl], 0.0)
+            if self.schedule == "pov":
+                f = slice_fractions(q, self.profile, self.schedule, a, self.participation)
+                frac = almgren_chriss_impact(q[..., None] * f, s, a, self.gamma * s, self.eta * s)
+                per_unit = (f * frac).sum(axis=-1)
+            else:
+                # size-independent fractions: the slice sum collapses to one constant per schedule
+                f = slice_fractions(np.zeros(1), self.profile, self.schedule)[0]
+                k = (f * almgren_chriss_impact(f, 1.0, 1.0, self.gamma, self.eta)).sum()
+                per_unit = s * q / a * k
+            out[sl] = np.abs(dw[sl]) * np.where(ok, per_unit, 0.0)
+        return out
+
+    def cost(self, w_prev: pd.DataFrame|pd.Series, w: pd.DataFrame|pd.Series, prices: pd.DataFrame|pd.Series) -> pd.Series:
+        """Per-day impact cost, summed across symbols (same shape as `SimpleCostModel.cost`)."""
+        frame = isinstance(w, pd.DataFrame)
+        P = prices[w.columns] if frame else prices.to_frame()
+        px, adv, sigma = self._inputs(P)
+        dw = ((w - w_prev).to_numpy(dtype=float)).reshape(len(P), -1)
+        out = self.impact_array(dw, px, adv, sigma)
+        return pd.Series(out.sum(axis=1), index=w.index)
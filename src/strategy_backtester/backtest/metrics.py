@@ -1,29 +1,104 @@
 from __future__ import annotations
+import re
 import numpy as np
 import pandas as pd
 
 TRADING_DAYS = 252
+SESSION_HOURS = 6.5  # US equity regular session: 390 one-minute bars a day
+
+# bars per year by name; intraday offsets ("5min", "30min", "1h") are scaled from the session length
+PERIODS_PER_YEAR = {"minute": TRADING_DAYS * SESSION_HOURS * 60, "hourly": TRADING_DAYS * SESSION_HOURS,
+                    "daily": TRADING_DAYS, "weekly": 52, "monthly": 12}
+_ALIASES = {"min": "minute", "1min": "minute", "t": "minute", "h": "hourly", "1h": "hourly", "d": "daily",
+            "1d": "daily", "b": "daily", "w": "weekly", "1w": "weekly", "me": "monthly", "ms": "monthly"}
+INFER_BARS = 10_000  # "infer" reads the bar spacing from this many leading bars of the index
+
+def periods_per_year(freq: str|float|None="daily", index: pd.Index|None=None) -> float:
+    """Bars per year used to annualize: a number, "minute" | "hourly" | "daily" | "weekly" |
+    "monthly", an intraday offset alias such as "5min" or "1h", or "infer": the median bar spacing
+    over the first `INFER_BARS` bars of a DatetimeIndex `index`, so a history whose frequency
+    changes later is annualized at its opening frequency. None means daily. A bare "m" or "5m"
+    (minutes to Timedelta, months to pandas offsets) is rejected as ambiguous."""
+    if freq is None: return float(TRADING_DAYS)
+    if not isinstance(freq, str): return float(freq)
+    key = freq.strip().lower()
+    if re.fullmatch(r"\d*m", key):
+        raise ValueError(f"ambiguous bar frequency {freq!r}: use 'min' for minutes or 'monthly'")
+    if key == "infer":
+        if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+            raise ValueError("freq='infer' needs a DatetimeIndex with at least two bars")
+        step = index[:INFER_BARS].to_series().diff().median()
+        if step >= pd.Timedelta(days=28): return float(PERIODS_PER_YEAR["monthly"])
+        if step >= pd.Timedelta(days=5): return float(PERIODS_PER_YEAR["weekly"])
+        key = "daily" if step >= pd.Timedelta(hours=SESSION_HOURS) else str(step)
+    key = _ALIASES.get(key, key)
+    if key in PERIODS_PER_YEAR: return float(PERIODS_PER_YEAR[key])
+    try: step = pd.Timedelta(key)
+    except ValueError: raise ValueError(f"unknown bar frequency {freq!r}") from None
+    if not pd.Timedelta(0) < step < pd.Timedelta(hours=SESSION_HOURS):
+        raise ValueError(f"unknown bar frequency {freq!r}")
+    return TRADING_DAYS * pd.Timedelta(hours=SESSION_HOURS) / step
+
+def _ppy(returns, freq) -> float:
+    return periods_per_year(freq, getattr(returns, "index", None) if isinstance(freq, str) else None)
 
 def equity_curve(returns: pd.Series) -> pd.Series:
     return (1.0 + returns.fillna(0)).cumprod()
 
-def annualized_return(returns: pd.Series) -> float:
+def annualized_return(returns: pd.Series, freq: str|float|None="daily") -> float:
     mean = returns.mean()
-    return (1 + mean) ** TRADING_DAYS - 1
+    return (1 + mean) ** _ppy(returns, freq) - 1
 
-def annualized_vol(returns: pd.Series) -> float:
-    return returns.std(ddof=0) * np.sqrt(TRADING_DAYS)
+def annualized_vol(returns: pd.Series, freq: str|float|None="daily") -> float:
+    return returns.std(ddof=0) * np.sqrt(_ppy(returns, freq))
 
-def sharpe(returns: pd.Series, rf: float=0.0) -> float:
+def sharpe(returns: pd.Series, rf: float=0.0, freq: str|float|None="daily") -> float:
     # rf is annual; convert to per-period approx
-    r_pd = returns - (rf / TRADING_DAYS)
-    vol = annualized_vol(r_pd)
+    n = _ppy(returns, freq)
+    r_pd = returns - (rf / n)
+    vol = annualized_vol(r_pd, n)
     if vol == 0:
         return 0.0
-    return annualized_return(r_pd) / vol
+    return annualized_return(r_pd, n) / vol
 
 def max_drawdown(returns: pd.Series) -> float:
+    return drawdown(returns).min()
+
+def drawdown(returns: pd.Series, eq: pd.Series|None=None) -> pd.Series:
+    eq = equity_curve(returns) if eq is None else eq
+    return (eq / eq.cummax()) - 1.0
+
+def rolling_sharpe(returns: pd.Series, window: int=126, freq: str|float|None="daily") -> pd.Series:
+    r = returns.fillna(0)
+    rm = r.rolling(window).mean()
+    rs = r.rolling(window).std(ddof=0).replace(0, np.nan)
+    return (rm / rs).fillna(0) * np.sqrt(_ppy(returns, freq))
+
+def derived_series(returns: pd.Series, window: int=126, freq: str|float|None="daily") -> dict:
+    """Equity, drawdown and rolling Sharpe plus the summary metrics, each computed once and
+    shared by reports and plots (the equity curve feeds both drawdown and MaxDrawdown)."""
+    n = _ppy(returns, freq)
     eq = equity_curve(returns)
-    peak = eq.cummax()
-    dd = (eq / peak) - 1.0
-    return dd.min()
+    dd = drawdown(returns, eq)
+    summary = {"CAGR": annualized_return(returns, n), "Volatility": annualized_vol(returns, n),
+               "Sharpe": sharpe(returns, freq=n), "MaxDrawdown": dd.min()}
+    return {"equity": eq, "drawdown": dd, "rolling_sharpe": rolling_sharpe(returns, window, n), "summary": summary}
+
+def summary_matrix(returns: np.ndarray, rf: float=0.0, axis: int=0, freq: str|float|None="daily") -> dict[str, np.ndarray]:
+    """CAGR/Volatility/Sharpe/MaxDrawdown for many return paths at once.
+    `returns` is (dates x paths) for axis=0 or (paths x dates) for axis=1; NaN counts as 0.
+    `freq` is a bar frequency or bars-per-year number (`periods_per_year`)."""
+    n = periods_per_year(freq)
+    r = np.nan_to_num(np.asarray(returns, dtype=float), nan=0.0)
+    if r.ndim == 1: r = r[:, None]
+    ann_ret = (1 + r.mean(axis=axis)) ** n - 1
+    vol = r.std(axis=axis) * np.sqrt(n)
+    ann_pd, vol_pd = ann_ret, vol
+    if rf:
+        r_pd = r - (rf / n)
+        ann_pd, vol_pd = (1 + r_pd.mean(axis=axis)) ** n - 1, r_pd.std(axis=axis) * np.sqrt(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sr = np.where(vol_pd == 0, 0.0, ann_pd / vol_pd)
+    eq = np.cumprod(1.0 + r, axis=axis)
+    mdd = (eq / np.maximum.accumulate(eq, axis=axis) - 1.0).min(axis=axis)
+    return {"CAGR": ann_ret, "Volatility": vol, "Sharpe": sr, "MaxDrawdown": mdd}
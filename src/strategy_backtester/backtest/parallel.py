@@ -0,0 +1,86 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np, pandas as pd
+from .engine import BacktestEngine, _filtered_kwargs
+
+class SharedPanel:
+    """A (dates x symbols) float64 price matrix placed in POSIX shared memory.
+    Workers attach by name, so prices are never pickled per task."""
+    def __init__(self, prices: pd.DataFrame):
+        vals = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+        self.shape, self.index, self.columns = vals.shape, prices.index, list(prices.columns)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(vals.nbytes, 1))
+        np.ndarray(self.shape, dtype=np.float64, buffer=self._shm.buf)[:] = vals
+        self.name = self._shm.name
+
+    def close(self):
+        self._shm.close(); self._shm.unlink()
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.close()
+
+# per-process state set by the pool initializer
+_W: dict = {}
+
+def _init_worker(name: str, shape: tuple, index: pd.Index, engine: BacktestEngine):
+    # pool workers share the parent's resource tracker, so attaching here never unlinks the segment
+    shm = shared_memory.SharedMemory(name=name)
+    _W.update(shm=shm, px=np.ndarray(shape, dtype=np.float64, buffer=shm.buf), index=index, engine=engine)
+
+def _run_task(task):
+    j, fn, params = task
+    price = pd.Series(_W["px"][:, j], index=_W["index"])  # zero-copy view over shared memory
+    sig = fn(price, **_filtered_kwargs(fn, **params)).reindex(price.index).fillna(0)
+    res = _W["engine"].run_single_from_signals(price, sig)
+    return sig.to_numpy(dtype=float), res.returns.to_numpy()
+
+def _params_key(params: dict) -> tuple:
+    return tuple(sorted(params.items()))
+
+class UniverseResult:
+    """Per-symbol results keyed (symbol, strategy, params_key); portfolio results keyed (strategy, params_key)."""
+    def __init__(self, per_symbol: dict, portfolio: dict):
+        self.per_symbol, self.portfolio = per_symbol, portfolio
+
+    def summary(self, level: str="portfolio") -> pd.DataFrame:
+        if level == "portfolio":
+            rows = [{"strategy": s, "params": dict(p), **r.summary()} for (s, p), r in self.portfolio.items()]
+        else:
+            rows = [{"symbol": sym, "strategy": s, "params": dict(p), **r.summary()} for (sym, s, p), r in self.per_symbol.items()]
+        return pd.DataFrame(rows)
+
+def run_universe(engine: BacktestEngine, prices: pd.DataFrame, strategies: dict, param_sets: list[dict]|None=None,
+                 max_workers: int|None=None, chunksize: int|None=None) -> UniverseResult:
+    """Backtest symbols x strategies x parameter sets across a process pool.
+
+    Prices live in shared memory; each task ships only (column, fn, params) and returns raw arrays.
+    Results are merged in task order, so output is identical for any worker count.
+    """
+    param_sets = param_sets or [{}]
+    syms = list(prices.columns)
+    combos = [(sname, params) for sname in strategies for params in param_sets]
+    tasks = [(j, strategies[sname], params) for sname, params in combos for j in range(len(syms))]
+    max_workers = max_workers or os.cpu_count() or 1
+    with SharedPanel(prices) as panel:
+        init = (panel.name, panel.shape, panel.index, engine)
+        if max_workers == 1:
+            _init_worker(*init)
+            try: outs = [_run_task(t) for t in tasks]
+            finally: _W.pop("shm").close(); _W.clear()
+        else:
+            chunksize = chunksize or max(1, len(tasks) // (4 * max_workers))
+            with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=init) as ex:
+                outs = list(ex.map(_run_task, tasks, chunksize=chunksize))
+
+    per_symbol, portfolio, it = {}, {}, iter(outs)
+    for sname, params in combos:
+        key, sigs = _params_key(params), {}
+        for sym in syms:
+            sig, net = next(it)
+            sigs[sym] = sig
+            per_symbol[(sym, sname, key)] = engine._result(pd.Series(net, index=prices.index))
+        sig_df = pd.DataFrame(sigs, index=prices.index)
+        portfolio[(sname, key)] = engine.run_multi_from_signals(prices, sig_df)
+    return UniverseResult(per_symbol, portfolio)
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import numpy as np, pandas as pd
+from . import metrics as M
+from .costs import SimpleCostModel
+from .engine import _filtered_kwargs
+from ..strategies import ma_crossover, momentum, mean_reversion
+
+# --- O(1)-per-bar indicator state, vectorized across symbols ---
+
+class RollingWindow:
+    """Trailing window of the last `window` values per column with running sum / sum of squares.
+    NaNs are counted rather than summed, so a column is NaN exactly while its window holds one
+    (the `indicators.kernels` policy). Sums are rebuilt from the buffer once per wrap (amortized
+    O(1)) to stop float drift."""
+    def __init__(self, window: int, n: int):
+        self.window, self.buf = window, np.zeros((window, n))
+        self.pos = self.count = 0
+        self.s, self.s2 = np.zeros(n), np.zeros(n)
+        self.n_nan = np.zeros(n, dtype=np.int64)
+
+    @property
+    def ready(self) -> bool: return self.count >= self.window
+
+    def push(self, x: np.ndarray):
+        old = self.buf[self.pos]
+        bad, old_bad = np.isnan(x), np.isnan(old)
+        v, o = np.where(bad, 0.0, x), np.where(old_bad, 0.0, old)
+        self.s += v - o; self.s2 += v * v - o * o
+        self.n_nan += bad.astype(np.int64) - old_bad
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % self.window; self.count += 1
+        if self.pos == 0:
+            self.s, self.s2 = np.nansum(self.buf, axis=0), np.nansum(self.buf ** 2, axis=0)
+
+    def mean(self) -> np.ndarray:
+        if not self.ready: return np.full(len(self.s), np.nan)
+        return np.where(self.n_nan > 0, np.nan, self.s / self.window)
+
+    def std(self, ddof: int=0) -> np.ndarray:
+        if not self.ready: return np.full(len(self.s), np.nan)
+        var = (self.s2 - self.s * self.s / self.window) / (self.window - ddof)
+        return np.where(self.n_nan > 0, np.nan, np.sqrt(np.maximum(var, 0.0)))
+
+class Lag:
+    """Value from `lag` bars ago (NaN during warm-up)."""
+    def __init__(self, lag: int, n: int):
+        self.lag, self.buf, self.pos, self.count = lag, np.full((lag + 1, n), np.nan), 0, 0
+
+    def push(self, x: np.ndarray) -> np.ndarray:
+        self.buf[self.pos] = x
+        self.pos = (self.pos + 1) % (self.lag + 1); self.count += 1
+        return self.buf[self.pos]  # oldest slot = x[t - lag]
+
+# --- incremental versions of the built-in strategies ---
+
+class _MACrossoverState:
+    def __init__(self, n, short=50, long=200):
+        self.s, self.l = RollingWindow(short, n), RollingWindow(long, n)
+    def push(self, p):
+        self.s.push(p); self.l.push(p)
+        with np.errstate(invalid="ignore"):
+            return (self.s.mean() > self.l.mean()).astype(float)
+
+class _MomentumState:
+    def __init__(self, n, lookback=126):
+        self.lag = Lag(lookback, n)
+    def push(self, p):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (p / self.lag.push(p) - 1 > 0).astype(float)
+
+class _MeanReversionState:
+    def __init__(self, n, z_window=20, z_entry=1.0):
+        self.win, self.z_entry = RollingWindow(z_window, n), z_entry
+    def push(self, p):
+        self.win.push(p)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = (p - self.win.mean()) / self.win.std(ddof=1)
+        return (z < -self.z_entry).astype(float)
+
+STREAMING_STATES = {
+    ma_crossover.signals: _MACrossoverState,
+    momentum.signals: _MomentumState,
+    mean_reversion.signals: _MeanReversionState,
+}
+
+class StreamingEngine:
+    """Stateful bar-by-bar twin of `BacktestEngine.run_single`, applied per symbol.
+
+    Each `update` costs O(n_symbols) regardless of history length: indicators, vol targeting,
+    leverage caps, `SimpleCostModel` costs and running metrics are all carried as state.
+    `freq` is the bar frequency used to annualize (a name or bars per year; not "infer").
+    See `PortfolioStreamingEngine` for the equal-weight portfolio twin.
+    """
+    def __init__(self, symbols: list[str], signals_fn, cost_model: SimpleCostModel|None=None, allow_short: bool=True,
+                 max_leverage: float=1.0, target_ann_vol: float|None=None, vol_window: int=63,
+                 freq: str|float|None="daily", **sig_kwargs):
+        if signals_fn not in STREAMING_STATES:
+            raise ValueError(f"No streaming state for {getattr(signals_fn, '__module__', signals_fn)}")
+        self.symbols, n = list(symbols), len(symbols)
+        self.cost_model = cost_model or SimpleCostModel()
+        self.allow_short, self.max_leverage = allow_short, max_leverage
+        self.target_ann_vol = target_ann_vol
+        self.periods = M.periods_per_year(freq)
+        self.signal = STREAMING_STATES[signals_fn](n, **_filtered_kwargs(signals_fn, **sig_kwargs))
+        m = len(self._columns())    # PnL streams: one per symbol, or one for a portfolio
+        self.vol = RollingWindow(vol_window, m) if target_ann_vol is not None else None
+        self.last_px = np.full(n, np.nan)
+        self.w_next = np.zeros(n)   # constrained target decided at the previous bar
+        self.w_held = np.zeros(n)   # final (vol-scaled) weight of the previous bar
+        # running metrics: Welford mean/M2, equity and drawdown
+        self.n_bars, self.mean, self.m2 = 0, np.zeros(m), np.zeros(m)
+        self.equity, self.peak, self.max_dd = np.ones(m), np.ones(m), np.zeros(m)
+
+    @classmethod
+    def from_engine(cls, engine, symbols: list[str], signals_fn, **sig_kwargs) -> "StreamingEngine":
+        return cls(symbols, signals_fn, cost_model=engine.cost_model, allow_short=engine.allow_short,
+                   max_leverage=engine.max_leverage, target_ann_vol=engine.target_ann_vol,
+                   vol_window=engine.vol_window, freq=engine.freq, **sig_kwargs)
+
+    # per-bar hooks; overridden by PortfolioStreamingEngine
+    def _columns(self) -> list[str]: return self.symbols
+
+    def _pnl(self, w: np.ndarray, ret: np.ndarray) -> np.ndarray: return w * ret
+
+    def _cost(self, w: np.ndarray) -> np.ndarray: return self.cost_model.cost_array(self.w_held, w)
+
+    def _target(self, sig: np.ndarray) -> np.ndarray: return np.clip(sig, -self.max_leverage, self.max_leverage)
+
+    def update(self, prices) -> dict:
+        """Consume one bar of prices (one per symbol); returns the bar's weights, costs and PnL."""
+        p = np.asarray(prices, dtype=float).reshape(-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ret = np.nan_to_num(p / self.last_px - 1, nan=0.0)
+        self.last_px = p
+
+        w = self.w_next
+        if self.vol is not None:  # scale from realized vol of unscaled PnL through the previous bar
+            scale = np.ones_like(w)
+            if self.vol.ready:
+                with np.errstate(divide="ignore"):
+                    scale = np.minimum(self.target_ann_vol / (self.vol.std() * np.sqrt(self.periods)), 10)
+            self.vol.push(self._pnl(w, ret))
+            w = w * scale
+        cost = self._cost(w)
+        pnl = self._pnl(w, ret) - cost
+        self.w_held = w
+
+        sig = self.signal.push(p)
+        if not self.allow_short: sig = np.clip(sig, 0, 1)
+        self.w_next = self._target(sig)
+
+        self.n_bars += 1
+        d = pnl - self.mean
+        self.mean += d / self.n_bars; self.m2 += d * (pnl - self.mean)
+        self.equity *= 1 + pnl
+        self.peak = np.maximum(self.peak, self.equity)
+        self.max_dd = np.minimum(self.max_dd, self.equity / self.peak - 1)
+        return {"weight": w, "target": self.w_next, "cost": cost, "pnl": pnl, "equity": self.equity.copy()}
+
+    def update_many(self, prices: pd.DataFrame) -> pd.DataFrame:
+        """Consume a batch of bars (dates x symbols); returns the PnL panel for those bars."""
+        out = np.vstack([self.update(row)["pnl"] for row in prices[self.symbols].to_numpy(dtype=float)])
+        return pd.DataFrame(out, index=prices.index, columns=self._columns())
+
+    def summary(self) -> pd.DataFrame:
+        """Running `BacktestResult.summary()` metrics per PnL stream."""
+        vol = np.sqrt(self.m2 / max(self.n_bars, 1)) * np.sqrt(self.periods)
+        cagr = (1 + self.mean) ** self.periods - 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(vol == 0, 0.0, cagr / vol)
+        return pd.DataFrame({"CAGR": cagr, "Volatility": vol, "Sharpe": sharpe, "MaxDrawdown": self.max_dd},
+                            index=self._columns())
+
+class PortfolioStreamingEngine(StreamingEngine):
+    """Bar-by-bar twin of `BacktestEngine.run_multi_equal_weight` with one `signals_fn` for every symbol.
+
+    Targets are equal weights among the nonzero signals capped at `max_leverage` gross; vol
+    targeting, costs (on the portfolio turnover) and running metrics apply to the single
+    portfolio PnL stream, labelled "portfolio". A `ConstraintPipeline` or `ExecutionModel` on
+    the engine is not streamed.
+    """
+    def _columns(self) -> list[str]: return ["portfolio"]
+
+    def _pnl(self, w, ret): return np.atleast_1d((w * ret).sum())
+
+    def _cost(self, w):
+        turnover, short_gross = np.abs(w - self.w_held).sum(), np.abs(np.minimum(w, 0.0)).sum()
+        return np.atleast_1d(self.cost_model.cost_from_turnover(turnover, short_gross))
+
+    def _target(self, sig):
+        nz = np.count_nonzero(sig)
+        w = sig / nz if nz else np.zeros_like(sig)
+        gross = np.abs(w).sum()
+        return w * min(self.max_leverage / gross, 1.0) if gross > 0 else w
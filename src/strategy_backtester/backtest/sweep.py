@@ -0,0 +1,92 @@
+from __future__ import annotations
+import inspect, itertools
+import numpy as np, pandas as pd
+from . import metrics as M
+from ..indicators.kernels import rolling_mean, rolling_std, rolling_zscore
+from ..strategies import ma_crossover, momentum, mean_reversion
+
+# --- vectorized signal kernels: price (dates,) + param arrays (P,) -> signals (dates x P) ---
+
+def _ma_crossover(price: np.ndarray, short: np.ndarray, long: np.ndarray) -> np.ndarray:
+    wins, inv = np.unique(np.r_[short, long].astype(int), return_inverse=True)
+    sma = np.column_stack([rolling_mean(price, w) for w in wins])  # one SMA per distinct window, shared by all combos
+    s_ix, l_ix = inv[:len(short)], inv[len(short):]
+    with np.errstate(invalid="ignore"):
+        return (sma[:, s_ix] > sma[:, l_ix]).astype(float)
+
+def _momentum(price: np.ndarray, lookback: np.ndarray) -> np.ndarray:
+    lbs, inv = np.unique(lookback.astype(int), return_inverse=True)
+    n = len(price); t = np.arange(n)[:, None]
+    lo = t - lbs[None, :]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mom = price[:, None] / price[np.maximum(lo, 0)] - 1
+        sig = (mom > 0) & (lo >= 0)
+    return sig[:, inv].astype(float)
+
+def _mean_reversion(price: np.ndarray, z_window: np.ndarray, z_entry: np.ndarray) -> np.ndarray:
+    wins, inv = np.unique(z_window.astype(int), return_inverse=True)
+    z = np.column_stack([rolling_zscore(price, w) for w in wins])
+    with np.errstate(invalid="ignore"):
+        return (z[:, inv] < -np.asarray(z_entry, dtype=float)[None, :]).astype(float)
+
+SWEEP_KERNELS = {
+    ma_crossover.signals: (_ma_crossover, ("short", "long")),
+    momentum.signals: (_momentum, ("lookback",)),
+    mean_reversion.signals: (_mean_reversion, ("z_window", "z_entry")),
+}
+
+def expand_grid(grid: dict|list[dict]) -> pd.DataFrame:
+    """Cartesian product of a {param: values} grid (or pass an explicit list of param dicts)."""
+    if isinstance(grid, dict):
+        keys = list(grid)
+        return pd.DataFrame(list(itertools.product(*(list(np.atleast_1d(grid[k])) for k in keys))), columns=keys)
+    return pd.DataFrame(list(grid))
+
+def _resolve(signals_fn, combos: pd.DataFrame):
+    if signals_fn not in SWEEP_KERNELS:
+        raise ValueError(f"No vectorized sweep kernel for {getattr(signals_fn, '__module__', signals_fn)}")
+    kernel, names = SWEEP_KERNELS[signals_fn]
+    defaults = inspect.signature(signals_fn).parameters
+    args = [combos[k].to_numpy() if k in combos else np.full(len(combos), defaults[k].default) for k in names]
+    return kernel, args
+
+def sweep_returns(engine, price: pd.Series, signals_fn, combos: pd.DataFrame) -> np.ndarray:
+    """Net returns (dates x combos) for every parameter row, mirroring `BacktestEngine.run_single`."""
+    if getattr(engine, "execution", None) is not None:
+        raise ValueError("sweep kernels do not model an ExecutionModel; use run_single per combination")
+    if getattr(engine, "constraints", None) is not None:
+        raise ValueError("sweep kernels do not apply a ConstraintPipeline; use run_single per combination")
+    kernel, args = _resolve(signals_fn, combos)
+    px = price.to_numpy(dtype=float)
+    ret = np.nan_to_num(price.pct_change().to_numpy(dtype=float), nan=0.0)[:, None]
+    w = kernel(px, *args)
+    if not engine.allow_short: np.clip(w, 0, 1, out=w)
+    np.clip(w, -engine.max_leverage, engine.max_leverage, out=w)  # single-asset gross cap
+    w[1:] = w[:-1]; w[0] = 0.0  # trade on next bar
+    if engine.target_ann_vol is not None:
+        rv = rolling_std(w * ret, engine.vol_window, ddof=0)
+        with np.errstate(divide="ignore"):
+            scale = np.minimum(engine.target_ann_vol / (rv * np.sqrt(engine.periods_per_year(price.index))), 10)
+        scale[1:] = scale[:-1]; scale[0] = np.nan
+        w *= np.where(np.isnan(scale), 1.0, scale)
+    w_prev = np.vstack([np.zeros((1, w.shape[1])), w[:-1]])
+    return w * ret - engine.cost_model.cost_array(w_prev, w)
+
+def sweep(engine, prices: pd.Series|pd.DataFrame, signals_fn, grid: dict|list[dict], chunk_size: int=2048,
+          registry=None) -> pd.DataFrame:
+    """Evaluate every grid combination; returns one row of summary metrics per (symbol, combo).
+    A `research.trials.TrialRegistry` passed as `registry` receives every combo's return stream."""
+    combos = expand_grid(grid)
+    frames = prices.to_frame() if isinstance(prices, pd.Series) else prices
+    out = []
+    for sym in frames.columns:
+        px = frames[sym].dropna()
+        for lo in range(0, len(combos), chunk_size):
+            chunk = combos.iloc[lo:lo + chunk_size]
+            R = sweep_returns(engine, px, signals_fn, chunk)
+            stats = M.summary_matrix(R, freq=engine.periods_per_year(px.index))
+            df = chunk.reset_index(drop=True).assign(**stats)
+            if registry is not None: registry.add_matrix(R, px.index, chunk.assign(symbol=sym))
+            if isinstance(prices, pd.DataFrame): df.insert(0, "symbol", sym)
+            out.append(df)
+    return pd.concat(out, ignore_index=True)
@@ -2,10 +2,9 @@ from __future__ import annotations
 import argparse
 import pandas as pd
 
-from .data.alpha_vantage import fetch_daily_adjusted
 from .strategies import ma_crossover, momentum, mean_reversion
 from .backtest.engine import BacktestEngine
-from .utils.plotting import plot_equity, plot_drawdown, plot_rolling_sharpe
+from .backtest.costs import SimpleCostModel
 
 STRATS = {
     "ma_crossover": ma_crossover.signals,
@@ -24,7 +23,17 @@ def main():
     p.add_argument("--show_rolling", action="store_true")
     p.add_argument("--html_report", default=None, help="Write HTML report to this path (or use auto)")
     p.add_argument("--force", action="store_true", help="Force re-download of raw data cache")
+    p.add_argument("--requests_per_min", type=float, default=75.0, help="Alpha Vantage request rate limit when fetching")
     p.add_argument("--no_plot", action="store_true")
+    p.add_argument("--store", default=None, help="Read prices from a local PriceStore dir (or auto) instead of fetching")
+    p.add_argument("--chunk_rows", type=int, default=None,
+                   help="With --store: stream bars from disk in chunks of this many rows (out-of-core portfolio run)")
+    p.add_argument("--freq", default="daily",
+                   help="Bar frequency for annualization: minute, hourly, daily, an offset like 5min, or infer")
+    p.add_argument("--cache", action="store_true", help="Reuse cached signals/results under PROC_DIR/cache")
+    p.add_argument("--workers", type=int, default=1, help="Process-pool workers for multi-symbol runs")
+    p.add_argument("--profile", nargs="?", const="auto", default=None,
+                   help="Record stage timings/peak memory; write JSON + folded stacks to this path stem (or auto)")
     # Strategy knobs
     p.add_argument("--short", type=int, default=50)
     p.add_argument("--long", type=int, default=200)
@@ -37,26 +46,58 @@ def main():
     start = pd.to_datetime(args.start) if args.start else None  # NAIVE
     end = pd.to_datetime(args.end) if args.end else None        # NAIVE
 
-    frames = []
-    for s in syms:
-        df = fetch_daily_adjusted(s, force=args.force)
-        if start is not None:
-            df = df[df.index >= start]
-        if end is not None:
-            df = df[df.index <= end]
-        frames.append(df["adj_close"].rename(s))
-    prices = pd.concat(frames, axis=1).dropna(how="all").ffill().dropna()
+    from .utils.profiling import Profiler, NULL_PROFILER
+    prof = Profiler() if args.profile else NULL_PROFILER
 
-    engine = BacktestEngine(cost_bps=args.cost_bps)
+    with prof.stage("load_data"):
+        if args.store is not None:
+            from .data.store import PriceStore
+            store = PriceStore(None if args.store.lower() == "auto" else args.store)
+            # chunked runs read the store block by block instead (run_chunked ffills the same way)
+            prices = None if args.chunk_rows else store.load("adj_close", symbols=syms, start=start, end=end).dropna(how="all").ffill().dropna()
+        else:
+            from .data.alpha_vantage import raw_path
+            from .data.ingest import ingest
+            from .data.store import read_raw_file
+            rep = ingest(syms, force=args.force, rate=args.requests_per_min / 60)
+            bad = rep[rep["status"] == "failed"]
+            if len(bad):
+                raise SystemExit("Fetch failed: " + "; ".join(f"{s}: {e}" for s, e in bad["error"].items()))
+            frames = []
+            for s in syms:
+                df = read_raw_file(raw_path(s))
+                if start is not None:
+                    df = df[df.index >= start]
+                if end is not None:
+                    df = df[df.index <= end]
+                frames.append(df["adj_close"].rename(s))
+            prices = pd.concat(frames, axis=1).dropna(how="all").ffill().dropna()
+
+    cache = None
+    if args.cache:
+        from .utils.cache import ResultCache
+        cache = ResultCache()
+    engine = BacktestEngine(cost_model=SimpleCostModel(fee_bps=args.cost_bps), cache=cache,
+                            profiler=prof if prof.enabled else None, freq=args.freq)
     strat = STRATS[args.strategy]
 
-    if len(syms) == 1:
+    if prices is None:
+        res = engine.run_chunked(store, strat, chunk_rows=args.chunk_rows, symbols=syms, start=start, end=end,
+                                 short=args.short, long=args.long, lookback=args.lookback,
+                                 z_window=args.z_window, z_entry=args.z_entry)
+    elif len(syms) == 1:
         res = engine.run_single(
             prices.iloc[:, 0], strat,
             short=args.short, long=args.long,
             lookback=args.lookback,
             z_window=args.z_window, z_entry=args.z_entry
         )
+    elif args.workers > 1:
+        from .backtest.parallel import run_universe
+        params = dict(short=args.short, long=args.long, lookback=args.lookback,
+                      z_window=args.z_window, z_entry=args.z_entry)
+        out = run_universe(engine, prices, {args.strategy: strat}, [params], max_workers=args.workers)
+        res = next(iter(out.portfolio.values()))
     else:
         signals_map = {s: strat for s in syms}
         res = engine.run_multi_equal_weight(
@@ -66,28 +107,47 @@ def main():
             z_window=args.z_window, z_entry=args.z_entry
         )
 
+    with prof.stage("metrics", rows=len(res.returns)):
+        summary = res.summary()
     print("=== Backtest Summary ===")
-    for k, v in res.summary().items():
+    for k, v in summary.items():
         print(f"{k:>12}: {v: .4f}")
 
+    if not args.no_plot or args.show_drawdown or args.show_rolling:
+        from .utils.plotting import plot_equity, plot_drawdown, plot_rolling_sharpe  # pulls in pyplot
+    with prof.stage("plots"):
         if not args.no_plot:
-        plot_equity(res.returns, title=f"{args.strategy} on {','.join(syms)}")
-    if args.show_drawdown:
-        plot_drawdown(res.returns, title=f"Drawdown on {','.join(syms)}")
-    if args.show_rolling:
-        plot_rolling_sharpe(res.returns)
+            plot_equity(res.returns, title=f"{args.strategy} on {','.join(syms)}", derived=res.derived())
+        if args.show_drawdown:
+            plot_drawdown(res.returns, title=f"Drawdown on {','.join(syms)}", derived=res.derived())
+        if args.show_rolling:
+            plot_rolling_sharpe(res.returns, derived=res.derived())
     if args.html_report is not None:
         from pathlib import Path
-        from .utils.config import REPORT_DIR
+        from .utils.config import REPORT_DIR, ensure_dir
         from .utils.report import write_html_report
         out = args.html_report
         if out.lower() == "auto":
-            out = str((REPORT_DIR / f"report_{args.strategy}_{'_'.join(syms)}.html").resolve())
+            out = str((ensure_dir(REPORT_DIR) / f"report_{args.strategy}_{'_'.join(syms)}.html").resolve())
         params = {"cost_bps": args.cost_bps, "short": args.short, "long": args.long,
                   "lookback": args.lookback, "z_window": args.z_window, "z_entry": args.z_entry}
-        path = write_html_report(res.returns, title=f"{args.strategy} on {','.join(syms)}", out_path=out, params=params)
+        with prof.stage("report", rows=len(res.returns)):
+            path = write_html_report(res.returns, title=f"{args.strategy} on {','.join(syms)}", out_path=out, params=params,
+                                     derived=res.derived())
         print(f"[saved] {path}")
 
+    if prof.enabled:
+        from pathlib import Path
+        from .utils.config import REPORT_DIR, ensure_dir
+        stem = args.profile
+        if stem.lower() == "auto":
+            stem = str(ensure_dir(REPORT_DIR) / f"profile_{args.strategy}_{'_'.join(syms)}")
+        prof.close()
+        print("=== Profile ===")
+        print(prof.table().to_string(float_format=lambda x: f"{x:.4f}"))
+        prof.to_json(f"{stem}.json"); prof.to_collapsed(f"{stem}.folded")
+        print(f"[saved] {stem}.json, {stem}.folded")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,48 @@
+from __future__ import annotations
+from pathlib import Path
+import pandas as pd
+
+BASE_URL = "https://www.alphavantage.co/query"
+
+class AlphaVantageError(RuntimeError):
+    """The API answered with an error payload (bad symbol, bad key, ...); retrying will not help."""
+
+class RateLimited(RuntimeError):
+    """The API answered with a throttling note instead of data; retry after a pause."""
+
+def raw_path(symbol: str, raw_dir: str|Path|None=None) -> Path:
+    """Cache file for one symbol: RAW_DIR/<SYMBOL>_daily_adjusted.json (the layout `PriceStore.ingest_raw` reads)."""
+    if raw_dir is None:
+        from ..utils.config import RAW_DIR
+        raw_dir = RAW_DIR
+    return Path(raw_dir) / f"{symbol.upper()}_daily_adjusted.json"
+
+def request_params(symbol: str, api_key: str|None=None, outputsize: str="full") -> dict:
+    if api_key is None:
+        from ..utils import config
+        api_key = config.ALPHAVANTAGE_API_KEY
+    if not api_key: raise AlphaVantageError("ALPHAVANTAGE_API_KEY is not set (see .env.example)")
+    return {"function": "TIME_SERIES_DAILY_ADJUSTED", "symbol": symbol.upper(), "outputsize": outputsize,
+            "datatype": "json", "apikey": api_key}
+
+def check_payload(payload: dict) -> str:
+    """Validate a decoded response; returns the latest bar date (YYYY-MM-DD)."""
+    if "Error Message" in payload: raise AlphaVantageError(payload["Error Message"])
+    ts = next((v for k, v in payload.items() if k.startswith("Time Series")), None)
+    if ts is None:
+        # "Note"/"Information" are the API's throttling/quota messages
+        raise RateLimited(payload.get("Note") or payload.get("Information") or "response has no time series")
+    if not ts: raise AlphaVantageError("empty time series")
+    return max(ts)
+
+def fetch_daily_adjusted(symbol: str, force: bool=False, raw_dir: str|Path|None=None, **ingest_kwargs) -> pd.DataFrame:
+    """Daily OHLCV + adj_close for one symbol, served from the raw cache unless stale or `force`.
+
+    Goes through `ingest.Ingestor` (rate limit, retry, atomic cache writes). For many symbols
+    call `ingest.ingest(symbols)` once instead of looping over this function.
+    """
+    from .ingest import ingest
+    from .store import read_raw_file
+    rep = ingest([symbol], force=force, raw_dir=raw_dir, **ingest_kwargs)
+    if rep["status"].iloc[0] == "failed": raise AlphaVantageError(f"{symbol}: {rep['error'].iloc[0]}")
+    return read_raw_file(raw_path(symbol, raw_dir))
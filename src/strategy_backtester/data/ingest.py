@@ -0,0 +1,157 @@
+"""Concurrent, rate-limited Alpha Vantage ingestion into the raw cache (RAW_DIR).
+
+`Ingestor.fetch_all` runs one coroutine per symbol. A shared `TokenBucket` caps the request rate,
+and the blocking HTTP calls run on a thread pool over one pooled `requests.Session`, so connections
+are reused across symbols. Throttling replies, 429/5xx and network errors are retried with jittered
+exponential backoff. Validated responses are written atomically (tmp + os.replace) together with a
+`<file>.meta` JSON sidecar (fetch time, last bar date, content hash): symbols fetched less than
+`max_age` seconds ago are skipped without a request, and a refetch with an identical body leaves the
+cached file untouched.
+"""
+from __future__ import annotations
+import asyncio, hashlib, json, random, time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pandas as pd
+import requests
+from .alpha_vantage import BASE_URL, AlphaVantageError, RateLimited, check_payload, raw_path, request_params
+from .store import _atomic_bytes
+
+RETRY_STATUS = frozenset({500, 502, 503, 504})
+
+def meta_path(path: Path) -> Path: return path.with_name(path.name + ".meta")
+
+def read_meta(path: Path) -> dict|None:
+    """Freshness sidecar of a cached raw file, or None if either file is missing/unreadable."""
+    try:
+        return json.loads(meta_path(path).read_text()) if path.exists() else None
+    except (OSError, ValueError):
+        return None
+
+class TokenBucket:
+    """`rate` tokens per second with bursts of up to `capacity`.
+
+    `acquire` reserves the next token immediately (the balance may go negative) and sleeps until
+    it is due, so waiters are served in call order without a lock.
+    """
+    def __init__(self, rate: float, capacity: float=1.0, clock=time.monotonic):
+        if rate <= 0: raise ValueError("rate must be > 0")
+        self.rate, self.capacity, self.clock = rate, max(float(capacity), 1.0), clock
+        self.tokens, self.t = self.capacity, clock()
+
+    def reserve(self) -> float:
+        """Take one token; returns the seconds to wait before using it."""
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.t) * self.rate) - 1.0
+        self.t = now
+        return max(0.0, -self.tokens / self.rate)
+
+    async def acquire(self):
+        wait = self.reserve()
+        if wait > 0: await asyncio.sleep(wait)
+
+class Ingestor:
+    """Fetch TIME_SERIES_DAILY_ADJUSTED for many symbols concurrently into `raw_dir`.
+
+    rate/burst: token bucket in requests per second (default: 75/min, the smallest premium tier;
+    the free tier is 5/min). concurrency: in-flight requests (thread pool and connection pool size).
+    """
+    def __init__(self, raw_dir: str|Path|None=None, api_key: str|None=None, base_url: str=BASE_URL,
+                 rate: float=75 / 60, burst: float=1.0, concurrency: int=8, max_retries: int=4,
+                 backoff: float=1.0, max_backoff: float=60.0, timeout: float=30.0,
+                 max_age: float=12 * 3600, outputsize: str="full", session: requests.Session|None=None):
+        self.raw_dir, self.api_key, self.base_url = raw_dir, api_key, base_url
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency, self.max_retries = concurrency, max_retries
+        self.backoff, self.max_backoff, self.timeout = backoff, max_backoff, timeout
+        self.max_age, self.outputsize = max_age, outputsize
+        self._session = session
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            s = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+            s.mount("http://", adapter); s.mount("https://", adapter)
+            self._session = s
+        return self._session
+
+    def close(self):
+        if self._session is not None: self._session.close(); self._session = None
+
+    def is_fresh(self, symbol: str, now: float|None=None) -> bool:
+        meta = read_meta(raw_path(symbol, self.raw_dir))
+        return meta is not None and (time.time() if now is None else now) - meta["fetched_at"] < self.max_age
+
+    def delay(self, attempt: int, retry_after: str|None=None) -> float:
+        """Backoff before retry `attempt` (0-based): Retry-After if given, else jittered exponential."""
+        if retry_after:
+            try: return min(float(retry_after), self.max_backoff)
+            except ValueError: pass
+        d = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return d * (0.5 + 0.5 * random.random())
+
+    # --- blocking parts (thread pool) ---
+    def _download(self, symbol: str) -> tuple[bytes, str]:
+        r = self.session.get(self.base_url, params=request_params(symbol, self.api_key, self.outputsize), timeout=self.timeout)
+        if r.status_code == 429: raise RateLimited(r.headers.get("Retry-After") or "HTTP 429")
+        if r.status_code in RETRY_STATUS: raise requests.HTTPError(f"HTTP {r.status_code}")
+        if r.status_code != 200: raise AlphaVantageError(f"HTTP {r.status_code}")
+        return r.content, check_payload(json.loads(r.content))
+
+    def _save(self, symbol: str, body: bytes, last_date: str) -> str:
+        path = raw_path(symbol, self.raw_dir)
+        digest = hashlib.sha256(body).hexdigest()
+        old = read_meta(path)
+        status = "unchanged" if old is not None and old.get("sha256") == digest else "updated"
+        if status == "updated": _atomic_bytes(path, body)
+        # the sidecar goes last: its presence means the data file is complete
+        meta = {"symbol": symbol, "fetched_at": time.time(), "last_date": last_date, "sha256": digest, "bytes": len(body)}
+        _atomic_bytes(meta_path(path), json.dumps(meta).encode())
+        return status
+
+    # --- async API ---
+    async def fetch(self, symbol: str, force: bool=False, pool: ThreadPoolExecutor|None=None) -> dict:
+        """Fetch one symbol unless fresh; returns a report row (never raises for per-symbol failures)."""
+        symbol = symbol.upper()
+        row = {"symbol": symbol, "status": "fresh", "attempts": 0, "last_date": None, "error": None}
+        if not force and self.is_fresh(symbol):
+            row["last_date"] = read_meta(raw_path(symbol, self.raw_dir)).get("last_date")
+            return row
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            await self.bucket.acquire()
+            row["attempts"] += 1
+            try:
+                body, last = await loop.run_in_executor(pool, self._download, symbol)
+                row["status"] = await loop.run_in_executor(pool, self._save, symbol, body, last)
+                row["last_date"], row["error"] = last, None
+                return row
+            except AlphaVantageError as e:
+                row["status"], row["error"] = "failed", str(e)
+                return row
+            except (RateLimited, OSError, ValueError) as e:  # throttled, network/5xx (requests errors are OSErrors), bad JSON
+                row["status"], row["error"] = "failed", f"{type(e).__name__}: {e}"
+                if attempt < self.max_retries:
+                    await asyncio.sleep(self.delay(attempt, str(e) if isinstance(e, RateLimited) else None))
+        return row
+
+    async def fetch_all(self, symbols, force: bool=False) -> pd.DataFrame:
+        """Fetch every symbol concurrently; returns a report indexed by symbol
+        (status: fresh | updated | unchanged | failed)."""
+        from ..utils.config import ensure_dir
+        syms = list(dict.fromkeys(s.upper() for s in symbols))
+        if syms: ensure_dir(raw_path(syms[0], self.raw_dir).parent)
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix="ingest") as pool:
+            rows = await asyncio.gather(*(self.fetch(s, force, pool) for s in syms))
+        cols = ["symbol", "status", "attempts", "last_date", "error"]
+        return pd.DataFrame(rows, columns=cols).set_index("symbol")
+
+def ingest(symbols, force: bool=False, **kwargs) -> pd.DataFrame:
+    """Blocking wrapper: `Ingestor(**kwargs).fetch_all(symbols, force)` on a fresh event loop.
+    Inside a running loop (e.g. Jupyter) await `Ingestor.fetch_all` directly."""
+    ing = Ingestor(**kwargs)
+    try:
+        return asyncio.run(ing.fetch_all(symbols, force))
+    finally:
+        ing.close()
@@ -0,0 +1,157 @@
+from __future__ import annotations
+import json, os
+from pathlib import Path
+import numpy as np, pandas as pd
+
+FIELDS = ("open", "high", "low", "close", "adj_close", "volume")
+
+# Alpha Vantage TIME_SERIES_DAILY_ADJUSTED keys -> store field names
+_AV_KEYS = {"1. open": "open", "2. high": "high", "3. low": "low", "4. close": "close",
+            "5. adjusted close": "adj_close", "6. volume": "volume"}
+
+def read_raw_file(path: str|Path) -> pd.DataFrame:
+    """Parse one cached raw file (.csv with a date column/index, or Alpha Vantage .json) into OHLCV."""
+    path = Path(path)
+    if path.suffix == ".json":
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        ts = next(v for k, v in payload.items() if k.startswith("Time Series"))
+        df = pd.DataFrame.from_dict(ts, orient="index").rename(columns=_AV_KEYS)
+    else:
+        df = pd.read_csv(path, index_col=0)
+        df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
+    df.index = pd.to_datetime(df.index)
+    cols = [c for c in FIELDS if c in df.columns]
+    return df[cols].astype(float).sort_index()
+
+class PriceStore:
+    """Aligned columnar price store: one raw row-major float64 (dates x symbols) file per field
+    plus a shared int64 date index. Reads are np.memmap views, appends write only the new rows.
+
+    Layout under `root`: meta.json, dates.i64, <field>.f64
+    """
+    def __init__(self, root: str|Path|None=None):
+        if root is None:
+            from ..utils.config import PROC_DIR
+            root = PROC_DIR / "store"
+        self.root = Path(root)
+        self._meta = None
+
+    # --- metadata ---
+    @property
+    def meta(self) -> dict:
+        if self._meta is None:
+            p = self.root / "meta.json"
+            self._meta = json.loads(p.read_text()) if p.exists() else {"symbols": [], "fields": [], "n_dates": 0}
+        return self._meta
+
+    @property
+    def symbols(self) -> list[str]: return list(self.meta["symbols"])
+    @property
+    def fields(self) -> list[str]: return list(self.meta["fields"])
+    def __len__(self): return self.meta["n_dates"]
+
+    def _write_meta(self, meta: dict):
+        tmp = self.root / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.root / "meta.json")  # atomic: readers see old or new, never partial
+        self._meta = meta
+
+    # --- reads ---
+    @property
+    def dates(self) -> pd.DatetimeIndex:
+        n = len(self)
+        if n == 0: return pd.DatetimeIndex([])
+        return pd.DatetimeIndex(np.memmap(self.root / "dates.i64", dtype=np.int64, mode="r", shape=(n,)).astype("datetime64[ns]"))
+
+    def array(self, field: str="adj_close") -> np.ndarray:
+        """Read-only memmap of a whole (dates x symbols) field; no bytes are parsed or copied."""
+        if field not in self.meta["fields"]: raise KeyError(f"field {field!r} not in store")
+        shape = (len(self), len(self.meta["symbols"]))
+        if 0 in shape: return np.empty(shape)
+        return np.memmap(self.root / f"{field}.f64", dtype=np.float64, mode="r", shape=shape)
+
+    def load(self, field: str="adj_close", symbols: list[str]|None=None, start=None, end=None) -> pd.DataFrame:
+        """Field panel as a DataFrame over the memmap. Date slicing stays zero-copy;
+        selecting a symbol subset copies only those columns."""
+        arr, dates, cols = self.array(field), self.dates, self.symbols
+        lo = 0 if start is None else dates.searchsorted(pd.Timestamp(start), "left")
+        hi = len(dates) if end is None else dates.searchsorted(pd.Timestamp(end), "right")
+        arr, dates = arr[lo:hi], dates[lo:hi]
+        if symbols is not None:
+            pos = {s: i for i, s in enumerate(cols)}
+            missing = [s for s in symbols if s not in pos]
+            if missing: raise KeyError(f"symbols not in store: {missing}")
+            ix = [pos[s] for s in symbols]
+            arr, cols = arr[:, ix], list(symbols)
+        return pd.DataFrame(arr, index=dates, columns=cols, copy=False)
+
+    # --- writes ---
+    def write(self, panels: dict[str, pd.DataFrame]):
+        """(Re)write the whole store from {field: (dates x symbols) DataFrame} panels."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        dates, syms = _union_axes(panels.values())
+        for field, df in panels.items():
+            vals = df.reindex(index=dates, columns=syms).to_numpy(dtype=np.float64)
+            _atomic_bytes(self.root / f"{field}.f64", np.ascontiguousarray(vals).tobytes())
+        _atomic_bytes(self.root / "dates.i64", dates.values.astype("datetime64[ns]").astype(np.int64).tobytes())
+        self._write_meta({"symbols": syms, "fields": list(panels), "n_dates": len(dates)})
+
+    def append(self, panels: dict[str, pd.DataFrame]) -> int:
+        """Append dates after the last stored date; returns the number of rows added.
+        New symbols or fields force a one-off rewrite with the widened layout."""
+        if len(self) == 0: self.write(panels); return len(self)
+        last = self.dates[-1]
+        new = {f: df.loc[df.index > last] for f, df in panels.items()}
+        new_syms = set().union(*(df.columns for df in new.values())) - set(self.symbols)
+        if new_syms or set(new) - set(self.fields):
+            # stored values win; incoming panels fill new symbols' full history and the new dates
+            full = {f: (self.load(f).combine_first(panels[f]) if f in panels else self.load(f)) if f in self.fields
+                    else panels[f] for f in list(self.fields) + [f for f in panels if f not in self.fields]}
+            n0 = len(self); self.write(full); return len(self) - n0
+        dates, _ = _union_axes(new.values())
+        if len(dates) == 0: return 0
+        n, syms = len(self), self.symbols
+        row_bytes = len(syms) * 8
+        for field in self.fields:
+            df = new.get(field, pd.DataFrame())
+            vals = df.reindex(index=dates, columns=syms).to_numpy(dtype=np.float64)
+            _append_bytes(self.root / f"{field}.f64", n * row_bytes, np.ascontiguousarray(vals).tobytes())
+        _append_bytes(self.root / "dates.i64", n * 8, dates.values.astype("datetime64[ns]").astype(np.int64).tobytes())
+        self._write_meta(dict(self.meta, n_dates=n + len(dates)))
+        return len(dates)
+
+    def ingest_frames(self, frames: dict[str, pd.DataFrame]) -> int:
+        """Append per-symbol OHLCV frames (as returned by the data fetchers)."""
+        fields = [f for f in FIELDS if any(f in df.columns for df in frames.values())]
+        panels = {f: pd.DataFrame({s: df[f] for s, df in frames.items() if f in df.columns}) for f in fields}
+        return self.append(panels)
+
+    def ingest_raw(self, raw_dir: str|Path|None=None, symbols: list[str]|None=None) -> int:
+        """Build/extend the store from raw files already on disk (fully offline)."""
+        if raw_dir is None:
+            from ..utils.config import RAW_DIR
+            raw_dir = RAW_DIR
+        frames = {}
+        for p in sorted(Path(raw_dir).iterdir()):
+            if p.suffix not in (".csv", ".json"): continue
+            sym = p.stem.split("_")[0].upper()
+            if symbols is None or sym in symbols:
+                frames[sym] = read_raw_file(p)
+        return self.ingest_frames(frames) if frames else 0
+
+def _union_axes(frames) -> tuple[pd.DatetimeIndex, list[str]]:
+    dates, syms = pd.DatetimeIndex([]), []
+    for df in frames:
+        dates = dates.union(pd.DatetimeIndex(df.index))
+        syms += [c for c in df.columns if c not in syms]
+    return dates, syms
+
+def _atomic_bytes(path: Path, data: bytes):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f: f.write(data)
+    os.replace(tmp, path)
+
+def _append_bytes(path: Path, committed: int, data: bytes):
+    with open(path, "r+b") as f:
+        f.truncate(committed)  # drop bytes from any interrupted append not recorded in meta.json
+        f.seek(committed); f.write(data)
@@ -0,0 +1,174 @@
+"""Rolling-indicator kernels on raw float64 arrays (1-D series or 2-D dates x assets panels).
+
+Window statistics use pandas `rolling(window)` semantics (NaN until `window` observations, NaN if
+the window holds a NaN). With numba installed the window sums come from a compiled single pass;
+otherwise from NumPy cumulative sums. Both paths share the same finalization formulas. numba is
+only imported (and the loops compiled or loaded from its cache) on the first kernel call.
+"""
+from __future__ import annotations
+import importlib.util
+import numpy as np, pandas as pd
+
+USE_NUMBA = importlib.util.find_spec("numba") is not None  # optional JIT
+_JIT: dict = {}
+
+def _jitted(fn):
+    """`numba.njit(cache=True)` wrapper of a loop kernel, built on first use."""
+    if fn not in _JIT:
+        from numba import njit
+        _JIT[fn] = njit(cache=True)(fn)
+    return _JIT[fn]
+
+# loop kernels, compiled through `_jitted`
+def _nb_window_sums(x, window, order):
+    # running power sums about a local center that is reset once per window (amortized O(1)),
+    # which bounds both cancellation and float drift; rows outer for C-order access
+    T, N = x.shape
+    out = np.zeros((order, T, N))
+    center = np.zeros((T, N))
+    invalid = np.ones((T, N), dtype=np.bool_)
+    acc = np.zeros((order, N))
+    c = np.zeros(N)
+    n_nan = np.zeros(N, dtype=np.int64)
+    for t in range(T):
+        for j in range(N):
+            v = x[t, j]
+            if v != v:
+                n_nan[j] += 1
+            else:
+                p = 1.0
+                for k in range(order):
+                    p *= v - c[j]; acc[k, j] += p
+            if t >= window:
+                o = x[t - window, j]
+                if o != o:
+                    n_nan[j] -= 1
+                else:
+                    p = 1.0
+                    for k in range(order):
+                        p *= o - c[j]; acc[k, j] -= p
+        if t % window == window - 1:
+            for j in range(N):
+                if n_nan[j] > 0:
+                    continue
+                cj = 0.0
+                for i in range(t - window + 1, t + 1):
+                    cj += x[i, j]
+                cj /= window
+                for k in range(order):
+                    acc[k, j] = 0.0
+                for i in range(t - window + 1, t + 1):
+                    p = 1.0
+                    for k in range(order):
+                        p *= x[i, j] - cj; acc[k, j] += p
+                c[j] = cj
+        if t >= window - 1:
+            for j in range(N):
+                center[t, j] = c[j]
+                if n_nan[j] == 0:
+                    invalid[t, j] = False
+                    for k in range(order):
+                        out[k, t, j] = acc[k, j]
+    return out, center, invalid
+
+def _nb_ema(x, alpha):
+    T, N = x.shape
+    out = np.empty((T, N))
+    for j in range(N):
+        y = x[0, j]
+        out[0, j] = y
+        for t in range(1, T):
+            y = (1.0 - alpha) * y + alpha * x[t, j]
+            out[t, j] = y
+    return out
+
+def _as_2d(x) -> tuple[np.ndarray, bool]:
+    a = np.asarray(x, dtype=np.float64)
+    return (a[:, None], True) if a.ndim == 1 else (a, False)
+
+def _np_window_sums(x: np.ndarray, window: int, order: int, block: int|None=None):
+    # prefix sums per block of rows, centered on the block's own mean to limit cancellation
+    T, N = x.shape
+    out = np.zeros((order, T, N))
+    center = np.zeros((T, N))
+    invalid = np.ones((T, N), dtype=bool)
+    block = block or max(8 * window, 1024)
+    for b0 in range(window - 1, T, block):
+        b1 = min(b0 + block, T)
+        seg = x[b0 - window + 1:b1]
+        nan = np.isnan(seg)
+        with np.errstate(invalid="ignore"):
+            c = np.nan_to_num(np.nanmean(seg, axis=0)) if (~nan).any() else np.zeros(N)
+        xc = np.where(nan, 0.0, seg - c)
+        cn = np.vstack([np.zeros((1, N)), np.cumsum(nan, axis=0)])
+        invalid[b0:b1] = (cn[window:] - cn[:-window]) > 0
+        center[b0:b1] = c
+        p = np.ones_like(xc)
+        for k in range(order):
+            p = p * xc
+            cs = np.vstack([np.zeros((1, N)), np.cumsum(p, axis=0)])
+            out[k, b0:b1] = cs[window:] - cs[:-window]
+    return out, center, invalid
+
+def _window_moments(x, window: int, order: int):
+    """Locally centered window power sums S1..S_order, the per-row centers and the invalid mask."""
+    a, flat = _as_2d(x)
+    sums, c, invalid = (_jitted(_nb_window_sums) if USE_NUMBA else _np_window_sums)(np.ascontiguousarray(a), int(window), order)
+    return sums, c, invalid, flat
+
+def _finish(out: np.ndarray, invalid: np.ndarray, flat: bool) -> np.ndarray:
+    out[invalid] = np.nan
+    return out[:, 0] if flat else out
+
+def rolling_mean(x, window: int) -> np.ndarray:
+    (s1,), c, invalid, flat = _window_moments(x, window, 1)
+    return _finish(s1 / window + c, invalid, flat)
+
+def rolling_std(x, window: int, ddof: int=1) -> np.ndarray:
+    (s1, s2), _, invalid, flat = _window_moments(x, window, 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.maximum(s2 - s1 * s1 / window, 0.0) / (window - ddof)
+    return _finish(np.sqrt(var), invalid, flat)
+
+def rolling_zscore(x, window: int, ddof: int=1) -> np.ndarray:
+    """(x - rolling mean) / rolling std, as used by mean-reversion signals."""
+    (s1, s2), c, invalid, flat = _window_moments(x, window, 2)
+    a, _ = _as_2d(x)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sd = np.sqrt(np.maximum(s2 - s1 * s1 / window, 0.0) / (window - ddof))
+        z = (a - (s1 / window + c)) / sd
+    return _finish(z, invalid, flat)
+
+def rolling_skew(x, window: int) -> np.ndarray:
+    """Bias-corrected rolling skew (pandas `rolling().skew()`; 0 for flat windows).
+
+    Deviation: after a NaN run of at least `window` rows, pandas keeps returning NaN for the rest
+    of the column, while this kernel resumes once a full NaN-free window is available again
+    (the values then equal pandas on the data after the gap)."""
+    (s1, s2, s3), _, invalid, flat = _window_moments(x, window, 3)
+    w = float(window)
+    A = s1 / w
+    B = np.maximum(s2 / w - A * A, 0.0)
+    C = s3 / w - A ** 3 - 3 * A * B
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sk = np.where(B <= 1e-14, 0.0, np.sqrt(w * (w - 1)) * C / ((w - 2) * B ** 1.5))
+    if window < 3: invalid = np.ones_like(invalid)
+    return _finish(sk, invalid, flat)
+
+def ema(x, span: int) -> np.ndarray:
+    """`ewm(span=span, adjust=False).mean()`. The recursion is sequential, so gaps (NaN) and the
+    no-JIT path use pandas' compiled ewm, which owns the NaN-weighting rules."""
+    a, flat = _as_2d(x)
+    if USE_NUMBA and len(a) and not np.isnan(a).any():
+        out = _jitted(_nb_ema)(np.ascontiguousarray(a), 2.0 / (span + 1))
+    else:
+        out = pd.DataFrame(a).ewm(span=span, adjust=False).mean().to_numpy()
+    return out[:, 0] if flat else out
+
+def lookback_returns(x, lookback: int) -> np.ndarray:
+    """x[t] / x[t - lookback] - 1 (NaN during warm-up)."""
+    a, flat = _as_2d(x)
+    out = np.full(a.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[lookback:] = a[lookback:] / a[:-lookback] - 1 if lookback > 0 else 0.0
+    return out[:, 0] if flat else out
@@ -1,7 +1,8 @@
 import pandas as pd
+from . import kernels as K
 
 def sma(s: pd.Series, window: int) -> pd.Series:
-    return s.rolling(window=window, min_periods=window).mean()
+    return pd.Series(K.rolling_mean(s.to_numpy(dtype=float), window), index=s.index, name=s.name)
 
 def ema(s: pd.Series, span: int) -> pd.Series:
-    return s.ewm(span=span, adjust=False).mean()
+    return pd.Series(K.ema(s.to_numpy(dtype=float), span), index=s.index, name=s.name)
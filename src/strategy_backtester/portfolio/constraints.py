@@ -1,5 +1,7 @@
 from __future__ import annotations
+import warnings
 import numpy as np, pandas as pd
+from ..indicators.kernels import USE_NUMBA, _jitted
 
 def cap_turnover(w_prev: pd.Series, w_target: pd.Series, max_turnover: float=0.2) -> pd.Series:
     """Limit ||Δw||_1 <= max_turnover."""
@@ -8,16 +10,14 @@ def cap_turnover(w_prev: pd.Series, w_target: pd.Series, max_turnover: float=0.2
     if t <= max_turnover or t == 0: return w_target
     return w_prev + delta * (max_turnover / t)
 
-def cap_sector(weights: pd.Series, sector_map: dict[str,str], max_per_sector: float=0.3) -> pd.Series:
-    w = weights.copy()
-    sectors = {}
-    for sym, sec in sector_map.items():
-        sectors.setdefault(sec, []).append(sym)
-    for sec, names in sectors.items():
-        s = w[names].sum()
-        if s > max_per_sector and s > 0:
-            w[names] *= max_per_sector / s
-    return w
+def cap_sector(weights: pd.Series, sector_map: dict[str,str], max_per_sector: float=0.3,
+               two_sided: bool=False) -> pd.Series:
+    """Scale a sector's names so its net weight is <= max_per_sector; with `two_sided`, net-short
+    sectors are capped at -max_per_sector too."""
+    sec = pd.Series(sector_map).reindex(weights.index)
+    s = weights.groupby(sec).transform("sum")  # names outside the map: NaN sum -> unchanged
+    if two_sided: s = s.abs()
+    return weights * np.where(s > max_per_sector, max_per_sector / s, 1.0)
 
 def dollar_neutralize(w: pd.Series) -> pd.Series:
     pos = w.clip(lower=0).sum(); neg = w.clip(upper=0).sum()
@@ -28,3 +28,205 @@ def beta_neutralize(w: pd.Series, betas: pd.Series) -> pd.Series:
     b = (w * betas).sum()
     if b == 0: return w
     return w - (b / (betas**2).sum()) * betas
+
+# --- whole (dates x assets) weight panels; the functions below update W in place ---
+
+def _rows(p: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Rows of a per-date parameter panel, or a per-name vector as is."""
+    return p[rows] if p.ndim == 2 else p
+
+def cap_weights_panel(W: np.ndarray, max_weight) -> np.ndarray:
+    """|w| <= max_weight per name (scalar or per-name vector)."""
+    return np.clip(W, -np.asarray(max_weight), np.asarray(max_weight), out=W)
+
+def _sector_sums(W: np.ndarray, codes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    T, S = len(W), int(codes.max(initial=0)) + 1
+    c = np.broadcast_to(codes, W.shape)
+    gid = np.where(c >= 0, np.arange(T)[:, None] * S + c, T * S)  # unmapped names -> spare bucket
+    return np.bincount(gid.ravel(), weights=W.ravel(), minlength=T * S + 1), gid
+
+def cap_sector_panel(W: np.ndarray, codes: np.ndarray, max_sector: float, two_sided: bool=False) -> np.ndarray:
+    """`cap_sector` applied to every date. codes: (N,) or (T, N) integer sector ids, -1 for names
+    without a sector."""
+    s, gid = _sector_sums(W, codes)
+    a = np.abs(s) if two_sided else s
+    with np.errstate(divide="ignore"):
+        f = np.where(a > max_sector, max_sector / a, 1.0)
+    f[-1] = 1.0
+    W *= f[gid]
+    return W
+
+def cap_exposures_panel(W: np.ndarray, exposures: list[np.ndarray], limits: list[float], free: np.ndarray,
+                        pinned: np.ndarray|None=None) -> np.ndarray:
+    """|wᵀa_k| <= limit_k for every exposure vector a_k at once (ones = net, β = beta; limit 0 =
+    neutral), by the least-norm move over the `free` names: one K x K solve per date.
+    exposures: (N,) or (T, N) each; free: (T, N) mask of names allowed to move; pinned: (T, N)
+    mask of names at a bound, which may only move inward (an outward move pins them and the
+    date is solved again)."""
+    K = len(exposures)
+    v = np.stack([W @ a if a.ndim == 1 else np.einsum("tn,tn->t", W, a) for a in exposures], axis=1)
+    d = np.clip(v, -np.asarray(limits), np.asarray(limits)) - v
+    rows = np.flatnonzero((d != 0).any(axis=1))
+    if not len(rows): return W
+    free = free[rows]
+    for _ in range(W.shape[1] + 1):
+        Af = [np.where(free, _rows(a, rows), 0.0) for a in exposures]
+        G = np.empty((len(rows), K, K))
+        for k in range(K):
+            for l in range(k, K): G[:, k, l] = G[:, l, k] = np.einsum("tn,tn->t", Af[k], Af[l])
+        lam = np.einsum("tkl,tl->tk", np.linalg.pinv(G, hermitian=True), d[rows])
+        move = sum(lam[:, k:k + 1] * Af[k] for k in range(K))
+        out = free & pinned[rows] & (move * W[rows] > 0) if pinned is not None else None
+        if out is None or not out.any(): break
+        free = free & ~out
+    W[rows] += move
+    return W
+
+def cap_gross_panel(W: np.ndarray, max_gross: float) -> np.ndarray:
+    g = np.abs(W).sum(axis=1)
+    with np.errstate(divide="ignore"):
+        W *= np.where(g > max_gross, max_gross / g, 1.0)[:, None]
+    return W
+
+def _nb_turnover(W, max_turnover, prev):
+    # sequential: each date's cap depends on the previous date's capped weights
+    T, N = W.shape
+    for t in range(T):
+        tot = 0.0
+        for j in range(N): tot += abs(W[t, j] - prev[j])
+        if tot > max_turnover:
+            a = max_turnover / tot
+            for j in range(N): W[t, j] = prev[j] + (W[t, j] - prev[j]) * a
+        for j in range(N): prev[j] = W[t, j]
+    return W
+
+def cap_turnover_panel(W: np.ndarray, max_turnover: float, w0: np.ndarray|None=None) -> np.ndarray:
+    """`cap_turnover` applied date after date from `w0` (default flat). Each capped row is a convex
+    combination of the previous row and its target, so constraints both satisfy still hold."""
+    prev = np.zeros(W.shape[1]) if w0 is None else np.array(w0, dtype=float)
+    if USE_NUMBA: return _jitted(_nb_turnover)(W, float(max_turnover), prev)
+    for t in range(len(W)):
+        d = W[t] - prev
+        tot = np.abs(d).sum()
+        if tot > max_turnover: W[t] = prev + d * (max_turnover / tot)
+        prev = W[t]
+    return W
+
+class ConstraintPipeline:
+    """Portfolio constraints over a whole (dates x assets) weight panel.
+
+    Per-name caps (clip), two-sided sector caps (|net sector weight|, scale the sector) and the net/beta bands (one joint
+    least-norm move) are applied in turn, repeatedly, to the dates that still violate one of them
+    (cyclic projection) until every violation is below `tol` or `max_iter` sweeps have run. Band
+    moves only use names that are active (nonzero) in the input; names at their cap only move
+    inward. Dates still violating after `max_iter` sweeps are scaled down until they meet every
+    limit, with a RuntimeWarning. The gross cap
+    follows; it only scales rows down, so it keeps the others. The turnover cap runs last as a
+    sequential compiled pass.
+
+    sectors: per-name labels (Series) or a (dates x names) label panel; betas: per-name Series or a
+    (dates x names) panel. Unset limits are skipped. Plug into `BacktestEngine(constraints=...)`.
+    """
+    def __init__(self, max_weight: float|pd.Series|None=None, sectors: pd.Series|pd.DataFrame|None=None,
+                 max_sector: float|None=None, max_net: float|None=None, betas: pd.Series|pd.DataFrame|None=None,
+                 max_beta: float|None=None, max_gross: float|None=None, max_turnover: float|None=None,
+                 tol: float=1e-10, max_iter: int=100):
+        if (sectors is None) != (max_sector is None): raise ValueError("sectors and max_sector go together")
+        if (betas is None) != (max_beta is None): raise ValueError("betas and max_beta go together")
+        self.max_weight, self.sectors, self.max_sector = max_weight, sectors, max_sector
+        self.max_net, self.betas, self.max_beta = max_net, betas, max_beta
+        self.max_gross, self.max_turnover = max_gross, max_turnover
+        self.tol, self.max_iter = tol, max_iter
+        self.iterations = 0  # sweeps used by the last call (diagnostic, not part of `cache_key`)
+
+    CONFIG = ("max_weight", "sectors", "max_sector", "max_net", "betas", "max_beta", "max_gross", "max_turnover",
+              "tol", "max_iter")
+
+    def cache_key(self) -> dict:
+        """The configuration that determines results, for engine result-cache keys."""
+        return {k: getattr(self, k) for k in self.CONFIG}
+
+    @staticmethod
+    def _align(x, index, columns) -> np.ndarray:
+        if isinstance(x, pd.DataFrame): return x.reindex(index=index, columns=columns).to_numpy()
+        if isinstance(x, pd.Series): return x.reindex(columns).to_numpy()
+        return np.asarray(x)
+
+    def _params(self, index, columns) -> dict:
+        p = {}
+        if self.max_weight is not None:
+            p["cap"] = np.nan_to_num(self._align(self.max_weight, index, columns).astype(float), nan=np.inf)
+        if self.sectors is not None:
+            lab = self._align(self.sectors, index, columns)
+            codes, _ = pd.factorize(lab.ravel())
+            p["codes"] = codes.reshape(lab.shape)
+        if self.betas is not None:
+            p["betas"] = np.nan_to_num(self._align(self.betas, index, columns).astype(float))
+        return p
+
+    def _violation(self, W: np.ndarray, p: dict, rows: np.ndarray) -> np.ndarray:
+        v = np.zeros(len(W))
+        if "cap" in p: v = np.maximum(v, (np.abs(W) - _rows(p["cap"], rows)).max(axis=1, initial=0.0))
+        if "codes" in p:
+            s, _ = _sector_sums(W, _rows(p["codes"], rows))
+            v = np.maximum(v, (np.abs(s[:-1]).reshape(len(W), -1) - self.max_sector).max(axis=1, initial=0.0))
+        if self.max_net is not None: v = np.maximum(v, np.abs(W.sum(axis=1)) - self.max_net)
+        if "betas" in p: v = np.maximum(v, np.abs((W * _rows(p["betas"], rows)).sum(axis=1)) - self.max_beta)
+        return v
+
+    def _shrink(self, B: np.ndarray, p: dict, rows: np.ndarray, bands: list) -> np.ndarray:
+        """Largest per-date factor in [0, 1] that brings B within every limit (all are symmetric
+        about zero, so a scaled-down row keeps the limits it met)."""
+        f = np.ones(len(B))
+        def lim(x, cap):
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(np.abs(x) > cap, cap / np.abs(x), 1.0)
+        if "cap" in p: f = np.minimum(f, lim(B, _rows(p["cap"], rows)).min(axis=1, initial=1.0))
+        if "codes" in p:
+            s, _ = _sector_sums(B, _rows(p["codes"], rows))
+            f = np.minimum(f, lim(s[:-1].reshape(len(B), -1), self.max_sector).min(axis=1, initial=1.0))
+        for a, l in bands: f = np.minimum(f, lim((B * _rows(a, rows)).sum(axis=1), l))
+        return f * (1 - 1e-12)
+
+    def apply_array(self, W: np.ndarray, index=None, columns=None, max_gross: float|None=None,
+                    w0: np.ndarray|None=None) -> np.ndarray:
+        """Constrain a float (T, N) array in place. `index`/`columns` align pandas parameters;
+        `max_gross` (e.g. the engine's leverage cap) tightens the pipeline's own gross limit; `w0`
+        is the weight row held before W's first date (turnover cap; zeros if None), so a panel
+        can be constrained in consecutive date chunks."""
+        W[np.isnan(W)] = 0.0
+        p = self._params(index, columns)
+        active = W != 0
+        rows = np.arange(len(W))
+        it = 0
+        bands = ([(np.ones(W.shape[1]), self.max_net)] if self.max_net is not None else []) + \
+                ([(p["betas"], self.max_beta)] if "betas" in p else [])
+        sweeps = "cap" in p or "codes" in p or bands
+        while sweeps and len(rows) and it < self.max_iter:
+            B, pinned = W[rows], None
+            if "cap" in p:
+                cap = _rows(p["cap"], rows)
+                cap_weights_panel(B, cap)
+                pinned = np.abs(B) >= cap * (1 - 1e-9)  # names at their cap only move inward
+            if "codes" in p: cap_sector_panel(B, _rows(p["codes"], rows), self.max_sector, two_sided=True)
+            if bands: cap_exposures_panel(B, [_rows(a, rows) for a, _ in bands], [l for _, l in bands], active[rows], pinned)
+            W[rows] = B
+            it += 1
+            rows = rows[self._violation(B, p, rows) > self.tol]
+        self.iterations = it
+        if len(rows):
+            # not converged: shrink those dates toward flat, which meets every limit
+            warnings.warn(f"ConstraintPipeline did not converge in {self.max_iter} sweeps on {len(rows)} dates; "
+                          "scaling them down to meet the limits", RuntimeWarning, stacklevel=2)
+            W[rows] *= self._shrink(W[rows], p, rows, bands)[:, None]
+        limits = [g for g in (self.max_gross, max_gross) if g is not None]
+        if limits: cap_gross_panel(W, min(limits))
+        if self.max_turnover is not None: cap_turnover_panel(W, self.max_turnover, w0)
+        return W
+
+    def apply(self, w: pd.Series|pd.DataFrame, max_gross: float|None=None) -> pd.Series|pd.DataFrame:
+        """Constrained copy of a weights panel (a Series is treated as one asset over time)."""
+        frame = w.to_frame() if isinstance(w, pd.Series) else w
+        W = self.apply_array(frame.to_numpy(dtype=float, copy=True), frame.index, frame.columns, max_gross)
+        if isinstance(w, pd.Series): return pd.Series(W[:, 0], index=w.index, name=w.name)
+        return pd.DataFrame(W, index=w.index, columns=w.columns)
@@ -1,21 +1,49 @@
 from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 from ..backtest import metrics as M
+from ..research.bootstrap import stationary_bootstrap_indices
 
-def bootstrap_metrics(returns: pd.Series, n_sims: int=1000, length: int|None=None, seed: int=42) -> pd.DataFrame:
-    rng = np.random.default_rng(seed)
-    r = returns.dropna().values
+_COLS = {"CAGR": "CAGR", "Volatility": "Vol", "Sharpe": "Sharpe", "MaxDrawdown": "MaxDD"}
+
+_SEED_BLOCK = 64  # paths per spawned seed; chunks hold whole blocks, so chunking never changes the draws
+
+def _draw(rng: np.random.Generator, n: int, n_sims: int, length: int, method: str, p: float) -> np.ndarray:
+    if method == "stationary":
+        return stationary_bootstrap_indices(n, length, p, n_sims, rng)
+    return rng.integers(0, n, size=(n_sims, length))
+
+def _simulate_chunk(r: np.ndarray, sizes: list[int], length: int, method: str, p: float, seeds, freq: float=M.TRADING_DAYS) -> np.ndarray:
+    idx = np.vstack([_draw(np.random.default_rng(s), len(r), k, length, method, p) for k, s in zip(sizes, seeds)])
+    stats = M.summary_matrix(r[idx], axis=1, freq=freq)  # one row per path
+    return np.column_stack([stats[k] for k in _COLS])
+
+def bootstrap_metrics(returns: pd.Series, n_sims: int=1000, length: int|None=None, seed: int=42,
+                      method: str="iid", p: float=0.1, mem_budget_mb: float=256, max_workers: int|None=None,
+                      freq: str|float|None="daily") -> pd.DataFrame:
+    """Resampled CAGR/Vol/Sharpe/MaxDD, one row per simulated path.
+
+    All paths of a chunk are drawn as one (n_sims x length) index array (`method` "iid" or
+    "stationary" blocks with restart prob `p`) and scored column-wise. Each block of 64 paths
+    is seeded from `SeedSequence(seed).spawn` and chunks (sized to `mem_budget_mb`, at least one
+    block) hold whole blocks, so results depend on `seed` only, not on the budget or on
+    `max_workers` > 1 spreading chunks over a process pool. Metrics are annualized at the bar
+    frequency `freq` (`metrics.periods_per_year`).
+    """
+    n_per_year = M.periods_per_year(freq, returns.index)
+    r = returns.dropna().to_numpy(dtype=float)
     if length is None:
         length = len(r)
-    out = []
-    for _ in range(n_sims):
-        sample = rng.choice(r, size=length, replace=True)
-        s = pd.Series(sample)
-        out.append({
-            "CAGR": M.annualized_return(s),
-            "Vol": M.annualized_vol(s),
-            "Sharpe": M.sharpe(s),
-            "MaxDD": M.max_drawdown(s),
-        })
-    return pd.DataFrame(out)
+    per_path = length * 48  # indices, draws and the float paths/equity temporaries
+    per_chunk = int(max(1, mem_budget_mb * 2**20 // (per_path * _SEED_BLOCK)))  # seed blocks per chunk
+    blocks = [min(_SEED_BLOCK, n_sims - lo) for lo in range(0, n_sims, _SEED_BLOCK)]
+    seeds = np.random.SeedSequence(seed).spawn(len(blocks))
+    args = [(r, blocks[i:i + per_chunk], length, method, p, seeds[i:i + per_chunk], n_per_year)
+            for i in range(0, len(blocks), per_chunk)]
+    if max_workers and max_workers > 1 and len(args) > 1:
+        with ProcessPoolExecutor(max_workers) as ex:
+            parts = list(ex.map(_simulate_chunk, *zip(*args)))
+    else:
+        parts = [_simulate_chunk(*a) for a in args]
+    return pd.DataFrame(np.vstack(parts), columns=list(_COLS.values()))
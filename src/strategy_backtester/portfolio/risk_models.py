@@ -1,7 +1,6 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
 from numpy.linalg import pinv
-from scipy.cluster.hierarchy import linkage, leaves_list
 
 def ledoit_wolf_cov(rets: pd.DataFrame) -> pd.DataFrame:
     X = rets - rets.mean()
@@ -15,23 +14,87 @@ def ledoit_wolf_cov(rets: pd.DataFrame) -> pd.DataFrame:
     Sigma = k * F + (1 - k) * S
     return pd.DataFrame(Sigma, index=rets.columns, columns=rets.columns)
 
-def hrp_weights(rets: pd.DataFrame) -> pd.Series:
-    corr = rets.corr().fillna(0.0)
-    dist = ((1 - corr).clip(0, 2)) ** 0.5
-    Z = linkage(dist, method="single")
-    order = leaves_list(Z)
-    cols = corr.index[order]
-    cov = rets.cov().loc[cols, cols]
-    w = pd.Series(1.0, index=cols)
-    def _split(items):
-        if len(items) <= 1: return
-        m = len(items)//2
-        L, R = items[:m], items[m:]
-        vL = w[L].values @ cov.loc[L,L].values @ w[L].values
-        vR = w[R].values @ cov.loc[R,R].values @ w[R].values
-        aL = 1 - vL/(vL+vR); aR = 1 - vR/(vL+vR)
-        w[L] *= aL; w[R] *= aR
-        _split(L); _split(R)
-    _split(list(cols))
-    w = (w / w.sum()).reindex(rets.columns).fillna(0.0)
-    return w
+def correlation_distance(corr: np.ndarray) -> np.ndarray:
+    """Condensed sqrt(1 - rho) distance vector (scipy `pdist` layout) from a correlation matrix."""
+    from scipy.spatial.distance import squareform
+    d = np.sqrt(np.clip(1.0 - np.nan_to_num(np.asarray(corr, dtype=float)), 0.0, 2.0))
+    return squareform(d, checks=False)
+
+def _corr_from_cov(cov: np.ndarray) -> np.ndarray:
+    sd = np.sqrt(np.clip(np.diag(cov), 0, None))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.nan_to_num(cov / np.outer(sd, sd))
+
+def hrp_order(corr: np.ndarray|None=None, method: str="single", dist: np.ndarray|None=None) -> np.ndarray:
+    """Leaf order of the hierarchical clustering. Pass a precomputed condensed `dist` to skip
+    rebuilding it (e.g. when several linkage methods are tried on the same window)."""
+    from scipy.cluster.hierarchy import linkage, leaves_list
+    if dist is None: dist = correlation_distance(corr)
+    if len(dist) == 0: return np.arange(1 if corr is None else len(corr))
+    return leaves_list(linkage(dist, method=method))
+
+def _bisect(C: np.ndarray) -> np.ndarray:
+    """Recursive bisection over contiguous [a, b) blocks of a (k x N x N) stack of covariances
+    already in leaf order, one explicit stack for all k. Every member of a block carries the same
+    weight when it is split, so block variances are plain block sums. Returns (k x N) weights."""
+    k, N = C.shape[:2]
+    w = np.ones((k, N))
+    stack = [(0, N)]
+    while stack:
+        a, b = stack.pop()
+        if b - a <= 1: continue
+        m = a + (b - a) // 2
+        vL, vR = C[:, a:m, a:m].sum(axis=(1, 2)), C[:, m:b, m:b].sum(axis=(1, 2))
+        tot = vL + vR
+        with np.errstate(invalid="ignore", divide="ignore"):
+            aL = np.where(tot > 0, 1 - vL / tot, 0.5)
+        w[:, a:m] *= aL[:, None]; w[:, m:b] *= (1 - aL)[:, None]
+        stack += [(a, m), (m, b)]
+    return w / w.sum(axis=1, keepdims=True)
+
+def hrp_from_cov(cov: np.ndarray, corr: np.ndarray|None=None, method: str="single",
+                 dist: np.ndarray|None=None, order: np.ndarray|None=None) -> np.ndarray:
+    """HRP weights on arrays. The covariance is permuted once into leaf order (`order` if given,
+    else from `corr`/`dist`) and bisected by `_bisect`."""
+    cov = np.nan_to_num(np.asarray(cov, dtype=float))
+    if order is None: order = hrp_order(_corr_from_cov(cov) if corr is None and dist is None else corr, method, dist)
+    out = np.empty(len(cov))
+    out[order] = _bisect(cov[np.ix_(order, order)][None])[0]
+    return out
+
+def hrp_batch(covs: np.ndarray, method: str="single", orders=None, dists=None, corr_tol: float=0.0,
+              max_bytes: int=1 << 28) -> np.ndarray:
+    """HRP for a stack of (D x N x N) covariances, e.g. one per rebalance date; returns (D x N).
+
+    The leaf order of date d is `orders[d]` if given, else the linkage of `dists[d]` if given,
+    else of its correlation matrix; a date whose correlation is within `corr_tol` (max abs change)
+    of the last clustered date reuses that order instead of a new linkage, so covariances that
+    are re-estimated less often than the rebalance dates cluster once. Consecutive dates sharing
+    an order are bisected together, up to `max_bytes` of permuted covariances at a time.
+    """
+    covs = np.nan_to_num(np.asarray(covs, dtype=float))
+    D, N = len(covs), covs.shape[-1]
+    out = np.empty((D, N))
+    if D == 0: return out
+    runs, ref, ref_order = [], None, None  # runs: [order, [dates]]
+    for d in range(D):
+        o = None if orders is None else orders[d]
+        if o is None and dists is not None and dists[d] is not None: o = hrp_order(method=method, dist=dists[d])
+        if o is None:
+            corr = _corr_from_cov(covs[d])
+            if ref is None or np.abs(corr - ref).max() > corr_tol: ref, ref_order = corr, hrp_order(corr, method)
+            o = ref_order
+        o = np.asarray(o)
+        if runs and (runs[-1][0] is o or np.array_equal(runs[-1][0], o)): runs[-1][1].append(d)
+        else: runs.append([o, [d]])
+    step = max(1, int(max_bytes // (8 * N * N)))
+    for o, ds in runs:
+        for i in range(0, len(ds), step):
+            sel = ds[i:i + step]
+            out[np.ix_(sel, o)] = _bisect(covs[np.ix_(sel, o, o)])
+    return out
+
+def hrp_weights(rets: pd.DataFrame, method: str="single", dist: np.ndarray|None=None) -> pd.Series:
+    corr = rets.corr().fillna(0.0).values
+    w = hrp_from_cov(rets.cov().fillna(0.0).values, corr, method, dist)
+    return pd.Series(w, index=rets.columns)
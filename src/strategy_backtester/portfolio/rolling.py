@@ -0,0 +1,170 @@
+from __future__ import annotations
+import numpy as np, pandas as pd
+
+class WindowMoments:
+    """Sliding-window sums of a (dates x assets) returns block, updated by rank-k row add/drop.
+
+    Keeps T, Σx, Σxxᵀ and the fourth-moment sums Ledoit-Wolf needs (Σq, Σq², Σq·x with q=||x||²),
+    so moving the window by k rows costs O(k N²) instead of recomputing O(window N²) from scratch.
+    Returns must be NaN-free (fill before feeding).
+    """
+    def __init__(self, n_assets: int):
+        self.n = n_assets
+        self.reset()
+
+    def reset(self):
+        N = self.n
+        self.T, self.sx, self.C = 0, np.zeros(N), np.zeros((N, N))
+        self.q1, self.q2, self.v = 0.0, 0.0, np.zeros(N)
+
+    def _update(self, X: np.ndarray, sign: float):
+        if not len(X): return
+        q = np.einsum("ij,ij->i", X, X)
+        self.T += int(sign) * len(X)
+        self.sx += sign * X.sum(axis=0)
+        self.C += sign * (X.T @ X)
+        self.q1 += sign * q.sum(); self.q2 += sign * (q @ q)
+        self.v += sign * (q @ X)
+
+    def add(self, X: np.ndarray): self._update(np.atleast_2d(X), 1.0)
+    def drop(self, X: np.ndarray): self._update(np.atleast_2d(X), -1.0)
+
+    def mean(self) -> np.ndarray: return self.sx / self.T
+
+    def cov(self) -> np.ndarray:
+        """Sample covariance (ddof=1), as `DataFrame.cov()`."""
+        mu = self.mean()
+        return (self.C - self.T * np.outer(mu, mu)) / (self.T - 1)
+
+    def ledoit_wolf(self) -> tuple[np.ndarray, float]:
+        """Shrunk covariance and intensity, same estimator as `risk_models.ledoit_wolf_cov`."""
+        T, mu = self.T, self.mean()
+        S = self.cov()
+        F = np.trace(S) / self.n
+        D = S.copy(); D.flat[::self.n + 1] -= F
+        beta = (D * D).sum()
+        # Σ_t ||x_t - μ||⁴ expanded in the running sums
+        m = mu @ mu
+        p4 = self.q2 + 4 * mu @ self.C @ mu - 4 * mu @ self.v + 2 * m * self.q1 - 3 * T * m * m
+        phi = p4 / T ** 2 - beta
+        k = 0.0 if beta <= 0 else max(0.0, min(1.0, phi / beta))
+        Sigma = (1 - k) * S
+        Sigma.flat[::self.n + 1] += k * F
+        return Sigma, k
+
+def _cg(A: np.ndarray, b: np.ndarray, x0: np.ndarray, tol: float, max_iter: int) -> tuple[np.ndarray, int, bool]:
+    """Conjugate gradient for SPD A x = b started from x0; returns (x, iterations, converged)."""
+    x = x0.copy()
+    r = b - A @ x
+    p, rs = r.copy(), r @ r
+    stop = (tol * np.linalg.norm(b)) ** 2
+    for it in range(max_iter):
+        if rs <= stop: return x, it, True
+        Ap = A @ p
+        pAp = p @ Ap
+        if pAp <= 0: return x, it, False
+        a = rs / pAp
+        x += a * p; r -= a * Ap
+        rs, rs_old = r @ r, rs
+        p = r + (rs / rs_old) * p
+    return x, max_iter, rs <= stop
+
+def _erc(Sigma: np.ndarray, x0: np.ndarray|None, tol: float, max_iter: int=100) -> tuple[np.ndarray, int]:
+    """Equal-risk-contribution weights: Newton steps on the whole vector for the self-concordant
+    f(y) = ½N yᵀΣy - Σlog(y), whose minimizer has y_i(Σy)_i = 1/N. Steps are damped by
+    1/(1 + λ) (λ the Newton decrement) until λ < 1/4, which keeps y positive without a line
+    search. One N x N solve per step; a warm start `x0` (e.g. the previous rebalance's weights)
+    usually converges in a few steps."""
+    N = len(Sigma)
+    if x0 is None: y = 1.0 / np.sqrt(np.maximum(np.diag(Sigma), 1e-18))
+    else: y = np.maximum(np.asarray(x0, dtype=float), 1e-12)
+    y = y / np.sqrt(max(y @ Sigma @ y, 1e-300))  # scale so yᵀΣy = 1, as at the optimum
+    for it in range(max_iter):
+        g = N * (Sigma @ y) - 1.0 / y
+        H = N * Sigma; H.flat[::N + 1] += 1.0 / (y * y)
+        try: dy = np.linalg.solve(H, -g)
+        except np.linalg.LinAlgError: dy = -g / np.diag(H)
+        lam = np.sqrt(max(-(g @ dy), 0.0))
+        y = y + (dy if lam < 0.25 else dy / (1.0 + lam))
+        if np.abs(dy).max() <= tol * y.max(): return y / y.sum(), it + 1
+    return y / y.sum(), max_iter
+
+def rebalance_positions(idx: pd.DatetimeIndex, rebalance) -> np.ndarray:
+    """Row positions of the rebalance calendar: a pandas frequency ("ME", "W-FRI", ...) meaning the
+    last trading day of each period, an int step in rows, or explicit dates (snapped back to a trading day)."""
+    if isinstance(rebalance, (int, np.integer)):
+        return np.arange(rebalance - 1, len(idx), rebalance)
+    if isinstance(rebalance, str):
+        pos = pd.Series(np.arange(len(idx)), index=idx).resample(rebalance).last().dropna()
+        return pos.to_numpy(dtype=int)
+    pos = idx.searchsorted(pd.DatetimeIndex(rebalance), "right") - 1
+    return np.unique(pos[pos >= 0])
+
+class RollingOptimizer:
+    """Re-optimize on a rebalance calendar over a sliding `window` of returns.
+
+    The window covariance (and Ledoit-Wolf shrinkage) is carried forward with rank-k add/drop
+    updates, and each solve of Σx = b is a conjugate-gradient run warm-started from the previous
+    rebalance's solution, so consecutive rebalances cost a few O(N²) products instead of a fresh
+    O(N³) factorization. `run` returns a (dates x assets) target-weights panel for
+    `BacktestEngine.run_weights`.
+
+    method: "max_sharpe" (Σ⁻¹μ, as `naive_max_sharpe`), "min_var" (Σ⁻¹1), "inverse_vol", "risk_parity"
+    (equal risk contribution) or "hrp" (`risk_models.hrp_from_cov` with the given `linkage` method).
+    """
+    def __init__(self, window: int=252, rebalance="ME", method: str="max_sharpe", shrinkage: str|None="ledoit_wolf",
+                 min_weight: float=0.0, tol: float=1e-8, max_iter: int|None=None, refresh: int=24,
+                 linkage: str="single"):
+        if method not in ("max_sharpe", "min_var", "inverse_vol", "risk_parity", "hrp"): raise ValueError(f"Unknown method: {method}")
+        self.window, self.rebalance, self.method, self.shrinkage = window, rebalance, method, shrinkage
+        self.linkage = linkage
+        self.min_weight, self.tol, self.max_iter = min_weight, tol, max_iter
+        self.refresh = refresh  # rebuild the sums from scratch every `refresh` rebalances to bound float drift
+        self.info: pd.DataFrame|None = None
+
+    def _solve(self, Sigma: np.ndarray, mu: np.ndarray, x0: np.ndarray|None) -> tuple[np.ndarray, np.ndarray, int]:
+        N = len(mu)
+        if self.method == "inverse_vol":
+            raw = 1.0 / np.sqrt(np.maximum(np.diag(Sigma), 1e-18))
+            return raw, raw, 0
+        if self.method == "risk_parity":
+            raw, it = _erc(Sigma, x0, self.tol)
+            return raw, raw, it
+        if self.method == "hrp":
+            from .risk_models import hrp_from_cov
+            raw = hrp_from_cov(Sigma, method=self.linkage)
+            return raw, raw, 0
+        b = mu if self.method == "max_sharpe" else np.ones(N)
+        x, it, ok = _cg(Sigma, b, np.zeros(N) if x0 is None else x0, self.tol, self.max_iter or N)
+        if not ok: x = np.linalg.pinv(Sigma) @ b  # singular/indefinite window: fall back like naive_max_sharpe
+        raw = np.maximum(x, self.min_weight)
+        return x, raw, it
+
+    def windows(self, rets: pd.DataFrame):
+        """Yield (row, Sigma, mu, shrinkage) at each rebalance row from the sliding window sums."""
+        X = np.ascontiguousarray(rets.fillna(0.0).to_numpy(dtype=float))
+        pos = rebalance_positions(rets.index, self.rebalance)
+        mom = WindowMoments(X.shape[1])
+        lo = hi = 0
+        for i, p in enumerate(pos[pos >= self.window - 1]):
+            new_lo, new_hi = p + 1 - self.window, p + 1
+            if i % self.refresh == 0 or new_lo >= hi:
+                mom.reset(); mom.add(X[new_lo:new_hi])
+            else:
+                mom.add(X[hi:new_hi]); mom.drop(X[lo:new_lo])
+            lo, hi = new_lo, new_hi
+            if self.shrinkage == "ledoit_wolf": Sigma, k = mom.ledoit_wolf()
+            else: Sigma, k = mom.cov(), 0.0
+            yield int(p), Sigma, mom.mean(), k
+
+    def run(self, rets: pd.DataFrame) -> pd.DataFrame:
+        """Weights decided at each rebalance close from the trailing window, held until the next one."""
+        T, N = rets.shape
+        W = np.full((T, N), np.nan)
+        x_prev, rows = None, []
+        for p, Sigma, mu, k in self.windows(rets):
+            x_prev, raw, it = self._solve(Sigma, mu, x_prev)
+            W[p] = raw / raw.sum() if raw.sum() != 0 else 1.0 / N
+            rows.append({"date": rets.index[p], "shrinkage": k, "iterations": it})
+        self.info = pd.DataFrame(rows, columns=["date", "shrinkage", "iterations"]).set_index("date")
+        return pd.DataFrame(W, index=rets.index, columns=rets.columns).ffill().fillna(0.0)
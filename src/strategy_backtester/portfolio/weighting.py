@@ -0,0 +1,101 @@
+"""Cross-sectional weighting schemes for `BacktestEngine.run_portfolio`.
+
+A weighter maps a signal panel S (dates x symbols, dense ndarray or scipy.sparse CSR) and the
+returns panel R to target weights. It rescales S's own buffer in place and returns it, so no
+extra panel is allocated. Weights keep the signal's sign and only active (nonzero) names get weight.
+"""
+from __future__ import annotations
+import numpy as np, pandas as pd
+from ..indicators.kernels import rolling_std
+
+def _is_sparse(S) -> bool: return hasattr(S, "indptr")
+
+def row_ids(S) -> np.ndarray:
+    """Row id of every stored entry of a CSR matrix."""
+    return np.repeat(np.arange(S.shape[0]), np.diff(S.indptr))
+
+def _values(S) -> np.ndarray: return S.data if _is_sparse(S) else S
+
+def row_sum(S, vals: np.ndarray) -> np.ndarray:
+    if _is_sparse(S): return np.bincount(row_ids(S), weights=vals, minlength=S.shape[0])
+    return vals.sum(axis=1)
+
+def _gather(S, panel: np.ndarray) -> np.ndarray:
+    """Values of a dense (dates x symbols) panel at S's entries (same shape as `_values(S)`)."""
+    return panel[row_ids(S), S.indices] if _is_sparse(S) else panel
+
+def scale_rows(S, s: np.ndarray):
+    """S[t] *= s[t] in place."""
+    if _is_sparse(S): S.data *= s[row_ids(S)].astype(S.dtype, copy=False)
+    else: S *= s.astype(S.dtype, copy=False)[:, None]
+    return S
+
+def _normalize_gross(S):
+    g = row_sum(S, np.abs(_values(S)))
+    with np.errstate(divide="ignore"):
+        return scale_rows(S, np.where(g > 0, 1.0 / g, 0.0))
+
+def equal(S, R, **_):
+    """Signal / number of active names (the `run_multi_equal_weight` rule)."""
+    v = _values(S)
+    n = row_sum(S, (v != 0).astype(float))
+    with np.errstate(divide="ignore"):
+        return scale_rows(S, np.where(n > 0, 1.0 / n, 0.0))
+
+def signal(S, R, **_):
+    """Signal-proportional: S / sum|S| per date."""
+    return _normalize_gross(S)
+
+def inverse_vol(S, R, window: int=63, block: int=1024, **_):
+    """Signal x 1/(rolling vol of the name's returns), gross 1. Names without a full window get 0.
+    The vol is computed `block` rows at a time (each with its window - 1 rows of history) into one
+    buffer in R's dtype, so float64 temporaries stay (block + window) x N."""
+    inv = np.empty(R.shape, dtype=R.dtype)
+    for b0 in range(0, len(R), block):
+        b1 = min(b0 + block, len(R))
+        lo = max(b0 - window + 1, 0)
+        sd = rolling_std(R[lo:b1], window)[b0 - lo:]
+        with np.errstate(divide="ignore"):
+            np.divide(1.0, sd, out=sd)
+        sd[~np.isfinite(sd)] = 0.0
+        inv[b0:b1] = sd
+    v = _values(S)
+    v *= _gather(S, inv).astype(v.dtype, copy=False)
+    return _normalize_gross(S)
+
+def from_panel(S, W: np.ndarray):
+    """Apply an externally computed weights panel (e.g. optimizer output) to the active names:
+    |W| x sign(S), renormalized to gross 1."""
+    v = _values(S)
+    inactive = v == 0
+    np.copysign(np.abs(_gather(S, W)).astype(v.dtype, copy=False), v, out=v)
+    v[inactive] = 0.0
+    return _normalize_gross(S)
+
+def risk_parity(S, R, window: int=252, rebalance="ME", index: pd.DatetimeIndex|None=None, **_):
+    """Equal-risk-contribution weights among each date's active names, from the window covariance
+    of `RollingOptimizer(method="risk_parity")` at the latest rebalance: one solve per distinct
+    active set and rebalance, warm-started from that set's last solution. Dates before the first
+    full window get 0. `index` holds R's dates (the engine passes it)."""
+    from .rolling import RollingOptimizer, _erc
+    opt = RollingOptimizer(window, rebalance, method="risk_parity")
+    T, N = S.shape
+    W, last = np.zeros((T, N), dtype=R.dtype), {}
+    def fill(a, b, Sigma):
+        A = (S[a:b].toarray() if _is_sparse(S) else S[a:b]) != 0
+        sets, inv = np.unique(A, axis=0, return_inverse=True)
+        for u, m in enumerate(sets):
+            names = np.flatnonzero(m)
+            if not len(names): continue
+            key = m.tobytes()
+            w, _ = _erc(Sigma[np.ix_(names, names)], last.get(key), opt.tol)
+            last[key] = w
+            W[np.ix_(a + np.flatnonzero(inv.ravel() == u), names)] = w
+    prev = None
+    for p, Sigma, _, _ in opt.windows(pd.DataFrame(R, index=index)):
+        if prev is not None: fill(prev[0], p, prev[1])
+        prev = (p, Sigma)
+    if prev is not None: fill(prev[0], T, prev[1])
+    return from_panel(S, W)
+
+WEIGHTERS = {"equal": equal, "signal": signal, "inverse_vol": inverse_vol, "risk_parity": risk_parity}
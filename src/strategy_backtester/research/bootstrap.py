@@ -1,18 +1,23 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
 
+def stationary_bootstrap_indices(n: int, size: int, p: float=0.1, n_sims: int=1, rng: np.random.Generator|None=None) -> np.ndarray:
+    """(n_sims x size) Politis–Romano resample positions in one shot.
+    Each step starts a new block with prob p (geometric block lengths, mean 1/p); otherwise it
+    continues the current block, wrapping circularly."""
+    rng = rng or np.random.default_rng()
+    starts = rng.integers(0, n, size=(n_sims, size))
+    new = rng.random((n_sims, size)) < p
+    new[:, 0] = True
+    steps = np.arange(size)
+    pos = np.where(new, steps, 0)
+    np.maximum.accumulate(pos, axis=1, out=pos)  # position where the current block began
+    return (np.take_along_axis(starts, pos, axis=1) + (steps - pos)) % n
+
 def stationary_bootstrap(x: pd.Series | np.ndarray, p: float=0.1, size: int|None=None, seed: int=42) -> pd.Series:
     """Politis–Romano stationary bootstrap. p is block-restart prob (smaller -> longer blocks)."""
     rng = np.random.default_rng(seed)
     x = np.asarray(x)
     n = len(x); size = n if size is None else size
-    starts = rng.integers(0, n, size=size)
-    geom = rng.geometric(p, size=size)   # block lengths
-    idx = []
-    i = 0
-    while i < size:
-        s = starts[i]
-        L = min(geom[i], size - i)
-        idx.extend((s + np.arange(L)) % n)
-        i += L
-    return pd.Series(x[np.array(idx)], index=range(size))
+    idx = stationary_bootstrap_indices(n, size, p, 1, rng)[0]
+    return pd.Series(x[idx], index=range(size))
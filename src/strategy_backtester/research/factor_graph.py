@@ -0,0 +1,258 @@
+"""Lazy factor expressions over (dates x symbols) panels.
+
+Expressions are small immutable `Node` trees built from `field(...)` leaves with operators and
+methods (`pct_change`, `shift`, `rolling_*`, `rank`, `xs_zscore`, `neutralize`, arithmetic).
+Nothing is computed until `FactorGraph.evaluate`, which:
+
+- merges structurally identical sub-expressions by key, so returns or rolling windows shared by
+  many factors are computed once per evaluation;
+- evaluates in date chunks of `chunk_rows`, each extended by the cumulative lookback (and lookahead,
+  for leads such as forward returns) of the requested expressions, and frees every intermediate as
+  soon as its last consumer in the chunk is done, so only the outputs are full-size;
+- keeps materialized outputs in a byte-bounded LRU cache; later evaluations slice cached nodes
+  instead of recomputing them or anything beneath them.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+import numpy as np, pandas as pd
+from ..indicators import kernels as K
+
+class Node:
+    """One panel operation. Equal `key`s mean equal values, which is what the evaluator deduplicates on."""
+    __slots__ = ("op", "params", "children", "key", "_hash")
+
+    def __init__(self, op: str, params: tuple=(), children: tuple=()):
+        if op not in OPS: raise ValueError(f"Unknown op: {op}")
+        if op in ("add", "mul"): children = tuple(sorted(children, key=repr))  # commutative: canonical order
+        self.op, self.params, self.children = op, tuple(params), tuple(children)
+        self.key = (op, self.params, tuple(c.key for c in self.children))
+        self._hash = hash(self.key)
+
+    def __hash__(self): return self._hash
+    def __eq__(self, other): return isinstance(other, Node) and self._hash == other._hash and self.key == other.key
+    def __repr__(self):
+        args = [repr(c) for c in self.children] + [repr(p) for p in self.params]
+        return f"{self.op}({', '.join(args)})"
+
+    # --- arithmetic ---
+    def __add__(self, o): return Node("add", (), (self, _lift(o)))
+    __radd__ = __add__
+    def __mul__(self, o): return Node("mul", (), (self, _lift(o)))
+    __rmul__ = __mul__
+    def __sub__(self, o): return Node("sub", (), (self, _lift(o)))
+    def __rsub__(self, o): return Node("sub", (), (_lift(o), self))
+    def __truediv__(self, o): return Node("div", (), (self, _lift(o)))
+    def __rtruediv__(self, o): return Node("div", (), (_lift(o), self))
+    def __neg__(self): return Node("neg", (), (self,))
+    def abs(self): return Node("abs", (), (self,))
+    def log(self): return Node("log", (), (self,))
+    def zero_to_nan(self): return Node("zero_to_nan", (), (self,))
+
+    # --- time-series (per column) ---
+    def pct_change(self, n: int=1): return Node("pct_change", (int(n),), (self,))
+    def shift(self, n: int=1):
+        """Lag by n rows; negative n leads (looks ahead), e.g. forward returns."""
+        return Node("shift", (int(n),), (self,))
+    def rolling_mean(self, window: int): return Node("rolling_mean", (int(window),), (self,))
+    def rolling_sum(self, window: int): return Node("rolling_sum", (int(window),), (self,))
+    def rolling_std(self, window: int, ddof: int=1): return Node("rolling_std", (int(window), int(ddof)), (self,))
+    def rolling_zscore(self, window: int, ddof: int=1): return Node("rolling_zscore", (int(window), int(ddof)), (self,))
+    def rolling_skew(self, window: int): return Node("rolling_skew", (int(window),), (self,))
+
+    # --- cross-sectional (per date) ---
+    def rank(self, pct: bool=False): return Node("rank", (bool(pct),), (self,))
+    def xs_demean(self): return Node("xs_demean", (), (self,))
+    def xs_zscore(self): return Node("xs_zscore", (), (self,))
+    def neutralize(self, *exposures: "Node"):
+        """Residual of a per-date OLS on a constant plus the exposure panels (as `ic.neutralize`)."""
+        return Node("neutralize", (), (self,) + tuple(exposures))
+
+def field(name: str="prices") -> Node:
+    """Leaf reading the input panel `name` (a DataFrame passed alone is registered as "prices")."""
+    return Node("field", (name,))
+
+def const(value: float) -> Node: return Node("const", (float(value),))
+
+def _lift(x) -> Node: return x if isinstance(x, Node) else const(x)
+
+# --- kernels: fn(children values, params) -> ndarray, plus per-op lookback/lookahead in rows ---
+
+def _shift(a: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(a.shape, np.nan)
+    if n >= 0: out[n:] = a[:len(a) - n]
+    else: out[:n] = a[-n:]
+    return out
+
+def _rank(a: np.ndarray, pct: bool) -> np.ndarray:
+    return pd.DataFrame(a).rank(axis=1, pct=pct).to_numpy()
+
+def _xs_demean(a: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore"):
+        n = (~np.isnan(a)).sum(axis=1, keepdims=True)
+        return a - np.nansum(a, axis=1, keepdims=True) / np.where(n > 0, n, np.nan)
+
+def _xs_zscore(a: np.ndarray) -> np.ndarray:
+    d = _xs_demean(a)
+    n = (~np.isnan(a)).sum(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sd = np.sqrt(np.nansum(d * d, axis=1, keepdims=True) / (n - 1))
+        return np.where(n > 1, d / sd, np.nan)
+
+def _neutralize(y: np.ndarray, *exposures) -> np.ndarray:
+    from .ic import _neutralize_arrays
+    E = np.stack([np.broadcast_to(e, y.shape) for e in exposures], axis=-1) if exposures else None
+    return _neutralize_arrays(y, E)
+
+def _zero_to_nan(a: np.ndarray) -> np.ndarray: return np.where(a == 0, np.nan, a)
+
+def _log(a: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"): return np.log(a)
+
+def _div(a, b):
+    with np.errstate(invalid="ignore", divide="ignore"): return a / b
+
+# op -> (fn(values, params), lookback(params), lookahead(params))
+OPS = {
+    "field": (None, lambda p: 0, lambda p: 0),
+    "const": (None, lambda p: 0, lambda p: 0),
+    "add": (lambda v, p: v[0] + v[1], lambda p: 0, lambda p: 0),
+    "sub": (lambda v, p: v[0] - v[1], lambda p: 0, lambda p: 0),
+    "mul": (lambda v, p: v[0] * v[1], lambda p: 0, lambda p: 0),
+    "div": (lambda v, p: _div(v[0], v[1]), lambda p: 0, lambda p: 0),
+    "neg": (lambda v, p: -v[0], lambda p: 0, lambda p: 0),
+    "abs": (lambda v, p: np.abs(v[0]), lambda p: 0, lambda p: 0),
+    "log": (lambda v, p: _log(v[0]), lambda p: 0, lambda p: 0),
+    "zero_to_nan": (lambda v, p: _zero_to_nan(v[0]), lambda p: 0, lambda p: 0),
+    "pct_change": (lambda v, p: K.lookback_returns(v[0], p[0]), lambda p: p[0], lambda p: 0),
+    "shift": (lambda v, p: _shift(v[0], p[0]), lambda p: max(p[0], 0), lambda p: max(-p[0], 0)),
+    "rolling_mean": (lambda v, p: K.rolling_mean(v[0], p[0]), lambda p: p[0] - 1, lambda p: 0),
+    "rolling_sum": (lambda v, p: K.rolling_mean(v[0], p[0]) * p[0], lambda p: p[0] - 1, lambda p: 0),
+    "rolling_std": (lambda v, p: K.rolling_std(v[0], p[0], p[1]), lambda p: p[0] - 1, lambda p: 0),
+    "rolling_zscore": (lambda v, p: K.rolling_zscore(v[0], p[0], p[1]), lambda p: p[0] - 1, lambda p: 0),
+    "rolling_skew": (lambda v, p: K.rolling_skew(v[0], p[0]), lambda p: p[0] - 1, lambda p: 0),
+    "rank": (lambda v, p: _rank(v[0], p[0]), lambda p: 0, lambda p: 0),
+    "xs_demean": (lambda v, p: _xs_demean(v[0]), lambda p: 0, lambda p: 0),
+    "xs_zscore": (lambda v, p: _xs_zscore(v[0]), lambda p: 0, lambda p: 0),
+    "neutralize": (lambda v, p: _neutralize(*v), lambda p: 0, lambda p: 0),
+}
+
+def reach(*exprs: Node) -> tuple[int, int]:
+    """Rows of history (lookback) and of future (lookahead) the expressions read around each
+    output row, e.g. the warm-up a chunked evaluation must prepend."""
+    back, ahead, stack = {}, {}, [(e, False) for e in exprs]
+    while stack:
+        n, done = stack.pop()
+        if n.key in back: continue
+        if not done:
+            stack.append((n, True)); stack.extend((c, False) for c in n.children if c.key not in back)
+            continue
+        _, lb, la = OPS[n.op]
+        back[n.key] = lb(n.params) + max((back[c.key] for c in n.children), default=0)
+        ahead[n.key] = la(n.params) + max((ahead[c.key] for c in n.children), default=0)
+    return max((back[e.key] for e in exprs), default=0), max((ahead[e.key] for e in exprs), default=0)
+
+class FactorGraph:
+    """Evaluator for `Node` expressions over aligned input panels.
+
+    inputs: a DataFrame (registered as "prices") or {name: DataFrame}; every panel is reindexed to
+    the first one's dates and symbols. chunk_rows: output dates per chunk (None = one chunk).
+    cache_bytes: budget for cached materialized outputs (0 disables the cache).
+    """
+    def __init__(self, inputs, chunk_rows: int|None=None, cache_bytes: int=512 * 2**20):
+        if isinstance(inputs, pd.DataFrame): inputs = {"prices": inputs}
+        first = next(iter(inputs.values()))
+        self.index, self.columns = first.index, first.columns
+        self.inputs = {k: np.ascontiguousarray(v.reindex(index=self.index, columns=self.columns).to_numpy(dtype=float))
+                       for k, v in inputs.items()}
+        self.chunk_rows, self.cache_bytes = chunk_rows, cache_bytes
+        self._cache: OrderedDict = OrderedDict()  # node key -> full (T, N) array
+        self.stats = {"computed": 0, "cache_hits": 0}
+
+    # --- planning ---
+    def _plan(self, roots: list[Node]) -> list[Node]:
+        """Unique nodes in dependency order; cached nodes are leaves (their subtrees are skipped)."""
+        order, seen = [], set()
+        stack = [(r, False) for r in reversed(roots)]
+        while stack:
+            n, done = stack.pop()
+            if done: order.append(n); continue
+            if n.key in seen: continue
+            seen.add(n.key)
+            stack.append((n, True))
+            if n.key not in self._cache:
+                stack.extend((c, False) for c in reversed(n.children))
+        return order
+
+    def _reach(self, order: list[Node]) -> tuple[int, int]:
+        """Cumulative lookback/lookahead rows over the plan (cached nodes need none beneath them)."""
+        back, ahead = {}, {}
+        for n in order:
+            if n.key in self._cache: back[n.key] = ahead[n.key] = 0; continue
+            _, lb, la = OPS[n.op]
+            back[n.key] = lb(n.params) + max((back[c.key] for c in n.children), default=0)
+            ahead[n.key] = la(n.params) + max((ahead[c.key] for c in n.children), default=0)
+        return max(back.values(), default=0), max(ahead.values(), default=0)
+
+    # --- evaluation ---
+    def _value(self, n: Node, memo: dict, lo: int, hi: int):
+        if n.key in self._cache:
+            self._cache.move_to_end(n.key); self.stats["cache_hits"] += 1
+            return self._cache[n.key][lo:hi]
+        if n.op == "field": return self.inputs[n.params[0]][lo:hi]
+        if n.op == "const": return n.params[0]
+        self.stats["computed"] += 1
+        return OPS[n.op][0]([memo[c.key] for c in n.children], n.params)
+
+    def _run_chunk(self, order, outputs: dict, a: int, b: int, back: int, ahead: int, refs: dict):
+        lo, hi = max(a - back, 0), min(b + ahead, len(self.index))
+        memo, left = {}, dict(refs)
+        for n in order:
+            memo[n.key] = self._value(n, memo, lo, hi)
+            if n.key in self._cache: continue
+            for c in {c.key for c in n.children}:
+                left[c] -= 1
+                if left[c] == 0: del memo[c]  # last consumer done: free the intermediate
+        for name, (node, out) in outputs.items():
+            v = memo[node.key]
+            out[a:b] = v[a - lo:b - lo] if np.ndim(v) else v
+
+    def evaluate(self, exprs, cache: bool=True):
+        """Values of one `Node` (DataFrame), a list (list) or a {name: Node} dict (dict of DataFrames)."""
+        single = isinstance(exprs, Node)
+        named = exprs if isinstance(exprs, dict) else dict(enumerate([exprs] if single else exprs))
+        order = self._plan(list(named.values()))
+        back, ahead = self._reach(order)
+        # consumers per node in this plan; outputs get one extra so they survive the chunk
+        refs = {n.key: 0 for n in order}
+        for n in order:
+            if n.key not in self._cache:
+                for c in {c.key for c in n.children}: refs[c] += 1
+        for node in named.values(): refs[node.key] += 1
+        T, N = len(self.index), len(self.columns)
+        outputs, full = {}, {}
+        for name, node in named.items():
+            if node.key not in full: full[node.key] = np.empty((T, N))
+            outputs[name] = (node, full[node.key])
+        step = self.chunk_rows or max(T, 1)
+        for a in range(0, T, step):
+            self._run_chunk(order, outputs, a, min(a + step, T), back, ahead, refs)
+        if cache:
+            for key, arr in full.items(): self._store(key, arr)
+        # cached arrays are frozen and handed out as copies; uncached ones are wrapped as-is
+        frames = {name: pd.DataFrame(out, index=self.index, columns=self.columns, copy=cache) for name, (_, out) in outputs.items()}
+        if single: return frames[0]
+        return frames if isinstance(exprs, dict) else [frames[i] for i in range(len(named))]
+
+    # --- cache ---
+    def _store(self, key, arr: np.ndarray):
+        if arr.nbytes > self.cache_bytes: return
+        arr.flags.writeable = False
+        self._cache[key] = arr; self._cache.move_to_end(key)
+        while sum(v.nbytes for v in self._cache.values()) > self.cache_bytes: self._cache.popitem(last=False)
+
+    def materialize(self, *exprs: Node) -> "FactorGraph":
+        """Compute and cache shared intermediates (e.g. daily returns) ahead of a batch of factors."""
+        self.evaluate(list(exprs), cache=True)
+        return self
+
+    def clear_cache(self): self._cache.clear()
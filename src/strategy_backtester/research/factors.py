@@ -11,6 +11,20 @@ def xsec_lowvol(prices: pd.DataFrame, lb: int=63) -> pd.DataFrame:
 def xsec_reversal(prices: pd.DataFrame, lb: int=5) -> pd.DataFrame:
     return -prices.pct_change(lb)
 
+# Lazy twins of the factors above for `factor_graph.FactorGraph`: returns and rolling windows
+# shared between factors are computed once per evaluation.
+def momentum_expr(lb: int=126):
+    from .factor_graph import field
+    return field().pct_change(lb)
+
+def lowvol_expr(lb: int=63):
+    from .factor_graph import field
+    return -field().pct_change().rolling_std(lb, ddof=0).zero_to_nan()
+
+def reversal_expr(lb: int=5):
+    from .factor_graph import field
+    return -field().pct_change(lb)
+
 # Placeholders for fundamental factors:
 def xsec_value(*args, **kwargs):
     raise NotImplementedError("Value requires fundamentals (e.g., book/price).")
@@ -1,27 +1,86 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
-from scipy.stats import spearmanr
 
 def forward_returns(prices: pd.DataFrame, horizon: int=21) -> pd.DataFrame:
     return prices.pct_change(horizon).shift(-horizon)
 
+def forward_returns_expr(horizon: int=21):
+    """`forward_returns` as a `factor_graph` expression (a lead, so chunks read `horizon` rows ahead)."""
+    from .factor_graph import field
+    return field().pct_change(horizon).shift(-horizon)
+
+def _rank_rows(a: np.ndarray) -> np.ndarray:
+    """Row-wise average-tie ranks; NaNs stay NaN and are excluded from the ranking."""
+    return pd.DataFrame(a).rank(axis=1).to_numpy()
+
+def _row_corr(x: np.ndarray, y: np.ndarray, min_obs: int=3) -> np.ndarray:
+    """Row-wise Pearson correlation over entries where both x and y are present."""
+    m = ~(np.isnan(x) | np.isnan(y))
+    n = m.sum(axis=1)
+    x, y = np.where(m, x, 0.0), np.where(m, y, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xd = np.where(m, x - x.sum(axis=1, keepdims=True) / n[:, None], 0.0)
+        yd = np.where(m, y - y.sum(axis=1, keepdims=True) / n[:, None], 0.0)
+        rho = (xd * yd).sum(axis=1) / np.sqrt((xd * xd).sum(axis=1) * (yd * yd).sum(axis=1))
+    return np.where(n < min_obs, np.nan, rho)
+
+def _aligned(factor: pd.DataFrame, fwd: pd.DataFrame):
+    dates, cols = factor.index.intersection(fwd.index), factor.columns.intersection(fwd.columns)
+    return dates, factor.loc[dates, cols].to_numpy(dtype=float), fwd.loc[dates, cols].to_numpy(dtype=float)
+
+def _spearman_rows(f: np.ndarray, y: np.ndarray, f_ranks: np.ndarray|None=None) -> np.ndarray:
+    """Row-wise Spearman on the joint mask. `f_ranks` (ranks of f on its own mask) is reused for
+    rows where y adds no extra NaNs, so only rows with a different joint mask are re-ranked."""
+    m = ~(np.isnan(f) | np.isnan(y))
+    if f_ranks is None: f_ranks = _rank_rows(f)
+    fr = f_ranks.copy()
+    redo = (m != ~np.isnan(f)).any(axis=1)
+    if redo.any(): fr[redo] = _rank_rows(np.where(m[redo], f[redo], np.nan))
+    yr = _rank_rows(np.where(m, y, np.nan))
+    return _row_corr(np.where(m, fr, np.nan), yr)
+
 def rank_ic(factor: pd.DataFrame, fwd: pd.DataFrame) -> pd.Series:
-    """Cross-sectional rank IC each date."""
-    ics = []
-    for dt in factor.index.intersection(fwd.index):
-        x = factor.loc[dt]; y = fwd.loc[dt]
-        mask = x.notna() & y.notna()
-        if mask.sum() < 3:  # not enough names
-            ics.append(np.nan); continue
-        rho, _ = spearmanr(x[mask], y[mask])
-        ics.append(rho)
-    return pd.Series(ics, index=factor.index)
+    """Cross-sectional rank IC each date (Spearman over names present in both panels)."""
+    dates, f, y = _aligned(factor, fwd)
+    return pd.Series(_spearman_rows(f, y), index=dates)
 
-def ic_decay(factor: pd.DataFrame, prices: pd.DataFrame, horizons=(1,5,21,63)) -> pd.Series:
+def pearson_ic(factor: pd.DataFrame, fwd: pd.DataFrame) -> pd.Series:
+    """Cross-sectional Pearson IC each date."""
+    dates, f, y = _aligned(factor, fwd)
+    return pd.Series(_row_corr(f, y), index=dates)
+
+def ic_panel(factor: pd.DataFrame, prices: pd.DataFrame, horizons=(1,5,21,63), method: str="rank") -> pd.DataFrame:
+    """(dates x horizons) IC for every horizon; the factor is ranked once and shared across horizons."""
+    dates, f, _ = _aligned(factor, prices)
+    px = prices[factor.columns.intersection(prices.columns)].to_numpy(dtype=float)
+    pos, n = prices.index.get_indexer(dates), len(px)
+    f_ranks = _rank_rows(f) if method == "rank" else None
     out = {}
     for h in horizons:
-        out[h] = rank_ic(factor, forward_returns(prices, h)).mean()
-    return pd.Series(out)
+        y = np.full_like(px, np.nan)  # forward_returns(prices, h) on the full price index
+        with np.errstate(invalid="ignore", divide="ignore"):
+            y[:n - h] = px[h:] / px[:n - h] - 1
+        out[h] = _spearman_rows(f, y[pos], f_ranks) if method == "rank" else _row_corr(f, y[pos])
+    return pd.DataFrame(out, index=dates)
+
+def ic_decay(factor: pd.DataFrame, prices: pd.DataFrame, horizons=(1,5,21,63)) -> pd.Series:
+    return ic_panel(factor, prices, horizons).mean()
+
+def ic_stats(ic: pd.Series|pd.DataFrame) -> pd.DataFrame|pd.Series:
+    """Mean IC, IC vol, IR (mean/std) and t-stat (IR * sqrt(n)) per IC series."""
+    n = ic.count()
+    mean, std = ic.mean(), ic.std()
+    ir = mean / std
+    out = {"mean": mean, "std": std, "IR": ir, "t_stat": ir * np.sqrt(n), "n": n}
+    return pd.DataFrame(out) if isinstance(ic, pd.DataFrame) else pd.Series(out, dtype=float)
+
+def ic_half_life(decay: pd.Series) -> float:
+    """Horizon at which mean IC halves, from a log-linear fit |IC_h| ~ exp(-h ln2 / HL)."""
+    d = decay.dropna()
+    d = d[(np.sign(d) == np.sign(d.iloc[0])) & (d != 0)] if len(d) else d
+    if len(d) < 2: return float("nan")
+    slope = np.polyfit(np.asarray(d.index, dtype=float), np.log(np.abs(d.to_numpy())), 1)[0]
+    return float(-np.log(2) / slope) if slope < 0 else float("inf")
 
 def neutralize(factor: pd.Series, exposures: pd.DataFrame) -> pd.Series:
     """Cross-sectional OLS neutralization against exposures (e.g., beta/size/sector dummies)."""
@@ -32,3 +91,69 @@ def neutralize(factor: pd.Series, exposures: pd.DataFrame) -> pd.Series:
     beta, *_ = np.linalg.lstsq(x[mask], y[mask], rcond=None)
     resid = y - x @ beta
     return pd.Series(resid, index=factor.index)
+
+def _group_demean(a: np.ndarray, gid: np.ndarray, m: np.ndarray, cnt: np.ndarray) -> np.ndarray:
+    """a minus its mean over the masked names sharing a (date, group) id; 0 off the mask."""
+    s = np.bincount(gid.ravel(), weights=np.where(m, a, 0.0).ravel(), minlength=len(cnt))
+    return np.where(m, a - (s / np.maximum(cnt, 1))[gid], 0.0)
+
+def _group_ids(m: np.ndarray, codes: np.ndarray, n_groups: int) -> tuple[np.ndarray, np.ndarray]:
+    T = len(m)
+    gid = np.where(m, np.arange(T)[:, None] * n_groups + codes, T * n_groups)  # off-mask -> spare bucket
+    return gid, np.bincount(gid.ravel(), minlength=T * n_groups + 1)
+
+def _neutralize_arrays(y: np.ndarray, E: np.ndarray|None=None, codes: np.ndarray|None=None, ridge: float=0.0) -> np.ndarray:
+    """Core of `neutralize_panel` on arrays: y (T, N), E (T, N, K) exposures, codes (T, N) group ids
+    (-1 = unknown). Dates with too few usable names are returned unchanged, as `neutralize` does."""
+    T, N = y.shape
+    K = 0 if E is None else E.shape[2]
+    m = ~np.isnan(y)
+    if K: m &= ~np.isnan(E).any(axis=2)
+    if codes is None: codes = np.zeros((T, N), dtype=np.int64)  # the constant = one group
+    else: m &= codes >= 0
+    G = int(codes.max(initial=0)) + 1
+    gid, cnt = _group_ids(m, codes, G)
+    n_fe = (cnt[:T * G].reshape(T, G) > 0).sum(axis=1)
+    ok = m.sum(axis=1) >= n_fe + K + 1
+    resid = _group_demean(y, gid, m, cnt)  # Frisch-Waugh: sector/constant effects partialled out
+    if K:
+        # dates whose exposures, groups and mask repeat the previous date share the demeaned design
+        # and its (pseudo-)inverse: one K x K factorization per run instead of per date
+        same = np.zeros(T, dtype=bool)
+        same[1:] = ((m[1:] == m[:-1]) & (codes[1:] == codes[:-1])).all(axis=1) & \
+                   ((E[1:] == E[:-1]) | (np.isnan(E[1:]) & np.isnan(E[:-1]))).all(axis=(1, 2))
+        first = np.flatnonzero(~same)
+        run = np.cumsum(~same) - 1
+        gf, cf = _group_ids(m[first], codes[first], G)
+        Ef = np.stack([_group_demean(E[first, :, k], gf, m[first], cf) for k in range(K)], axis=-1)
+        A = np.einsum("rnk,rnl->rkl", Ef, Ef)
+        if ridge: A += ridge * np.eye(K)
+        Ainv = np.linalg.pinv(A, hermitian=True)
+        b = np.einsum("tnk,tn->tk", Ef[run], resid)
+        beta = np.einsum("tkl,tl->tk", Ainv[run], b)
+        resid -= np.einsum("tnk,tk->tn", Ef[run], beta)
+    out = np.where(m, resid, np.nan)
+    return np.where(ok[:, None], out, y)
+
+def neutralize_panel(factor: pd.DataFrame, exposures: dict|None=None, sectors: pd.Series|pd.DataFrame|None=None,
+                     ridge: float=0.0) -> pd.DataFrame:
+    """`neutralize` for every date of a (dates x names) panel in one batched least-squares pass.
+
+    exposures: {name: (dates x names) panel or per-name Series held constant over dates}.
+    sectors: per-name labels (Series) or a (dates x names) label panel. Sector dummies are never built:
+    they are partialled out by demeaning within (date, sector) with bincount, leaving a K x K system
+    per date for the exposures. Names with a NaN factor, exposure or sector get NaN. `ridge` adds
+    ridge * I to each exposure system (sector effects are not penalized).
+    """
+    idx, cols = factor.index, factor.columns
+    y = factor.to_numpy(dtype=float)
+    E = None
+    if exposures:
+        E = np.stack([np.broadcast_to(v.reindex(cols).to_numpy(dtype=float), y.shape) if isinstance(v, pd.Series)
+                      else v.reindex(index=idx, columns=cols).to_numpy(dtype=float) for v in exposures.values()], axis=-1)
+    codes = None
+    if sectors is not None:
+        lab = sectors.reindex(cols) if isinstance(sectors, pd.Series) else sectors.reindex(index=idx, columns=cols)
+        c, _ = pd.factorize(lab.to_numpy().ravel())
+        codes = np.broadcast_to(c.reshape(lab.shape), y.shape)
+    return pd.DataFrame(_neutralize_arrays(y, E, codes, ridge), index=idx, columns=cols)
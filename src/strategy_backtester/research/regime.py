@@ -1,18 +1,185 @@
 from __future__ import annotations
+from pathlib import Path
 import numpy as np, pandas as pd
-from sklearn.cluster import KMeans
+from ..indicators import kernels as K
+
+FEATURES = ("vol", "mean", "skew")
+
+def regime_features(rets, feat_window: int=21) -> np.ndarray:
+    """Rolling (vol, mean, skew) of returns (NaN filled with 0): (T, 3) for a series, (T, N, 3) for a
+    (dates x assets) panel, computed for all assets in one pass of the window kernels."""
+    r = np.nan_to_num(np.asarray(rets, dtype=float))
+    return np.stack([K.rolling_std(r, feat_window, ddof=0), K.rolling_mean(r, feat_window), K.rolling_skew(r, feat_window)], axis=-1)
 
 def kmeans_regimes(rets: pd.Series, k: int=3, feat_window: int=21, seed: int=0) -> pd.Series:
     """Cluster regimes on features: rolling vol, mean, skew (price-based)."""
-    r = rets.fillna(0)
-    vol = r.rolling(feat_window).std(ddof=0)
-    mean = r.rolling(feat_window).mean()
-    skew = r.rolling(feat_window).apply(lambda x: pd.Series(x).skew(), raw=False)
-    X = np.c_[vol, mean, skew]
+    X = regime_features(rets.fillna(0).to_numpy(dtype=float), feat_window)
     mask = ~np.isnan(X).any(axis=1)
+    from sklearn.cluster import KMeans
     km = KMeans(n_clusters=k, random_state=seed, n_init=10).fit(X[mask])
-    lab = np.full(len(r), -1); lab[mask] = km.labels_
+    lab = np.full(len(rets), -1); lab[mask] = km.labels_
     return pd.Series(lab, index=rets.index, name="regime")
 
-def blend_by_regime(signal: pd.Series, regime: pd.Series, weights: dict[int,float]) -> pd.Series:
-    return signal * regime.map(weights).fillna(0.0)
+class RegimeModel:
+    """K-means regimes on standardized (vol, mean, skew) features, fitted once and reused.
+
+    `fit` pools the feature rows of a series or of every asset in a panel (KMeans, or MiniBatchKMeans
+    when `batch_size` is set) and relabels clusters by ascending volatility, so label 0 is the calmest
+    regime across refits. `partial_fit` folds new bars into the centroids as running means without
+    refitting; `predict` labels a series or a whole panel in one batched call; `stream` returns an
+    `OnlineRegimes` that labels each new bar in O(k). Centroids, scaler and counts persist via
+    `save`/`load` (.npz). Label -1 marks bars without a full feature window.
+    """
+    def __init__(self, k: int=3, feat_window: int=21, seed: int=0, n_init: int=10, batch_size: int|None=None):
+        self.k, self.feat_window, self.seed, self.n_init, self.batch_size = k, feat_window, seed, n_init, batch_size
+        self.centers_: np.ndarray|None = None  # (k, 3), standardized feature space
+        self.mean_, self.scale_ = np.zeros(3), np.ones(3)
+        self.counts_ = np.zeros(k)
+
+    def _rows(self, rets) -> np.ndarray:
+        X = regime_features(rets, self.feat_window).reshape(-1, 3)
+        return X[~np.isnan(X).any(axis=1)]
+
+    def _check(self):
+        if self.centers_ is None: raise RuntimeError("RegimeModel is not fitted")
+
+    def fit(self, rets) -> "RegimeModel":
+        X = self._rows(rets)
+        if len(X) < self.k: raise ValueError(f"need at least k={self.k} complete feature rows, got {len(X)}")
+        self.mean_ = X.mean(axis=0)
+        sd = X.std(axis=0)
+        self.scale_ = np.where(sd > 0, sd, 1.0)
+        Z = (X - self.mean_) / self.scale_
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+        if self.batch_size: km = MiniBatchKMeans(self.k, batch_size=self.batch_size, random_state=self.seed, n_init=self.n_init)
+        else: km = KMeans(self.k, random_state=self.seed, n_init=self.n_init)
+        km.fit(Z)
+        order = np.argsort(km.cluster_centers_[:, 0] * self.scale_[0] + self.mean_[0])
+        self.centers_ = km.cluster_centers_[order].copy()
+        self.counts_ = np.bincount(np.argsort(order)[km.labels_], minlength=self.k).astype(float)
+        return self
+
+    def partial_fit(self, rets) -> "RegimeModel":
+        """Move each centroid to the running mean of all rows assigned to it (scaler kept fixed)."""
+        self._check()
+        Z = (self._rows(rets) - self.mean_) / self.scale_
+        lab = self._assign(Z)
+        n = np.bincount(lab, minlength=self.k).astype(float)
+        s = np.stack([np.bincount(lab, weights=Z[:, j], minlength=self.k) for j in range(3)], axis=1)
+        tot = self.counts_ + n
+        hit = n > 0
+        self.centers_[hit] = (self.centers_[hit] * self.counts_[hit, None] + s[hit]) / tot[hit, None]
+        self.counts_ = tot
+        return self
+
+    def _assign(self, Z: np.ndarray) -> np.ndarray:
+        d = ((Z[..., None, :] - self.centers_) ** 2).sum(axis=-1)
+        return d.argmin(axis=-1)
+
+    def classify(self, X: np.ndarray) -> np.ndarray:
+        """Labels for raw feature rows (..., 3); -1 where any feature is NaN."""
+        self._check()
+        bad = np.isnan(X).any(axis=-1)
+        lab = self._assign((np.where(bad[..., None], 0.0, X) - self.mean_) / self.scale_)
+        lab[bad] = -1
+        return lab
+
+    def predict(self, rets):
+        """Regime labels for a returns Series (Series) or (dates x assets) DataFrame (DataFrame)."""
+        lab = self.classify(regime_features(rets, self.feat_window))
+        if isinstance(rets, pd.DataFrame): return pd.DataFrame(lab, index=rets.index, columns=rets.columns)
+        return pd.Series(lab, index=getattr(rets, "index", None), name="regime")
+
+    def stream(self, n_assets: int=1) -> "OnlineRegimes":
+        self._check()
+        return OnlineRegimes(self, n_assets)
+
+    def save(self, path: str|Path):
+        self._check()
+        np.savez(path, centers=self.centers_, mean=self.mean_, scale=self.scale_, counts=self.counts_,
+                 params=np.array([self.k, self.feat_window, self.seed]))
+
+    @classmethod
+    def load(cls, path: str|Path) -> "RegimeModel":
+        with np.load(path) as z:
+            k, feat_window, seed = (int(v) for v in z["params"])
+            m = cls(k, feat_window, seed)
+            m.centers_, m.mean_, m.scale_, m.counts_ = z["centers"], z["mean"], z["scale"], z["counts"]
+        return m
+
+class OnlineRegimes:
+    """Incremental regime labels for N assets, one bar at a time.
+
+    Keeps the last `feat_window` returns per asset in a ring buffer with running power sums about a
+    per-asset center; each `update` is O(1) for the features plus O(k) to pick the nearest centroid.
+    The sums are rebuilt from the buffer once per window (amortized O(1)) to bound float drift.
+    Features match `regime_features`, so labels agree with `RegimeModel.predict` on the same history.
+    """
+    def __init__(self, model: RegimeModel, n_assets: int=1):
+        self.model, self.w = model, model.feat_window
+        self.buf = np.zeros((self.w, n_assets))
+        self.n = 0  # bars seen
+        self.c = np.zeros(n_assets)
+        self.s = np.zeros((3, n_assets))
+
+    def _rebuild(self):
+        filled = self.buf[:min(self.n, self.w)]
+        self.c = filled.mean(axis=0) if len(filled) else np.zeros(self.buf.shape[1])
+        d = filled - self.c
+        self.s = np.stack([d.sum(axis=0), (d * d).sum(axis=0), (d ** 3).sum(axis=0)])
+
+    def _power(self, x: np.ndarray) -> np.ndarray:
+        d = x - self.c
+        return np.stack([d, d * d, d ** 3])
+
+    def features(self) -> np.ndarray:
+        """Current (N, 3) feature rows (NaN until a full window has been seen)."""
+        N, w = self.buf.shape[1], float(self.w)
+        if self.n < self.w: return np.full((N, 3), np.nan)
+        s1, s2, s3 = self.s
+        A = s1 / w
+        B = np.maximum(s2 / w - A * A, 0.0)
+        C = s3 / w - A ** 3 - 3 * A * B
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sk = np.where(B <= 1e-14, 0.0, np.sqrt(w * (w - 1)) * C / ((w - 2) * B ** 1.5))
+        if self.w < 3: sk = np.full(N, np.nan)
+        return np.stack([np.sqrt(B), A + self.c, sk], axis=1)
+
+    def update(self, r) -> np.ndarray:
+        """Add one bar of returns (scalar or length-N; NaN counts as 0) and return the (N,) labels."""
+        x = np.nan_to_num(np.broadcast_to(np.asarray(r, dtype=float), self.buf.shape[1:]))
+        i = self.n % self.w
+        old = self.buf[i].copy()
+        self.buf[i] = x
+        self.n += 1
+        if i == self.w - 1: self._rebuild()
+        else:
+            self.s += self._power(x)
+            if self.n > self.w: self.s -= self._power(old)
+        return self.model.classify(self.features())
+
+    def warm(self, history) -> np.ndarray:
+        """Feed a (T,) or (T, N) block of past returns; returns the labels after its last bar."""
+        h = np.asarray(history, dtype=float)
+        h = h[-self.w:].reshape(-1, self.buf.shape[1])
+        lab = np.full(self.buf.shape[1], -1)
+        for row in h: lab = self.update(row)
+        return lab
+
+def regime_weights(labels, weights: dict[int, float]) -> np.ndarray:
+    """Map integer regime labels to blend weights through a lookup table (unknown labels -> 0)."""
+    lab = np.asarray(labels, dtype=np.int64)
+    lo = min(int(lab.min(initial=0)), min(weights, default=0))
+    hi = max(int(lab.max(initial=0)), max(weights, default=0))
+    lut = np.zeros(hi - lo + 1)
+    for k, w in weights.items(): lut[k - lo] = w
+    return lut[lab - lo]
+
+def blend_by_regime(signal, regime, weights: dict[int,float]):
+    """Scale a signal by its regime's weight. `regime` is a label Series aligned by index (as
+    before), a label DataFrame matching a signal panel (`RegimeModel.predict`), or live labels
+    (an int or the (N,) array from `OnlineRegimes.update`) for the current bar."""
+    if isinstance(regime, pd.Series): return signal * regime.map(weights).fillna(0.0)
+    if isinstance(regime, pd.DataFrame):
+        return signal * pd.DataFrame(regime_weights(regime.fillna(-1).to_numpy(), weights), index=regime.index, columns=regime.columns)
+    return signal * regime_weights(regime, weights)
@@ -1,15 +1,15 @@
 from __future__ import annotations
 import numpy as np, pandas as pd
-from scipy.stats import t, norm, skew, kurtosis
+from ..backtest.metrics import TRADING_DAYS, periods_per_year
 
-TRADING_DAYS = 252
-
-def _ann_mu_sig(r):
+def _ann_mu_sig(r, freq="daily"):
     r = pd.Series(r).dropna()
-    return r.mean()*TRADING_DAYS, r.std(ddof=0)*np.sqrt(TRADING_DAYS)
+    n = periods_per_year(freq, r.index if isinstance(freq, str) else None)
+    return r.mean()*n, r.std(ddof=0)*np.sqrt(n)
 
 def probabilistic_sharpe(r, sr_bench=0.0, n_eff=None):
     """PSR: P(SR > sr_bench). Uses Bailey–Lopez de Prado approx."""
+    from scipy.stats import norm, skew, kurtosis
     r = pd.Series(r).dropna()
     n = len(r) if n_eff is None else n_eff
     sr = r.mean()/r.std(ddof=0) if r.std(ddof=0) > 0 else 0.0
@@ -21,6 +21,7 @@ def probabilistic_sharpe(r, sr_bench=0.0, n_eff=None):
 
 def deflated_sharpe(sr, sr_max, n_trials, n_obs):
     """Deflated Sharpe Ratio (DSR): accounts for multiple testing. sr_max = max Sharpe across trials."""
+    from scipy.stats import norm
     # Expected max Sharpe from noise (approx)
     emax = sr * (1 - 1.0/(n_obs-1)) + np.sqrt((1 - sr**2)/(n_obs-1)) * norm.ppf(1 - 1.0/n_trials)
     dsr = (sr_max - emax) / np.sqrt((1 - sr**2)/(n_obs - 1))
@@ -28,6 +29,7 @@ def deflated_sharpe(sr, sr_max, n_trials, n_obs):
 
 def sharpe_ci(r, alpha=0.05):
     """Approximate CI for annualized Sharpe using Lo's method (assuming IID-ish)."""
+    from scipy.stats import norm
     r = pd.Series(r).dropna()
     n = len(r)
     sr = r.mean()/r.std(ddof=0) if r.std(ddof=0)>0 else 0.0
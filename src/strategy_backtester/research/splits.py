@@ -1,36 +1,113 @@
 from __future__ import annotations
+from itertools import combinations
 import numpy as np, pandas as pd
 
-def walk_forward_splits(idx: pd.DatetimeIndex, train_years=3, test_months=6, step_months=6, embargo_days=5):
-    """Yield (train_idx, test_idx) expanding walk-forward splits with an embargo."""
-    start, end = idx.min(), idx.max()
+class Split:
+    """One train/test split as sorted, disjoint (start, stop) position ranges into an index.
+    Positions and DatetimeIndex views are only materialized on request."""
+    __slots__ = ("train", "test")
+    def __init__(self, train: list[tuple[int, int]], test: list[tuple[int, int]]):
+        self.train, self.test = train, test
+
+    @staticmethod
+    def _positions(ranges) -> np.ndarray:
+        return np.concatenate([np.arange(a, b) for a, b in ranges]) if ranges else np.empty(0, dtype=int)
+
+    def train_positions(self) -> np.ndarray: return self._positions(self.train)
+    def test_positions(self) -> np.ndarray: return self._positions(self.test)
+    @staticmethod
+    def _view(x, ranges):
+        # contiguous -> slice view; otherwise gather the positions
+        if len(ranges) == 1: return x[ranges[0][0]:ranges[0][1]]
+        return x[Split._positions(ranges)]
+
+    def train_index(self, idx: pd.DatetimeIndex) -> pd.DatetimeIndex: return self._view(idx, self.train)
+    def test_index(self, idx: pd.DatetimeIndex) -> pd.DatetimeIndex: return self._view(idx, self.test)
+    def take_test(self, x: np.ndarray) -> np.ndarray: return self._view(x, self.test)
+    def __repr__(self): return f"Split(train={self.train}, test={self.test})"
+
+    @classmethod
+    def from_positions(cls, train: np.ndarray, test: np.ndarray) -> "Split":
+        return cls(_runs(np.asarray(train)), _runs(np.asarray(test)))
+
+def _runs(pos: np.ndarray) -> list[tuple[int, int]]:
+    """Sorted positions -> contiguous (start, stop) runs."""
+    if len(pos) == 0: return []
+    breaks = np.flatnonzero(np.diff(pos) != 1) + 1
+    return [(int(s[0]), int(s[-1]) + 1) for s in np.split(pos, breaks)]
+
+def _merge(ranges: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    out = []
+    for a, b in sorted(ranges):
+        if out and a <= out[-1][1]: out[-1] = (out[-1][0], max(out[-1][1], b))
+        else: out.append((a, b))
+    return out
+
+def _complement(n: int, holes: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """[0, n) minus the union of `holes`, as merged ranges."""
+    out, cur = [], 0
+    for a, b in sorted(holes):
+        if a > cur: out.append((cur, a))
+        cur = max(cur, b)
+    if cur < n: out.append((cur, n))
+    return out
+
+def walk_forward_ranges(idx: pd.DatetimeIndex, train_years=3, test_months=6, step_months=6, embargo_days=5) -> list[Split]:
+    """Expanding walk-forward splits with an embargo, located by `searchsorted` on a sorted index."""
+    start, end = idx[0], idx[-1]
     cur_end = start + pd.DateOffset(years=train_years)
+    out = []
     while cur_end + pd.DateOffset(months=test_months) <= end:
-        train = idx[(idx >= start) & (idx < cur_end)]
         test_start = cur_end + pd.Timedelta(days=embargo_days)
         test_end = test_start + pd.DateOffset(months=test_months)
-        test = idx[(idx >= test_start) & (idx < test_end)]
-        if len(test) > 0: yield train, test
+        tr_hi, lo, hi = idx.searchsorted([cur_end, test_start, test_end], "left")
+        if hi > lo: out.append(Split([(0, int(tr_hi))] if tr_hi else [], [(int(lo), int(hi))]))
         cur_end = cur_end + pd.DateOffset(months=step_months)
+    return out
 
-def purged_kfold(idx: pd.DatetimeIndex, n_splits=5, embargo_days=5):
-    """Time-series KFold with purge/embargo (Lopez de Prado). Returns list of (train_idx, test_idx)."""
-    n = len(idx)
-    fold_sizes = np.full(n_splits, n // n_splits, dtype=int)
-    fold_sizes[: n % n_splits] += 1
-    bounds, cur = [], 0
-    for fs in fold_sizes:
-        bounds.append((cur, cur+fs))
-        cur += fs
+def _fold_bounds(n: int, n_splits: int) -> list[tuple[int, int]]:
+    sizes = np.full(n_splits, n // n_splits, dtype=int)
+    sizes[: n % n_splits] += 1
+    stops = np.cumsum(sizes)
+    return [(int(b - s), int(b)) for s, b in zip(sizes, stops)]
+
+def purged_kfold_ranges(idx: pd.DatetimeIndex, n_splits=5, embargo_days=5) -> list[Split]:
+    """Contiguous K folds; train drops everything within `embargo_days` of the test block."""
+    out, emb = [], pd.Timedelta(days=embargo_days)
+    for lo, hi in _fold_bounds(len(idx), n_splits):
+        a = int(idx.searchsorted(idx[lo] - emb, "left"))
+        b = int(idx.searchsorted(idx[hi - 1] + emb, "right"))
+        out.append(Split(_complement(len(idx), [(a, b)]), [(lo, hi)]))
+    return out
+
+def cpcv_ranges(idx: pd.DatetimeIndex, n_groups=6, n_test_groups=2, horizon_days=0, embargo_days=5) -> list[Split]:
+    """Combinatorial purged CV (Lopez de Prado): every choice of `n_test_groups` of `n_groups`
+    contiguous groups is a test set. Labels span [t, t + horizon_days]; training observations
+    whose label overlaps a test label window are purged, and `embargo_days` follow each test group."""
+    n, h, emb = len(idx), pd.Timedelta(days=horizon_days), pd.Timedelta(days=embargo_days)
+    groups = _fold_bounds(n, n_groups)
+    # per group: the training hole [first obs whose label reaches the group, last obs inside label + embargo]
+    los = idx.searchsorted(idx[[lo for lo, _ in groups]] - h, "left")
+    his = idx.searchsorted(idx[[hi - 1 for _, hi in groups]] + h + emb, "right")
     out = []
-    for lo, hi in bounds:
-        test = idx[lo:hi]
-        left_cut = idx[0:lo]
-        right_cut = idx[hi:n]
-        # embargo around test
-        emb_lo = test.min() - pd.Timedelta(days=embargo_days)
-        emb_hi = test.max() + pd.Timedelta(days=embargo_days)
-        train = idx[(idx < emb_lo) | (idx > emb_hi)]
-        train = train.intersection(left_cut.append(right_cut))
-        out.append((train, test))
+    for test in combinations(range(n_groups), n_test_groups):
+        holes = [(int(los[g]), int(his[g])) for g in test]
+        out.append(Split(_complement(n, holes), _merge([groups[g] for g in test])))
     return out
+
+def cpcv_paths(n_groups=6, n_test_groups=2) -> list[list[tuple[int, int]]]:
+    """Backtest paths for `cpcv_ranges` output: each path lists (split_id, group) covering every
+    group once. There are n_test_groups/n_groups * C(n_groups, n_test_groups) paths."""
+    combos = list(combinations(range(n_groups), n_test_groups))
+    seen = {g: [i for i, c in enumerate(combos) if g in c] for g in range(n_groups)}
+    n_paths = len(seen[0])
+    return [[(seen[g][p], g) for g in range(n_groups)] for p in range(n_paths)]
+
+def walk_forward_splits(idx: pd.DatetimeIndex, train_years=3, test_months=6, step_months=6, embargo_days=5):
+    """Yield (train_idx, test_idx) expanding walk-forward splits with an embargo."""
+    for s in walk_forward_ranges(idx, train_years, test_months, step_months, embargo_days):
+        yield s.train_index(idx), s.test_index(idx)
+
+def purged_kfold(idx: pd.DatetimeIndex, n_splits=5, embargo_days=5):
+    """Time-series KFold with purge/embargo (Lopez de Prado). Returns list of (train_idx, test_idx)."""
+    return [(s.train_index(idx), s.test_index(idx)) for s in purged_kfold_ranges(idx, n_splits, embargo_days)]
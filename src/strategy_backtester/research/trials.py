@@ -0,0 +1,216 @@
+"""Registry of backtest trials for multiple-testing-aware Sharpe statistics.
+
+Every return stream a research cycle produces (sweep combos, walk-forward runs, Optuna trials) is
+appended as a column of one (dates x trials) matrix. Per-trial moments are computed once, in a
+single vectorized pass over each appended block, so PSR, DSR and Sharpe confidence intervals for
+all trials are O(n_trials) arithmetic with the formulas of `research.sharpe`. The number of
+independent trials for the DSR comes from clustering trials by return correlation.
+"""
+from __future__ import annotations
+import numpy as np, pandas as pd
+from ..backtest.metrics import periods_per_year
+
+def _moments(X: np.ndarray) -> tuple[np.ndarray, ...]:
+    """Count, mean and central moments m2..m4 (ddof=0) per column, ignoring NaN."""
+    X = X.astype(np.float64, copy=False)
+    ok = ~np.isnan(X)
+    n = ok.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(ok, X, 0.0).sum(axis=0) / n
+        d = np.where(ok, X - mean, 0.0)
+        d2 = d * d
+        m2 = d2.sum(axis=0) / n
+        m3 = (d2 * d).sum(axis=0) / n
+        m4 = (d2 * d2).sum(axis=0) / n
+    return n, mean, m2, m3, m4
+
+def sharpe_stats(n, mean, m2, m3, m4) -> dict[str, np.ndarray]:
+    """Per-period Sharpe (std ddof=0; 0 for flat streams), bias-corrected skew and excess kurtosis
+    (scipy `skew`/`kurtosis` with bias=False), vectorized over trials."""
+    n = np.asarray(n, dtype=float)
+    sd = np.sqrt(m2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sr = np.where(sd > 0, mean / sd, 0.0)
+        g1 = m3 / m2 ** 1.5
+        g2 = m4 / m2 ** 2 - 3.0
+        skew = np.sqrt(n * (n - 1)) / (n - 2) * g1
+        kurt = ((n + 1) * g2 + 6) * (n - 1) / ((n - 2) * (n - 3))
+    return {"n": n, "sr": sr, "skew": skew, "kurt": kurt}
+
+def psr(sr, skew, kurt, n, sr_bench=0.0) -> np.ndarray:
+    """`sharpe.probabilistic_sharpe` for arrays of trials (sr_bench may be per trial)."""
+    from scipy.stats import norm
+    with np.errstate(invalid="ignore"):
+        den = np.sqrt(1 - skew * sr + (kurt - 1) / 4 * sr ** 2)
+        z = np.where(den > 0, (sr - sr_bench) * np.sqrt(n - 1) / den, 0.0)
+    return norm.cdf(z)
+
+def expected_max_sharpe(sr_var: float, n_trials: float) -> float:
+    """E[max SR] of `n_trials` independent zero-skill trials whose Sharpes have variance `sr_var`
+    (Bailey & Lopez de Prado), the benchmark the DSR tests against."""
+    from scipy.stats import norm
+    if n_trials <= 1 or not sr_var > 0: return 0.0
+    g = 0.5772156649015329  # Euler-Mascheroni
+    return float(np.sqrt(sr_var) * ((1 - g) * norm.ppf(1 - 1 / n_trials) + g * norm.ppf(1 - 1 / (n_trials * np.e))))
+
+def leader_clusters(X: np.ndarray, mean: np.ndarray, scale: np.ndarray, order: np.ndarray, threshold: float,
+                    block: int=1024, dtype=np.float64) -> np.ndarray:
+    """Greedy correlation clustering of the columns of X. Columns are standardized on the fly as
+    (x - mean) / scale with NaN -> 0 (scale = std * sqrt(n), so dot products are correlations).
+    Walking `order`, a trial joins the first leader it correlates with at >= `threshold`, else it
+    leads a new cluster. Work is blocks of matrix products against the leaders, which are kept in
+    a geometrically grown `dtype` buffer; the full n x n correlation is never formed. Returns
+    labels (cluster id = leader rank)."""
+    labels = np.full(X.shape[1], -1)
+    T = len(X)
+    L = np.empty((T, min(block, len(order)) or 1), dtype=dtype)  # standardized leader columns
+    k = 0
+    for b in range(0, len(order), block):
+        ids = order[b:b + block]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            B = (X[:, ids].astype(np.float64) - mean[ids]) / scale[ids]
+        B[np.isnan(B)] = 0.0
+        B = B.astype(dtype, copy=False)
+        if k:
+            hit = (L[:, :k].T @ B) >= threshold
+            got = hit.any(axis=0)
+            labels[ids[got]] = hit.argmax(axis=0)[got]
+        if k + len(ids) > L.shape[1]:  # room for every column of the block to open a cluster
+            grown = np.empty((T, max(2 * L.shape[1], k + len(ids))), dtype=dtype)
+            grown[:, :k] = L[:, :k]
+            L = grown
+        k0 = k  # leaders opened inside this block are appended at L[:, k0:k]
+        for j in np.flatnonzero(labels[ids] < 0):
+            if k > k0:
+                hit = (L[:, k0:k].T @ B[:, j]) >= threshold
+                if hit.any(): labels[ids[j]] = k0 + int(hit.argmax()); continue
+            labels[ids[j]] = k
+            L[:, k] = B[:, j]
+            k += 1
+    return labels
+
+class TrialRegistry:
+    """Collects trial return streams into one compact (dates x trials) matrix.
+
+    `add` takes one stream (a Series is aligned to the registry's dates), `add_matrix` a whole block,
+    e.g. a sweep chunk; keyword/params metadata is kept per trial. `stats` returns one row per trial
+    with PSR, DSR and the Sharpe CI. Streams are stored as `dtype` (float32 by default; moments are
+    accumulated in float64 at insertion). Missing dates are NaN and excluded, as `dropna` does in
+    `research.sharpe`. `freq` is the bar frequency `sr_ann` is annualized at.
+    """
+    def __init__(self, index: pd.Index|None=None, dtype=np.float32, capacity: int=256, freq: str|float|None="daily"):
+        self.index, self.dtype, self.freq = index, dtype, freq
+        self._R: np.ndarray|None = None
+        self._cap, self.n_trials = capacity, 0
+        self._mom = [np.empty(0) for _ in range(5)]  # n, mean, m2, m3, m4
+        self.params: list[dict] = []
+        self._clusters: dict = {}   # threshold -> (n_eff, labels), reset by add_matrix
+        self._deflated: dict = {}   # (threshold, n_trials) -> (labels, n_trials, sr0)
+
+    def __len__(self): return self.n_trials
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """(dates x trials) view of the stored streams."""
+        return self._R[:, :self.n_trials] if self._R is not None else np.empty((0, 0), dtype=self.dtype)
+
+    def _align(self, R, index) -> np.ndarray:
+        if isinstance(R, (pd.Series, pd.DataFrame)): index, R = R.index, R.to_numpy(dtype=float)
+        R = np.asarray(R, dtype=float)
+        if R.ndim == 1: R = R[:, None]
+        if self.index is None:
+            self.index = pd.RangeIndex(len(R)) if index is None else pd.Index(index)
+        elif index is not None and not self.index.equals(pd.Index(index)):
+            pos = pd.Index(index).get_indexer(self.index)
+            R = np.where((pos >= 0)[:, None], R[np.maximum(pos, 0)], np.nan)
+        if len(R) != len(self.index): raise ValueError(f"expected {len(self.index)} dates, got {len(R)}")
+        return R
+
+    def _reserve(self, k: int):
+        T = len(self.index)
+        if self._R is None: self._R = np.empty((T, max(self._cap, k)), dtype=self.dtype)
+        elif self.n_trials + k > self._R.shape[1]:
+            grown = np.empty((T, max(2 * self._R.shape[1], self.n_trials + k)), dtype=self.dtype)
+            grown[:, :self.n_trials] = self.matrix
+            self._R = grown
+
+    def add_matrix(self, R, index=None, params: pd.DataFrame|list[dict]|None=None) -> range:
+        """Append every column of a (dates x k) block; returns the new trial ids."""
+        R = self._align(R, index)
+        k = R.shape[1]
+        if isinstance(params, pd.DataFrame): params = params.to_dict("records")
+        params = [{} for _ in range(k)] if params is None else list(params)
+        if len(params) != k: raise ValueError("one params record per column")
+        self._reserve(k)
+        lo = self.n_trials
+        self._R[:, lo:lo + k] = R
+        self._mom = [np.concatenate([a, b]) for a, b in zip(self._mom, _moments(R))]
+        self.params += params
+        self.n_trials += k
+        self._clusters.clear(); self._deflated.clear()
+        return range(lo, lo + k)
+
+    def add(self, returns, index=None, **params) -> int:
+        """Append one return stream (Series or array) with its parameters; returns its trial id."""
+        return self.add_matrix(returns, index, [params])[0]
+
+    def moments(self) -> pd.DataFrame:
+        s = sharpe_stats(*self._mom)
+        return pd.DataFrame({"n": self._mom[0], "mean": self._mom[1], "std": np.sqrt(self._mom[2]),
+                             "skew": s["skew"], "kurt": s["kurt"]})
+
+    def effective_trials(self, threshold: float=0.7, block: int=1024) -> tuple[int, np.ndarray]:
+        """Number of correlation clusters among the trials (`leader_clusters`, best Sharpe first)
+        and each trial's cluster label (-1 for flat streams, which are not counted). Cached per
+        threshold until the next `add`/`add_matrix` (labels do not depend on `block`)."""
+        if threshold in self._clusters:
+            n_eff, labels = self._clusters[threshold]
+            return n_eff, labels.copy()
+        n, mean, m2 = self._mom[0], self._mom[1], self._mom[2]
+        sd = np.sqrt(m2)
+        live = np.flatnonzero((sd > 0) & (n > 1))
+        sr = sharpe_stats(*self._mom)["sr"]
+        labels = leader_clusters(self.matrix, mean, sd * np.sqrt(n), live[np.argsort(-sr[live], kind="stable")],
+                                 threshold, block, self.dtype)
+        self._clusters[threshold] = (int(labels.max(initial=-1) + 1), labels)
+        return self._clusters[threshold][0], labels.copy()
+
+    def _deflation(self, threshold: float, n_trials: int|None) -> tuple[np.ndarray, int, float]:
+        """Cluster labels, trial count and SR0, the expected maximum Sharpe of
+        `n_trials` independent trials (default: the cluster count) with the Sharpe variance taken
+        across the cluster leaders. Cached per (threshold, n_trials) until the next `add_matrix`."""
+        key = (threshold, n_trials)
+        if key not in self._deflated:
+            s = sharpe_stats(*self._mom)
+            n_eff, labels = self.effective_trials(threshold)
+            n = n_eff if n_trials is None else n_trials
+            # leaders open their cluster, so each leader is its cluster's best Sharpe
+            sr_lead = pd.Series(s["sr"][labels >= 0]).groupby(labels[labels >= 0]).max().to_numpy()
+            self._deflated[key] = (labels, n, expected_max_sharpe(float(np.var(sr_lead, ddof=1)) if len(sr_lead) > 1 else 0.0, n))
+        return self._deflated[key]
+
+    def stats(self, sr_bench: float=0.0, alpha: float=0.05, threshold: float=0.7, n_trials: int|None=None) -> pd.DataFrame:
+        """One row per trial: params, n, per-period and annualized Sharpe, skew, excess kurtosis,
+        PSR against `sr_bench`, DSR and the (1 - alpha) Sharpe CI (`sharpe.sharpe_ci`).
+
+        DSR is the PSR against SR0, the expected maximum Sharpe of `n_trials` independent trials
+        (default: the correlation-cluster count from `effective_trials`), with the Sharpe variance
+        taken across the cluster leaders. `sr_max` is the best Sharpe in the registry.
+        """
+        from scipy.stats import norm
+        s = sharpe_stats(*self._mom)
+        labels, n_trials, sr0 = self._deflation(threshold, n_trials)
+        half = norm.ppf(1 - alpha / 2) / np.sqrt(s["n"] - 1)
+        out = pd.DataFrame(self.params)
+        out = out.assign(n=s["n"].astype(int), sr=s["sr"], sr_ann=s["sr"] * np.sqrt(periods_per_year(self.freq, self.index)),
+                         skew=s["skew"], kurt=s["kurt"], psr=psr(s["sr"], s["skew"], s["kurt"], s["n"], sr_bench),
+                         dsr=psr(s["sr"], s["skew"], s["kurt"], s["n"], sr0),
+                         ci_lo=s["sr"] - half, ci_hi=s["sr"] + half, cluster=labels.copy())
+        out.attrs.update(n_trials=n_trials, sr_max=float(s["sr"].max(initial=-np.inf)), sr0=sr0)
+        return out
+
+    def deflated_sharpe(self, trial: int, threshold: float=0.7, n_trials: int|None=None) -> float:
+        """DSR of one trial, the same value as `stats()["dsr"]`, without building the table."""
+        _, _, sr0 = self._deflation(threshold, n_trials)
+        s = sharpe_stats(*(m[trial] for m in self._mom))
+        return float(psr(s["sr"], s["skew"], s["kurt"], s["n"], sr0))
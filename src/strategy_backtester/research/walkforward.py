@@ -0,0 +1,66 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np, pandas as pd
+from ..backtest import metrics as M
+from .splits import Split, walk_forward_ranges
+
+_METRICS = ("CAGR", "Volatility", "Sharpe", "MaxDrawdown")
+
+def as_ranges(idx: pd.DatetimeIndex, splits) -> list[Split]:
+    """Accept `Split` range objects as-is; convert (train, test) DatetimeIndex pairs to positions."""
+    return [s if isinstance(s, Split) else Split.from_positions(idx.get_indexer(s[0]), idx.get_indexer(s[1])) for s in splits]
+
+class WalkForwardEvaluator:
+    """Out-of-sample evaluation that runs the backtest once over the full history and then scores
+    each fold's test window by position range. Folds come from `walk_forward_ranges`,
+    `purged_kfold_ranges`, `cpcv_ranges` (or their DatetimeIndex counterparts), so embargo and
+    purge gaps are kept; cost scales with history, not history x folds. With a `TrialRegistry` as
+    `registry`, every evaluated parameter set is recorded as a trial: its returns on the union of
+    the test windows (NaN elsewhere).
+    """
+    def __init__(self, engine, price: pd.Series, signals_fn, splits=None, max_workers: int|None=None, registry=None):
+        self.engine, self.price, self.signals_fn = engine, price, signals_fn
+        idx = price.index
+        self.folds = walk_forward_ranges(idx) if splits is None else as_ranges(idx, splits)
+        self.max_workers = max_workers
+        self.registry = registry
+        self._oos = np.zeros(len(idx), dtype=bool)
+        for s in self.folds:
+            for a, b in s.test: self._oos[a:b] = True
+
+    def _record(self, R: np.ndarray, params: list[dict]):
+        self.registry.add_matrix(np.where(self._oos[:, None], R, np.nan), self.price.index, params)
+
+    def _fold_row(self, i: int, returns: np.ndarray) -> dict:
+        idx, s = self.price.index, self.folds[i]
+        r = s.take_test(returns)
+        stats = M.summary_matrix(r, freq=self.engine.periods_per_year(idx))
+        row = {"fold": i, "train_start": idx[s.train[0][0]] if s.train else pd.NaT,
+               "train_end": idx[s.train[-1][1] - 1] if s.train else pd.NaT,
+               "test_start": idx[s.test[0][0]], "test_end": idx[s.test[-1][1] - 1], "n_test": len(r)}
+        return dict(row, **{k: float(stats[k][0]) for k in _METRICS})
+
+    def evaluate(self, **sig_kwargs) -> pd.DataFrame:
+        """Per-fold test metrics for one parameter set (one full-history backtest)."""
+        r = self.engine.run_single(self.price, self.signals_fn, **sig_kwargs).returns.to_numpy()
+        if self.registry is not None: self._record(r[:, None], [sig_kwargs])
+        if self.max_workers and self.max_workers > 1:
+            with ThreadPoolExecutor(self.max_workers) as ex:
+                rows = list(ex.map(lambda i: self._fold_row(i, r), range(len(self.folds))))
+        else:
+            rows = [self._fold_row(i, r) for i in range(len(self.folds))]
+        return pd.DataFrame(rows)
+
+    def score(self, metric: str="Sharpe", **sig_kwargs) -> float:
+        """Mean out-of-sample `metric` across folds (the usual walk-forward objective)."""
+        return float(self.evaluate(**sig_kwargs)[metric].mean())
+
+    def evaluate_grid(self, grid: dict|list[dict], metric: str="Sharpe") -> pd.DataFrame:
+        """(combos x folds) test `metric` for a whole grid via the vectorized sweep kernels."""
+        from ..backtest.sweep import expand_grid, sweep_returns
+        combos = expand_grid(grid)
+        R = sweep_returns(self.engine, self.price, self.signals_fn, combos)
+        if self.registry is not None: self._record(R, combos.to_dict("records"))
+        n = self.engine.periods_per_year(self.price.index)
+        out = {i: M.summary_matrix(s.take_test(R), freq=n)[metric] for i, s in enumerate(self.folds)}
+        return pd.concat([combos, pd.DataFrame(out)], axis=1)
@@ -1,12 +1,11 @@
 import pandas as pd
+from ..indicators.kernels import rolling_zscore
 
 def signals(price: pd.Series, z_window: int=20, z_entry: float=1.0) -> pd.Series:
     """
     Mean-reversion (long-only): long when z < -z_entry, else 0.
     z = (price - rolling_mean)/rolling_std
     """
-    m = price.rolling(z_window, min_periods=z_window).mean()
-    s = price.rolling(z_window, min_periods=z_window).std()
-    z = (price - m) / s
+    z = pd.Series(rolling_zscore(price.to_numpy(dtype=float), z_window), index=price.index)
     sig = (z < -z_entry).astype(int).reindex(price.index).fillna(0)
     return sig
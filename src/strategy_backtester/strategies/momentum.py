@@ -1,9 +1,10 @@
 import pandas as pd
+from ..indicators.kernels import lookback_returns
 
 def signals(price: pd.Series, lookback: int=126) -> pd.Series:
     """
     Simple momentum: long if price / price.shift(lookback) - 1 > 0, else 0.
     """
-    mom = price.pct_change(lookback)
+    mom = pd.Series(lookback_returns(price.to_numpy(dtype=float), lookback), index=price.index)
     sig = (mom > 0).astype(int).reindex(price.index).fillna(0)
     return sig
@@ -0,0 +1,156 @@
+from __future__ import annotations
+import hashlib, os, pickle, sys
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+import numpy as np, pandas as pd
+
+CACHE_FORMAT = 1  # bump when the key layout or the pickled result types change
+
+@lru_cache(maxsize=None)
+def _source_digest(path: str) -> bytes:
+    """Digest of a source file, or of every .py file under a package directory."""
+    h = hashlib.blake2b(digest_size=16)
+    p = Path(path)
+    for f in sorted(p.rglob("*.py")) if p.is_dir() else [p]:
+        h.update(str(f.relative_to(p) if p.is_dir() else f.name).encode())
+        try: h.update(f.read_bytes())
+        except OSError: pass
+    return h.digest()
+
+def _salt() -> bytes:
+    """Cache format, package version and the library source, so editing any module a result
+    depends on (kernels, risk, engine, ...) invalidates disk entries written before the edit."""
+    from .. import __version__
+    return f"{CACHE_FORMAT}:{__version__}:".encode() + _source_digest(str(Path(__file__).resolve().parents[1]))
+
+def _feed(h, obj):
+    """Stream a stable byte representation of obj into hash h."""
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        h.update(type(obj).__name__.encode())
+        _feed(h, obj.index)
+        _feed(h, list(obj.columns) if isinstance(obj, pd.DataFrame) else obj.name)
+        h.update(np.ascontiguousarray(obj.to_numpy(dtype=float)).tobytes())
+    elif isinstance(obj, pd.Index):
+        vals = obj.asi8 if isinstance(obj, pd.DatetimeIndex) else np.asarray(obj)
+        h.update(vals.tobytes() if vals.dtype != object else repr(list(vals)).encode())
+    elif isinstance(obj, np.ndarray):
+        h.update(str(obj.dtype).encode() + str(obj.shape).encode()); h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, dict):
+        for k in sorted(obj, key=repr):
+            _feed(h, k); _feed(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"[")
+        for o in obj: _feed(h, o)
+        h.update(b"]")
+    elif callable(obj):
+        # identity, bytecode and the source of its module (helpers it calls there), so editing a
+        # strategy invalidates its disk entries; modules of this package are covered by `_salt`
+        mod = getattr(obj, "__module__", "") or ""
+        h.update(f"{mod}.{getattr(obj, '__qualname__', repr(obj))}".encode())
+        code = getattr(obj, "__code__", None)
+        if code is not None: h.update(code.co_code); h.update(repr(code.co_consts).encode())
+        src = getattr(sys.modules.get(mod), "__file__", None)
+        if src and not mod.startswith(__package__.split(".")[0]): h.update(_source_digest(src))
+    else:
+        h.update(repr(obj).encode())
+    h.update(b"|")
+
+def make_key(*parts) -> str:
+    """Content hash of price slices, strategy functions, kwargs and engine settings, salted with
+    `_salt`."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(_salt())
+    for p in parts: _feed(h, p)
+    return h.hexdigest()
+
+def _nbytes(value) -> int:
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, np.ndarray): return value.nbytes
+    if hasattr(value, "__dict__"): return sum(_nbytes(v) for v in vars(value).values())
+    if isinstance(value, (list, tuple)): return sum(_nbytes(v) for v in value)
+    return 64
+
+class ResultCache:
+    """Two-tier content-addressed cache: an in-memory LRU plus pickles under PROC_DIR/cache.
+    Both tiers evict least-recently-used entries once their byte budget is exceeded.
+    Cached objects are shared, so treat returned values as read-only."""
+    def __init__(self, max_bytes: int=256 * 2**20, disk_dir: str|Path|None=None, max_disk_bytes: int=2 * 2**30,
+                 use_disk: bool=True):
+        self.max_bytes, self.max_disk_bytes = max_bytes, max_disk_bytes
+        self._mem: OrderedDict[str, tuple[object, int]] = OrderedDict()
+        self._mem_bytes = 0
+        self.hits = self.misses = 0
+        self.disk_dir = None
+        if use_disk:
+            if disk_dir is None:
+                from .config import PROC_DIR
+                disk_dir = PROC_DIR / "cache"
+            self.disk_dir = Path(disk_dir)
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*.pkl"))
+
+    # --- memory tier ---
+    def _mem_put(self, key: str, value):
+        size = _nbytes(value)
+        if size > self.max_bytes: return
+        if key in self._mem: self._mem_bytes -= self._mem.pop(key)[1]
+        self._mem[key] = (value, size); self._mem_bytes += size
+        while self._mem_bytes > self.max_bytes:
+            _, (_, s) = self._mem.popitem(last=False)
+            self._mem_bytes -= s
+
+    # --- disk tier ---
+    def _path(self, key: str) -> Path: return self.disk_dir / f"{key}.pkl"
+
+    def _disk_evict(self):
+        files = [(p, p.stat()) for p in self.disk_dir.glob("*.pkl")]
+        total = sum(st.st_size for _, st in files)
+        for p, st in sorted(files, key=lambda f: f[1].st_mtime):  # mtime is bumped on every hit
+            if total <= self.max_disk_bytes: break
+            p.unlink(missing_ok=True); total -= st.st_size
+        self._disk_bytes = total
+
+    def get(self, key: str, default=None):
+        if key in self._mem:
+            self._mem.move_to_end(key); self.hits += 1
+            return self._mem[key][0]
+        if self.disk_dir is not None:
+            p = self._path(key)
+            try:
+                with open(p, "rb") as f: value = pickle.load(f)
+                os.utime(p)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self._mem_put(key, value); self.hits += 1
+                return value
+        self.misses += 1
+        return default
+
+    def put(self, key: str, value):
+        self._mem_put(key, value)
+        if self.disk_dir is not None:
+            tmp = self.disk_dir / f"{key}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f: pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            p = self._path(key)
+            try: self._disk_bytes -= p.stat().st_size  # overwrite: the old file goes away
+            except OSError: pass
+            self._disk_bytes += tmp.stat().st_size
+            os.replace(tmp, p)
+            if self._disk_bytes > self.max_disk_bytes: self._disk_evict()
+
+    def get_or_compute(self, key: str, fn):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = fn(); self.put(key, value)
+        return value
+
+    def clear(self, disk: bool=False):
+        self._mem.clear(); self._mem_bytes = 0
+        if disk and self.disk_dir is not None:
+            for p in self.disk_dir.glob("*.pkl"): p.unlink(missing_ok=True)
+            self._disk_bytes = 0
+
+_MISSING = object()
@@ -1,6 +1,5 @@
 from pathlib import Path
 import os
-from dotenv import load_dotenv
 
 ROOT = Path(__file__).resolve().parents[2]
 DATA_DIR = ROOT / "data"
@@ -8,13 +7,25 @@ RAW_DIR = DATA_DIR / "raw"
 PROC_DIR = DATA_DIR / "processed"
 REPORT_DIR = ROOT / "reports"
 
-load_dotenv(ROOT / ".env")
+_env_loaded = False
 
-ALPHAVANTAGE_API_KEY = os.getenv("ALPHAVANTAGE_API_KEY", "")
-if not ALPHAVANTAGE_API_KEY:
-    # You can still run code that doesn't hit the API,
-    # but fetching will error until you set this.
-    pass
+def load_env() -> None:
+    """Load ROOT/.env once; python-dotenv is only imported when a setting is first read."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv(ROOT / ".env")
+        _env_loaded = True
 
-for d in [DATA_DIR, RAW_DIR, PROC_DIR, REPORT_DIR]:
-    d.mkdir(parents=True, exist_ok=True)
+def ensure_dir(path: Path) -> Path:
+    """Create a data/report directory on first write (nothing is created at import time)."""
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+def __getattr__(name: str):
+    # ALPHAVANTAGE_API_KEY is resolved lazily so importing the package never touches .env.
+    # You can still run code that doesn't hit the API, but fetching will error until it is set.
+    if name == "ALPHAVANTAGE_API_KEY":
+        load_env()
+        return os.getenv("ALPHAVANTAGE_API_KEY", "")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
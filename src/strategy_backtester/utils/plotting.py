@@ -1,41 +1,28 @@
 import matplotlib.pyplot as plt
 import pandas as pd
-from ..backtest.metrics import equity_curve
+from ..backtest import metrics as M
+from .report import decimate_minmax
 
-def plot_equity(returns: pd.Series, title: str="Equity Curve") -> None:
-    eq = equity_curve(returns)
+def _show(series: pd.Series, title: str, ylabel: str, max_points: int|None) -> None:
     fig, ax = plt.subplots()
-    eq.plot(ax=ax)
+    decimate_minmax(series, max_points).plot(ax=ax)
     ax.set_title(title)
     ax.set_xlabel("Date")
-    ax.set_ylabel("Equity (normalized)")
+    ax.set_ylabel(ylabel)
     plt.tight_layout()
     plt.show()
 
-def plot_drawdown(returns: pd.Series, title: str="Drawdown") -> None:
-    from ..backtest.metrics import equity_curve
-    eq = equity_curve(returns)
-    peak = eq.cummax()
-    dd = (eq / peak) - 1.0
-    fig, ax = plt.subplots()
-    dd.plot(ax=ax)
-    ax.set_title(title)
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Drawdown")
-    plt.tight_layout()
-    plt.show()
+def plot_equity(returns: pd.Series, title: str="Equity Curve", derived: dict|None=None, max_points: int|None=5000) -> None:
+    eq = derived["equity"] if derived else M.equity_curve(returns)
+    _show(eq, title, "Equity (normalized)", max_points)
+
+def plot_drawdown(returns: pd.Series, title: str="Drawdown", derived: dict|None=None, max_points: int|None=5000) -> None:
+    dd = derived["drawdown"] if derived else M.drawdown(returns)
+    _show(dd, title, "Drawdown", max_points)
 
-def plot_rolling_sharpe(returns: pd.Series, window: int=126, title: str|None=None) -> None:
+def plot_rolling_sharpe(returns: pd.Series, window: int=126, title: str|None=None, derived: dict|None=None,
+                        max_points: int|None=5000) -> None:
     if title is None:
         title = f"Rolling Sharpe ({window})"
-    r = returns.fillna(0)
-    rm = r.rolling(window).mean()
-    rs = r.rolling(window).std(ddof=0).replace(0, pd.NA)
-    roll_sharpe = (rm / rs).fillna(0) * (252 ** 0.5)
-    fig, ax = plt.subplots()
-    roll_sharpe.plot(ax=ax)
-    ax.set_title(title)
-    ax.set_xlabel("Date")
-    ax.set_ylabel("Sharpe")
-    plt.tight_layout()
-    plt.show()
+    rs = derived["rolling_sharpe"] if derived else M.rolling_sharpe(returns, window)
+    _show(rs, title, "Sharpe", max_points)
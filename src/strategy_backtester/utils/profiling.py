@@ -0,0 +1,108 @@
+from __future__ import annotations
+import json, time, tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+class Profiler:
+    """Opt-in stage timer for engine runs and the CLI.
+
+    `with prof.stage("signals", rows=len(price)):` records wall time, call count, rows processed
+    and (with `memory=True`, via tracemalloc) the peak traced allocation above the stage's starting
+    point. Nested stages form ";"-joined paths, so `to_collapsed` emits flamegraph-compatible
+    folded stacks (self time in microseconds). Numbers accumulate across runs until `reset()`;
+    `capture()` collects just the stages recorded inside a block (one run's profile).
+    """
+    enabled = True
+
+    def __init__(self, memory: bool=True):
+        self.memory = memory
+        self._started = False
+        self.reset()
+
+    def reset(self):
+        self.stages: dict[str, dict] = {}
+        self.counters: dict[str, float] = {}
+        self._stack: list[list] = []  # [name, t0, mem_start, child_peak]
+        self._captures: list[dict] = []  # open capture() reports, filled alongside stages/counters
+
+    @contextmanager
+    def stage(self, name: str, rows: int|None=None):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start(); self._started = True
+        mem0 = 0
+        if self.memory:
+            mem0, peak = tracemalloc.get_traced_memory()
+            if self._stack: self._stack[-1][3] = max(self._stack[-1][3], peak)  # keep the parent's peak so far
+            tracemalloc.reset_peak()
+        path = ";".join([f[0] for f in self._stack] + [name])
+        frame = [name, time.perf_counter(), mem0, 0]
+        self._stack.append(frame)
+        try:
+            yield self
+        finally:
+            wall = time.perf_counter() - frame[1]
+            self._stack.pop()
+            peak = 0
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame[3])
+                if self._stack: self._stack[-1][3] = max(self._stack[-1][3], peak)
+            for stages in [self.stages] + [c["stages"] for c in self._captures]:
+                st = stages.setdefault(path, {"calls": 0, "wall_s": 0.0, "rows": 0, "peak_mb": 0.0})
+                st["calls"] += 1; st["wall_s"] += wall
+                if rows is not None: st["rows"] += int(rows)
+                st["peak_mb"] = max(st["peak_mb"], (peak - frame[2]) / 2**20)
+
+    @contextmanager
+    def capture(self):
+        """Yield a `report()`-shaped dict filled with only the stages and counters recorded inside
+        the block; the accumulated totals are updated as usual."""
+        rep = {"stages": {}, "counters": {}}
+        self._captures.append(rep)
+        try:
+            yield rep
+        finally:
+            self._captures.remove(rep)
+
+    def close(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started: tracemalloc.stop(); self._started = False
+
+    def count(self, name: str, n: float=1):
+        for counters in [self.counters] + [c["counters"] for c in self._captures]:
+            counters[name] = counters.get(name, 0) + n
+
+    def report(self) -> dict:
+        return {"stages": {k: dict(v) for k, v in self.stages.items()}, "counters": dict(self.counters)}
+
+    def table(self):
+        """Stages as a DataFrame sorted by path (total wall time includes nested stages)."""
+        import pandas as pd
+        df = pd.DataFrame.from_dict(self.stages, orient="index")
+        return df.rename_axis("stage").sort_index() if len(df) else df
+
+    def to_json(self, path: str|Path|None=None) -> str:
+        s = json.dumps(self.report(), indent=2)
+        if path is not None: Path(path).write_text(s)
+        return s
+
+    def to_collapsed(self, path: str|Path|None=None) -> str:
+        """Folded stacks ("a;b;c <self microseconds>") for flamegraph.pl / speedscope."""
+        lines = []
+        for p, st in self.stages.items():
+            child = sum(v["wall_s"] for q, v in self.stages.items() if q.startswith(p + ";") and q.count(";") == p.count(";") + 1)
+            lines.append(f"{p} {max(int(round((st['wall_s'] - child) * 1e6)), 0)}")
+        s = "\n".join(lines) + "\n"
+        if path is not None: Path(path).write_text(s)
+        return s
+
+class NullProfiler:
+    """Disabled profiler: `stage` returns a shared no-op context, so instrumented code pays only
+    a method call when profiling is off."""
+    enabled = False
+    _ctx = nullcontext()
+    def stage(self, name: str, rows: int|None=None): return self._ctx
+    def capture(self): return nullcontext(None)
+    def count(self, name: str, n: float=1): pass
+    def report(self) -> dict: return {"stages": {}, "counters": {}}
+
+NULL_PROFILER = NullProfiler()
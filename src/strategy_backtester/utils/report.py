@@ -1,42 +1,48 @@
 from __future__ import annotations
-import base64, io, datetime as dt
-import matplotlib.pyplot as plt
+import base64, io, os, datetime as dt
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 import pandas as pd
 from ..backtest import metrics as M
 
-def _fig_to_b64(fig):
+def decimate_minmax(s: pd.Series, max_points: int=2000) -> pd.Series:
+    """Keep the min and max of each of ~max_points/2 equal buckets (plus both endpoints), so a
+    long series plots with the same envelope (peaks, drawdown troughs) from far fewer points."""
+    n = len(s)
+    if max_points is None or n <= max_points: return s
+    b = -(-n // max(max_points // 2, 1))
+    v = np.pad(s.to_numpy(dtype=float), (0, (-n) % b), constant_values=np.nan).reshape(-1, b)
+    nan = np.isnan(v)
+    base = np.arange(len(v)) * b
+    lo = base + np.argmin(np.where(nan, np.inf, v), axis=1)
+    hi = base + np.argmax(np.where(nan, -np.inf, v), axis=1)
+    ok = ~nan.all(axis=1)  # all-NaN buckets have no extremes to keep
+    pos = np.unique(np.concatenate([lo[ok], hi[ok], [0, n - 1]]))
+    return s.iloc[pos[pos < n].astype(int)]
+
+def _render(series: pd.Series, title: str, ylabel: str, max_points: int|None=2000, dpi: int=100) -> str:
+    # Figure + Agg canvas directly: no pyplot state, no GUI backend, safe in worker processes
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    s = decimate_minmax(series, max_points)
+    fig = Figure(dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes((0.13, 0.1, 0.83, 0.82))  # fixed margins: a tight-layout pass costs a full extra draw
+    ax.plot(s.index, s.to_numpy())
+    ax.set_title(title); ax.set_xlabel("Date"); ax.set_ylabel(ylabel)
     buf = io.BytesIO()
-    fig.savefig(buf, format="png", bbox_inches="tight")
-    plt.close(fig)
+    fig.savefig(buf, format="png")
     return base64.b64encode(buf.getvalue()).decode("ascii")
 
-def write_html_report(returns: pd.Series, title: str, out_path: str, params: dict|None=None) -> str:
-    # Metrics
-    summary = {
-        "CAGR": M.annualized_return(returns),
-        "Volatility": M.annualized_vol(returns),
-        "Sharpe": M.sharpe(returns),
-        "MaxDrawdown": M.max_drawdown(returns),
-    }
-
-    # Equity
-    eq = M.equity_curve(returns)
-    fig1, ax1 = plt.subplots(); eq.plot(ax=ax1)
-    ax1.set_title("Equity Curve"); ax1.set_xlabel("Date"); ax1.set_ylabel("Equity (normalized)")
-    img1 = _fig_to_b64(fig1)
-
-    # Drawdown
-    dd = (eq / eq.cummax()) - 1.0
-    fig2, ax2 = plt.subplots(); dd.plot(ax=ax2)
-    ax2.set_title("Drawdown"); ax2.set_xlabel("Date"); ax2.set_ylabel("Drawdown")
-    img2 = _fig_to_b64(fig2)
-
-    # Rolling Sharpe (126d)
-    r = returns.fillna(0); rm = r.rolling(126).mean(); rs = r.rolling(126).std(ddof=0).replace(0, pd.NA)
-    roll_sharpe = (rm / rs).fillna(0) * (252 ** 0.5)
-    fig3, ax3 = plt.subplots(); roll_sharpe.plot(ax=ax3)
-    ax3.set_title("Rolling Sharpe (126d)"); ax3.set_xlabel("Date"); ax3.set_ylabel("Sharpe")
-    img3 = _fig_to_b64(fig3)
+def write_html_report(returns: pd.Series, title: str, out_path: str, params: dict|None=None,
+                      derived: dict|None=None, max_points: int|None=2000, dpi: int=100) -> str:
+    """Self-contained HTML report. Pass `derived` (e.g. `BacktestResult.derived()`) to reuse series
+    already computed; long series are min/max-decimated to `max_points` before plotting."""
+    d = derived or M.derived_series(returns, 126)
+    summary = d["summary"]
+    img1 = _render(d["equity"], "Equity Curve", "Equity (normalized)", max_points, dpi)
+    img2 = _render(d["drawdown"], "Drawdown", "Drawdown", max_points, dpi)
+    img3 = _render(d["rolling_sharpe"], "Rolling Sharpe (126d)", "Sharpe", max_points, dpi)
 
     ts = dt.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     params_rows = "".join(f"<tr><td>{k}</td><td>{v}</td></tr>" for k,v in (params or {}).items())
@@ -53,3 +59,16 @@ def write_html_report(returns: pd.Series, title: str, out_path: str, params: dic
     with open(out_path, "w", encoding="utf-8") as f:
         f.write(html)
     return out_path
+
+def _write_job(job: dict) -> str:
+    return write_html_report(**job)
+
+def write_html_reports(jobs: list[dict], max_workers: int|None=None, chunksize: int=4) -> list[str]:
+    """Batch reports, e.g. one per symbol/strategy of a sweep. Each job holds
+    `write_html_report` kwargs (returns, title, out_path, params, ...). Reports render in a process
+    pool, since matplotlib drawing is GIL-bound; `max_workers=1` renders in-process."""
+    jobs = list(jobs)
+    workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1: return [_write_job(j) for j in jobs]
+    with ProcessPoolExecutor(workers) as ex:
+        return list(ex.map(_write_job, jobs, chunksize=chunksize))
@@ -1,13 +1,17 @@
 from __future__ import annotations
 import numpy as np
 import pandas as pd
-
-TRADING_DAYS = 252
+from ..indicators.kernels import rolling_std
+from ..backtest.metrics import TRADING_DAYS, periods_per_year
 
 def realized_vol(returns: pd.Series, window: int=63) -> pd.Series:
-    return returns.rolling(window).std(ddof=0)
+    return pd.Series(rolling_std(returns.to_numpy(dtype=float), window, ddof=0), index=returns.index, name=returns.name)
 
-def target_vol_scale(portfolio_ret: pd.Series, target_ann_vol: float=0.10, window: int=63) -> pd.Series:
+def target_vol_scale(portfolio_ret: pd.Series, target_ann_vol: float=0.10, window: int=63,
+                     freq: str|float|None="daily") -> pd.Series:
+    """Lagged leverage that scales realized vol (over `window` bars) to `target_ann_vol`, annualized
+    at the bar frequency `freq` (see `metrics.periods_per_year`)."""
     rv = realized_vol(portfolio_ret, window)
-    scale = (target_ann_vol / (rv * np.sqrt(TRADING_DAYS))).clip(upper=10)  # cap runaway leverage
+    n = periods_per_year(freq, portfolio_ret.index if isinstance(freq, str) else None)
+    scale = (target_ann_vol / (rv * np.sqrt(n))).clip(upper=10)  # cap runaway leverage
     return scale.shift(1).fillna(1.0)  # lag to avoid look-ahead
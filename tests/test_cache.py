@@ -0,0 +1,61 @@
+import os
+import numpy as np, pandas as pd
+from strategy_backtester.backtest.engine import BacktestEngine
+from strategy_backtester.strategies import ma_crossover
+from strategy_backtester.utils import cache as C
+from strategy_backtester.utils.cache import ResultCache, make_key
+
+def _px(T=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, T))), index=pd.date_range("2020-01-01", periods=T, freq="B"))
+
+def test_hit_miss_and_param_invalidation():
+    cache, px = ResultCache(use_disk=False), _px()
+    eng = BacktestEngine(cache=cache)
+    a = eng.run_single(px, ma_crossover.signals, short=10, long=40)
+    assert (cache.hits, cache.misses) == (0, 2)  # result + signals
+    assert eng.run_single(px, ma_crossover.signals, short=10, long=40) is a and cache.hits == 1
+    b = eng.run_single(px, ma_crossover.signals, short=10, long=50)
+    assert b is not a and cache.misses == 4
+    c = BacktestEngine(cache=cache, max_leverage=0.5).run_single(px, ma_crossover.signals, short=10, long=40)
+    assert c is not a and not c.returns.equals(a.returns)
+    px2 = px.copy(); px2.iloc[-1] *= 1.01
+    assert make_key("single", px2, ma_crossover.signals, {"short": 10}) != make_key("single", px, ma_crossover.signals, {"short": 10})
+
+def test_keys_are_salted_with_library_source(monkeypatch):
+    key = make_key("x", 1)
+    assert make_key("x", 1) == key
+    monkeypatch.setattr(C, "CACHE_FORMAT", C.CACHE_FORMAT + 1)
+    assert make_key("x", 1) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(C, "_source_digest", lambda path: b"edited")
+    assert make_key("x", 1) != key
+
+def test_memory_lru_eviction_under_byte_budget():
+    arrs = [np.full(1000, i, dtype=float) for i in range(4)]  # 8000 bytes each
+    cache = ResultCache(max_bytes=20_000, use_disk=False)
+    for i in range(2): cache.put(f"k{i}", arrs[i])
+    cache.get("k0")  # k0 becomes most recent
+    cache.put("k2", arrs[2])
+    assert cache.get("k1") is None and cache.get("k0") is arrs[0] and cache.get("k2") is arrs[2]
+    assert cache._mem_bytes == 16_000
+    cache.put("big", np.zeros(5000))  # larger than the budget: not kept
+    assert cache.get("big") is None and cache._mem_bytes == 16_000
+
+def test_disk_round_trip_overwrite_and_eviction(tmp_path):
+    a = np.arange(1000.0)
+    cache = ResultCache(max_bytes=1, disk_dir=tmp_path)  # memory tier keeps nothing
+    cache.put("k", a)
+    size = (tmp_path / "k.pkl").stat().st_size
+    for _ in range(3): cache.put("k", a)  # overwrites do not count twice
+    assert cache._disk_bytes == size
+    fresh = ResultCache(disk_dir=tmp_path)
+    np.testing.assert_array_equal(fresh.get("k"), a)
+    assert fresh.hits == 1 and fresh.get("nope") is None and fresh.misses == 1
+    cache = ResultCache(max_bytes=1, disk_dir=tmp_path, max_disk_bytes=int(2.5 * size))
+    for i, k in enumerate(["a", "b"]):
+        cache.put(k, a + i); os.utime(tmp_path / f"{k}.pkl", (i, i))
+    os.utime(tmp_path / "k.pkl", (10, 10))  # k is the most recently used
+    cache.put("c", a + 2)
+    assert sorted(p.stem for p in tmp_path.glob("*.pkl")) == ["c", "k"]
+    assert cache._disk_bytes == 2 * size
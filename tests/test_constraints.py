@@ -0,0 +1,79 @@
+import warnings
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.portfolio.constraints import ConstraintPipeline, cap_sector, cap_sector_panel
+
+def _panel(T=300, N=40, seed=0):
+    rng = np.random.default_rng(seed)
+    W = rng.normal(0, 0.05, (T, N)) + rng.normal(0, 0.02, (T, 1))
+    W[rng.random((T, N)) < 0.2] = 0
+    cols = [f"S{i}" for i in range(N)]
+    sectors = pd.Series([f"sec{i % 5}" for i in range(N)], index=cols)
+    betas = pd.Series(rng.uniform(0.5, 1.5, N), index=cols)
+    return pd.DataFrame(W, index=pd.date_range("2020-01-01", periods=T, freq="B"), columns=cols), sectors, betas
+
+def _cap_sector_loop(weights, sector_map, max_per_sector):
+    # the baseline per-sector loop: only net-long sectors above the cap are scaled
+    w, by = weights.copy(), {}
+    for sym, sec in sector_map.items(): by.setdefault(sec, []).append(sym)
+    for names in by.values():
+        s = w[names].sum()
+        if s > max_per_sector and s > 0: w[names] *= max_per_sector / s
+    return w
+
+@pytest.mark.parametrize("two_sided", [False, True])
+def test_cap_sector_panel_matches_series_rule(two_sided):
+    w, sectors, _ = _panel()
+    w.iloc[:, :8] = -np.abs(w.iloc[:, :8]) * 4  # net-short sectors
+    codes = pd.factorize(sectors)[0]
+    P = cap_sector_panel(w.to_numpy(copy=True), codes, 0.1, two_sided)
+    ref = np.vstack([cap_sector(w.iloc[t], sectors.to_dict(), 0.1, two_sided).to_numpy() for t in range(len(w))])
+    np.testing.assert_allclose(P, ref, atol=1e-15)
+    net = pd.DataFrame(P, columns=w.columns).T.groupby(sectors).sum()
+    assert (net <= 0.1 + 1e-12).all().all()
+    assert (net >= -0.1 - 1e-12).all().all() == two_sided
+
+def test_cap_sector_keeps_baseline_one_sided_rule():
+    w, sectors, _ = _panel(T=50)
+    w.iloc[:, :8] *= -4
+    for t in range(len(w)):
+        pd.testing.assert_series_equal(cap_sector(w.iloc[t], sectors.to_dict(), 0.1),
+                                       _cap_sector_loop(w.iloc[t], sectors.to_dict(), 0.1), atol=1e-15)
+
+def test_pipeline_meets_every_limit():
+    w, sectors, betas = _panel()
+    cp = ConstraintPipeline(max_weight=0.06, sectors=sectors, max_sector=0.1, max_net=0.05, betas=betas,
+                            max_beta=0.03, max_gross=0.9, max_turnover=0.5)
+    W = cp.apply(w).to_numpy()
+    tol = 1e-8
+    assert np.abs(W).max() <= 0.06 + tol
+    assert (np.abs(pd.DataFrame(W, columns=w.columns).T.groupby(sectors).sum()) <= 0.1 + tol).all().all()
+    assert np.abs(W.sum(axis=1)).max() <= 0.05 + tol
+    assert np.abs(W @ betas.to_numpy()).max() <= 0.03 + tol
+    assert np.abs(W).sum(axis=1).max() <= 0.9 + tol
+    assert np.abs(np.diff(W, axis=0, prepend=0)).sum(axis=1).max() <= 0.5 + tol
+    assert cp.iterations < cp.max_iter
+
+def _assert_limits(W, cp, sectors=None, betas=None, tol=1e-8):
+    assert np.abs(W).max() <= cp.max_weight + tol
+    assert np.abs(W.sum(axis=1)).max() <= cp.max_net + tol
+    if sectors is not None:
+        assert (np.abs(pd.DataFrame(W, columns=sectors.index).T.groupby(sectors).sum()) <= cp.max_sector + tol).all().all()
+    if betas is not None: assert np.abs(W @ betas.to_numpy()).max() <= cp.max_beta + tol
+
+def test_capped_names_move_inward_to_meet_the_net_band():
+    cp = ConstraintPipeline(max_weight=0.05, max_net=0.0)
+    W = cp.apply(pd.DataFrame([[1, 1, 0], [0.3, -0.1, 0.2]], dtype=float)).to_numpy()
+    _assert_limits(W, cp)
+    assert cp.iterations < cp.max_iter and W[1, 1] == -0.05
+
+@pytest.mark.parametrize("max_iter", [100, 2])
+def test_pipeline_scales_down_dates_that_do_not_converge(max_iter):
+    w, sectors, betas = _panel(N=20)
+    w = w * 3  # far outside every limit
+    cp = ConstraintPipeline(max_weight=0.05, sectors=sectors, max_sector=0.1, max_net=0.0, betas=betas,
+                            max_beta=0.01, max_iter=max_iter)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        W = cp.apply(w).to_numpy()
+    _assert_limits(W, cp, sectors, betas)
+    assert bool(caught) == (max_iter == 2) and all("did not converge" in str(c.message) for c in caught)
@@ -0,0 +1,159 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.backtest.engine import BacktestEngine
+from strategy_backtester.backtest.costs import SimpleCostModel
+from strategy_backtester.portfolio.constraints import ConstraintPipeline
+from strategy_backtester.strategies import ma_crossover, momentum, mean_reversion
+from strategy_backtester.utils.cache import ResultCache
+
+def _prices(T=600, N=4, seed=0, freq="B"):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2020-01-01", periods=T, freq=freq)
+    return pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (T, N)), axis=0)), index=idx,
+                        columns=[f"S{i}" for i in range(N)])
+
+def test_constrained_run_hits_result_cache():
+    cache = ResultCache(use_disk=False)
+    eng = BacktestEngine(cache=cache, constraints=ConstraintPipeline(max_weight=0.5))
+    px = _prices().iloc[:, 0]
+    first = eng.run_single(px, ma_crossover.signals, short=10, long=40)
+    for _ in range(2): again = eng.run_single(px, ma_crossover.signals, short=10, long=40)
+    assert again is first and cache.misses == 2 and cache.hits == 2  # result + signals miss once
+
+def test_profile_is_not_written_into_cached_results():
+    from strategy_backtester.utils.profiling import Profiler
+    cache, px = ResultCache(use_disk=False), _prices()
+    fns = {c: ma_crossover.signals for c in px.columns}
+    plain = BacktestEngine(cache=cache).run_multi_equal_weight(px, fns, short=10, long=40)
+    profiled = BacktestEngine(cache=cache, profiler=Profiler()).run_multi_equal_weight(px, fns, short=10, long=40)
+    again = BacktestEngine(cache=cache).run_multi_equal_weight(px, fns, short=10, long=40)
+    assert profiled.profile is not None and plain.profile is None and again.profile is None
+    assert profiled.returns is plain.returns and again.returns is plain.returns
+    cache = ResultCache(use_disk=False)  # profiled run first: later plain hits still carry no profile
+    BacktestEngine(cache=cache, profiler=Profiler()).run_multi_equal_weight(px, fns, short=10, long=40)
+    assert BacktestEngine(cache=cache).run_multi_equal_weight(px, fns, short=10, long=40).profile is None
+
+def test_each_result_carries_only_its_own_run_profile():
+    from strategy_backtester.utils.profiling import Profiler
+    px, prof = _prices(), Profiler(memory=False)
+    eng = BacktestEngine(profiler=prof, target_ann_vol=0.1, vol_window=20)
+    fns = {c: ma_crossover.signals for c in px.columns}
+    first = eng.run_multi_equal_weight(px, fns, short=10, long=40)
+    second = eng.run_multi_equal_weight(px, fns, short=10, long=40)
+    for res in (first, second):
+        st = res.profile["stages"]
+        assert st["run_multi"]["calls"] == 1 and st["run_multi;run_weights"]["calls"] == 1
+        assert st["run_multi;signals"]["calls"] == px.shape[1] and "run_weights" not in st
+    assert prof.stages["run_multi"]["calls"] == 2  # the profiler itself still accumulates
+    weights = eng.run_weights(px, pd.DataFrame(0.25, index=px.index, columns=px.columns))
+    assert set(weights.profile["stages"]) == {"run_weights", "run_weights;constraints", "run_weights;vol_target",
+                                              "run_weights;costs"}
+    chunked = eng.run_chunked(px, ma_crossover.signals, chunk_rows=100, short=10, long=40)
+    assert chunked.profile["stages"]["run_chunked"]["calls"] == 1 and eng._depth == 0
+
+STRATEGIES = [(ma_crossover.signals, {"short": [5, 20], "long": [40, 90]}),
+              (momentum.signals, {"lookback": [10, 60]}),
+              (mean_reversion.signals, {"z_window": [10, 30], "z_entry": [0.5, 1.5]})]
+
+@pytest.mark.parametrize("fn,grid", STRATEGIES)
+@pytest.mark.parametrize("target_ann_vol,allow_short", [(None, True), (0.1, True), (0.1, False)])
+def test_sweep_matches_run_single(fn, grid, target_ann_vol, allow_short):
+    px = _prices(T=400).iloc[:, 0]
+    eng = BacktestEngine(target_ann_vol=target_ann_vol, vol_window=20, allow_short=allow_short)
+    table = eng.sweep(px, fn, grid)
+    for row in table.to_dict("records"):
+        params = {k: row[k] for k in grid}
+        ref = eng.run_single(px, fn, **params).summary()
+        for k in ("CAGR", "Volatility", "Sharpe", "MaxDrawdown"):
+            assert row[k] == pytest.approx(ref[k], rel=1e-9, abs=1e-12), (params, k)
+
+@pytest.mark.parametrize("fn,grid", STRATEGIES)
+def test_sweep_signals_follow_the_kernel_nan_policy(fn, grid):
+    from strategy_backtester.backtest.sweep import _resolve, expand_grid
+    px = _prices(T=300).iloc[:, 0]
+    px.iloc[100:104] = np.nan
+    combos = expand_grid(grid)
+    kernel, args = _resolve(fn, combos)
+    got = kernel(px.to_numpy(), *args)
+    for i, params in enumerate(combos.to_dict("records")):
+        np.testing.assert_array_equal(got[:, i], fn(px, **params).to_numpy(dtype=float), err_msg=str(params))
+
+@pytest.mark.parametrize("fn,kw", [(ma_crossover.signals, {"short": 10, "long": 40}), (momentum.signals, {"lookback": 30}),
+                                   (mean_reversion.signals, {"z_window": 20, "z_entry": 1.0})])
+@pytest.mark.parametrize("target_ann_vol", [None, 0.1])
+def test_streaming_matches_run_single(fn, kw, target_ann_vol):
+    from strategy_backtester.backtest.streaming import StreamingEngine
+    px = _prices(T=300, N=3)
+    eng = BacktestEngine(target_ann_vol=target_ann_vol, vol_window=20)
+    se = StreamingEngine.from_engine(eng, list(px.columns), fn, **kw)
+    pnl = se.update_many(px)
+    for c in px.columns:
+        ref = eng.run_single(px[c], fn, **kw)
+        np.testing.assert_allclose(pnl[c], ref.returns, atol=1e-14)
+        assert se.summary().loc[c, "Sharpe"] == pytest.approx(ref.summary()["Sharpe"], rel=1e-9)
+
+@pytest.mark.parametrize("fn,kw", [(momentum.signals, {"lookback": 30}), (mean_reversion.signals, {"z_window": 20, "z_entry": 1.0})])
+@pytest.mark.parametrize("target_ann_vol,allow_short,max_leverage", [(None, True, 1.0), (0.1, True, 1.0), (0.1, False, 0.5)])
+def test_portfolio_streaming_matches_run_multi_equal_weight(fn, kw, target_ann_vol, allow_short, max_leverage):
+    from strategy_backtester.backtest.streaming import PortfolioStreamingEngine
+    px = _prices(T=300, N=4)
+    px.iloc[100:110, 1] = np.nan
+    eng = BacktestEngine(target_ann_vol=target_ann_vol, vol_window=20, allow_short=allow_short,
+                         max_leverage=max_leverage, cost_model=SimpleCostModel(fee_bps=2, impact_k=0.01, borrow_bps=50))
+    se = PortfolioStreamingEngine.from_engine(eng, list(px.columns), fn, **kw)
+    pnl = se.update_many(px.iloc[:150])
+    pnl = pd.concat([pnl, se.update_many(px.iloc[150:])])
+    ref = eng.run_multi_equal_weight(px, {c: fn for c in px.columns}, **kw)
+    np.testing.assert_allclose(pnl["portfolio"], ref.returns, atol=1e-13)
+    assert se.summary().loc["portfolio", "Sharpe"] == pytest.approx(ref.summary()["Sharpe"], rel=1e-9)
+
+def test_rolling_window_nan_policy_matches_kernels():
+    from strategy_backtester.backtest.streaming import RollingWindow
+    from strategy_backtester.indicators.kernels import rolling_mean, rolling_std
+    x = np.random.default_rng(3).normal(size=(120, 3))
+    x[10, 0] = x[40:43, 1] = x[95, 2] = np.nan
+    rw = RollingWindow(7, 3)
+    means, stds = [], []
+    for row in x:
+        rw.push(row); means.append(rw.mean()); stds.append(rw.std(ddof=1))
+    np.testing.assert_allclose(np.array(means), rolling_mean(x, 7), atol=1e-12)
+    np.testing.assert_allclose(np.array(stds), rolling_std(x, 7), atol=1e-12)
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 100, 10_000])
+def test_run_chunked_matches_in_memory(tmp_path, chunk_rows):
+    from strategy_backtester.data.store import PriceStore
+    from strategy_backtester.research.factor_graph import FactorGraph, field
+    px = _prices(T=600, N=6, freq="min")
+    px.iloc[50:80, 2] = np.nan
+    store = PriceStore(tmp_path)
+    store.write({"adj_close": px})
+    eng = BacktestEngine(target_ann_vol=0.1, vol_window=30, freq="minute",
+                         constraints=ConstraintPipeline(max_weight=0.3, max_turnover=0.4))
+    ref = eng.run_multi_equal_weight(px, {c: momentum.signals for c in px.columns}, lookback=40)
+    got = eng.run_chunked(store, momentum.signals, chunk_rows=chunk_rows, lookback=40, ffill=False)
+    np.testing.assert_allclose(got.returns, ref.returns, atol=1e-13)
+    assert got.returns.index.equals(ref.returns.index) and got.freq == "minute"
+
+    expr = field().pct_change(20).xs_zscore() * 0.1  # target weights from a factor expression
+    ref = eng.run_weights(px, FactorGraph(px).evaluate(expr).fillna(0))
+    got = eng.run_chunked(store, expr, chunk_rows=chunk_rows, weighter=None, ffill=False)
+    np.testing.assert_allclose(got.returns, ref.returns, atol=1e-13)
+
+@pytest.mark.parametrize("chunk_rows", [1, 7, 100, 10_000])
+def test_run_chunked_ffills_gaps_like_the_cli_load(tmp_path, chunk_rows):
+    from strategy_backtester.data.store import PriceStore
+    px = _prices(T=600, N=5, freq="min")
+    px.iloc[:30, 1] = np.nan      # late listing: earlier bars are dropped
+    px.iloc[20:31, 3] = np.nan    # gap open when the last symbol lists: filled from before
+    px.iloc[31:, 3] *= 1.2        # ... and the fill decides the first signal after it
+    px.iloc[95:140, 2] = np.nan   # gap across several blocks
+    px.iloc[200:203] = np.nan     # bars where nothing trades
+    px.iloc[400::9, 4] = np.nan   # scattered missing prints
+    store = PriceStore(tmp_path)
+    store.write({"adj_close": px})
+    eng = BacktestEngine(target_ann_vol=0.1, vol_window=30, freq="minute")
+    start = px.index[3]
+    clean = px.loc[start:].dropna(how="all").ffill().dropna()  # cli.py's --store load
+    ref = eng.run_multi_equal_weight(clean, {c: momentum.signals for c in px.columns}, lookback=1)
+    got = eng.run_chunked(store, momentum.signals, chunk_rows=chunk_rows, start=start, lookback=1)
+    assert got.returns.index.equals(ref.returns.index)
+    np.testing.assert_allclose(got.returns, ref.returns, atol=1e-13)
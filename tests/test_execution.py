@@ -0,0 +1,59 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.backtest.execution import (ExecutionModel, almgren_chriss_impact, intraday_profile, schedule_pov,
+                                                     schedule_twap, schedule_vwap, slice_fractions)
+
+def test_schedules_vectorize_the_per_order_formulas():
+    rng = np.random.default_rng(0)
+    qty, vols = rng.uniform(100, 1e4, 7), rng.uniform(1, 5, (7, 13))
+    np.testing.assert_allclose(schedule_twap(250.0, 5), np.full(5, 50.0))
+    for i in range(7):
+        np.testing.assert_allclose(schedule_twap(qty, 13)[i], np.full(13, qty[i] / 13))
+        np.testing.assert_allclose(schedule_vwap(qty, vols)[i], qty[i] * vols[i] / vols[i].sum())
+        w = vols[i] / vols[i].sum()
+        np.testing.assert_allclose(schedule_pov(qty, vols, 0.2)[i], qty[i] * w * 0.2 / w.mean())
+
+def _pov_loop(q, adv, profile, participation):
+    # one order at a time: fill participation * expected bucket volume, the rest in the last bucket
+    left, out = q, []
+    for p in profile[:-1] / profile.sum():
+        x = min(participation * adv * p, left)
+        out.append(x); left -= x
+    return np.array(out + [left]) / q
+
+@pytest.mark.parametrize("schedule", ["twap", "vwap", "pov"])
+def test_slice_fractions_match_per_order_schedules(schedule):
+    rng = np.random.default_rng(1)
+    profile = intraday_profile(13)
+    qty, adv = rng.uniform(1e3, 5e5, (4, 6)), np.full((4, 6), 1e6)
+    f = slice_fractions(qty, profile, schedule, adv, 0.1)
+    for q, a, row in zip(qty.ravel(), adv.ravel(), f.reshape(-1, 13)):
+        ref = {"twap": lambda: schedule_twap(q, 13), "vwap": lambda: schedule_vwap(q, profile),
+               "pov": lambda: q * _pov_loop(q, a, profile, 0.1)}[schedule]()
+        np.testing.assert_allclose(q * row, ref, rtol=1e-12)
+
+def test_almgren_chriss_impact_keeps_the_scalar_formula():
+    v = np.array([100.0, -50.0, 25.0])
+    np.testing.assert_allclose(almgren_chriss_impact(v, 0.02, 1e4, 1e-3, 2e-3),
+                               2e-3 * np.abs(v) / 1e4 + 1e-3 * np.cumsum(np.abs(v)) / 1e4)
+
+@pytest.mark.parametrize("schedule", ["twap", "vwap", "pov"])
+def test_impact_array_matches_per_order_loop(schedule):
+    rng = np.random.default_rng(2)
+    T, N = 60, 3
+    idx = pd.date_range("2021-01-01", periods=T, freq="B")
+    px = pd.DataFrame(50 * np.exp(np.cumsum(rng.normal(0, 0.02, (T, N)), axis=0)), index=idx, columns=list("abc"))
+    vol = pd.DataFrame(rng.uniform(2e5, 1e6, (T, N)), index=idx, columns=px.columns)
+    ex = ExecutionModel(vol, capital=5e7, schedule=schedule, chunk_rows=7)
+    P, adv, sigma = ex._inputs(px)
+    dw = rng.normal(0, 0.05, (T, N))
+    got = ex.impact_array(dw, P, adv, sigma)
+    ref = np.zeros((T, N))
+    for t in range(T):
+        for n in range(N):
+            if not (np.isfinite(adv[t, n]) and np.isfinite(sigma[t, n])): continue
+            q = 5e7 * abs(dw[t, n]) / P[t, n]
+            f = slice_fractions(q, ex.profile, schedule, np.float64(adv[t, n]), ex.participation)
+            s = sigma[t, n]
+            ref[t, n] = abs(dw[t, n]) * (f * almgren_chriss_impact(q * f, s, adv[t, n], ex.gamma * s, ex.eta * s)).sum()
+    assert (got[:21] == 0).all() and (got[21:] > 0).all()
+    np.testing.assert_allclose(got, ref, rtol=1e-12, atol=0)
@@ -0,0 +1,61 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.research import factors as F
+from strategy_backtester.research.factor_graph import FactorGraph, field, reach
+
+def _prices(T=300, N=5, seed=0):
+    rng = np.random.default_rng(seed)
+    px = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (T, N)), axis=0)),
+                      index=pd.date_range("2020-01-01", periods=T, freq="B"), columns=[f"S{i}" for i in range(N)])
+    px.iloc[60:64, 2] = np.nan
+    return px
+
+def _xs_zscore(df):
+    return df.sub(df.mean(axis=1), axis=0).div(df.std(axis=1), axis=0)
+
+EAGER = {"mom": (F.momentum_expr(40), lambda px: F.xsec_momentum(px, 40)),
+         "lowvol": (F.lowvol_expr(20), lambda px: F.xsec_lowvol(px, 20)),
+         "rev": (F.reversal_expr(5), lambda px: F.xsec_reversal(px, 5)),
+         "fwd": (field().pct_change().shift(-5), lambda px: px.pct_change().shift(-5)),
+         "z": (field().pct_change(10).xs_zscore(), lambda px: _xs_zscore(px.pct_change(10))),
+         "rank": (field().pct_change(10).rank(pct=True), lambda px: px.pct_change(10).rank(axis=1, pct=True))}
+
+@pytest.mark.parametrize("chunk_rows", [None, 1, 7, 64])
+def test_chunked_matches_eager_factors(chunk_rows):
+    px = _prices()
+    got = FactorGraph(px, chunk_rows=chunk_rows).evaluate({k: e for k, (e, _) in EAGER.items()})
+    for k, (_, fn) in EAGER.items():
+        pd.testing.assert_frame_equal(got[k], fn(px), check_freq=False, atol=1e-12, obj=k)
+    assert reach(EAGER["fwd"][0], EAGER["mom"][0]) == (40, 5)
+
+def test_shared_subexpressions_are_computed_once():
+    g = FactorGraph(_prices(), cache_bytes=0)
+    r = field().pct_change()
+    exprs = [-r.rolling_std(20, ddof=0).zero_to_nan(), -r.rolling_std(20, ddof=0).zero_to_nan(), r.rolling_mean(20) / r.rolling_std(20)]
+    a, b, c = g.evaluate(exprs)
+    # pct_change, rolling_std(ddof=0), zero_to_nan, neg, rolling_mean, rolling_std(ddof=1), div
+    assert g.stats["computed"] == 7 and a.equals(b)
+    pd.testing.assert_frame_equal(c, FactorGraph(_prices()).evaluate(r.rolling_mean(20) / r.rolling_std(20)))
+
+def test_cache_hits_skip_subtrees_and_match_fresh_values():
+    px = _prices()
+    r = field().pct_change()
+    g = FactorGraph(px, chunk_rows=50).materialize(r)
+    assert g.stats["computed"] == 6  # one node x six chunks
+    got = g.evaluate(F.lowvol_expr(20))
+    assert g.stats["cache_hits"] > 0 and g.stats["computed"] == 6 + 3 * 6  # r is sliced from the cache
+    pd.testing.assert_frame_equal(got, FactorGraph(px, cache_bytes=0).evaluate(F.lowvol_expr(20)))
+    pd.testing.assert_frame_equal(got, F.xsec_lowvol(px, 20), check_freq=False, atol=1e-12)
+    out = g.evaluate(F.lowvol_expr(20))
+    out.iloc[0, 0] = 1.0  # cached arrays are frozen and handed out as copies
+    pd.testing.assert_frame_equal(g.evaluate(F.lowvol_expr(20)), got)
+
+def test_cache_is_byte_bounded_lru():
+    px = _prices()
+    one = px.size * 8
+    g = FactorGraph(px, cache_bytes=2 * one)
+    e1, e2, e3 = field().pct_change(), field().pct_change(2), field().pct_change(3)
+    g.evaluate(e1); g.evaluate(e2); g.evaluate(e1); g.evaluate(e3)
+    assert set(g._cache) == {e1.key, e3.key}
+    assert sum(v.nbytes for v in g._cache.values()) <= g.cache_bytes
+    g.clear_cache()
+    assert not g._cache
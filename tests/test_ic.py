@@ -0,0 +1,78 @@
+import warnings
+import numpy as np, pandas as pd
+from scipy.stats import spearmanr
+from strategy_backtester.research.ic import forward_returns, ic_panel, neutralize, neutralize_panel, rank_ic
+
+def _rank_ic_loop(factor, fwd):
+    # the per-date scipy loop rank_ic replaced
+    ics = []
+    for dt in factor.index.intersection(fwd.index):
+        x, y = factor.loc[dt], fwd.loc[dt]
+        mask = x.notna() & y.notna()
+        if mask.sum() < 3: ics.append(np.nan); continue
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # constant rows: scipy warns and returns NaN
+            ics.append(spearmanr(x[mask], y[mask])[0])
+    return pd.Series(ics, index=factor.index)
+
+def _ic_inputs(T=80, N=25, seed=0):
+    rng = np.random.default_rng(seed)
+    idx, cols = pd.date_range("2021-01-01", periods=T, freq="B"), [f"S{i}" for i in range(N)]
+    f = pd.DataFrame(rng.integers(0, 5, (T, N)) + rng.normal(0, 1, (T, N)).round(), index=idx, columns=cols)  # heavy ties
+    px = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (T, N)), axis=0)), index=idx, columns=cols)
+    f = f.mask(rng.random((T, N)) < 0.15)  # scattered NaN names
+    px = px.mask(rng.random((T, N)) < 0.05)
+    f.iloc[3] = np.nan            # empty row
+    f.iloc[4, 2:] = np.nan        # 2 names: below min_obs
+    f.iloc[5, 3:] = np.nan; f.iloc[5, :3] = [1.0, 2.0, 3.0]  # exactly 3 names
+    f.iloc[6] = 1.0               # constant factor
+    return f, px
+
+def _neutralize_inputs(T=60, N=30, seed=0):
+    rng = np.random.default_rng(seed)
+    idx, cols = pd.date_range("2021-01-01", periods=T, freq="B"), [f"S{i}" for i in range(N)]
+    f = pd.DataFrame(rng.normal(size=(T, N)), index=idx, columns=cols)
+    beta = pd.DataFrame(rng.normal(1, 0.3, (T, N)), index=idx, columns=cols)
+    beta.iloc[20:40] = beta.iloc[20].to_numpy()  # a run of identical exposure rows (shared factorization)
+    size = pd.Series(rng.normal(size=N), index=cols)
+    sectors = pd.Series([f"s{i % 4}" for i in range(N)], index=cols)
+    f.iloc[5, 3] = np.nan       # NaN factor
+    beta.iloc[7, 4] = np.nan    # NaN exposure masks the name
+    f.iloc[10, 2:] = np.nan     # too few names: returned unchanged
+    return f, beta, size, sectors
+
+def test_neutralize_panel_matches_per_date_dummies():
+    f, beta, size, sectors = _neutralize_inputs()
+    got = neutralize_panel(f, {"beta": beta, "size": size}, sectors)
+    dummies = pd.get_dummies(sectors, dtype=float)
+    for t in f.index:
+        X = pd.concat([beta.loc[t].rename("beta"), size.rename("size"), dummies], axis=1)
+        ref = neutralize(f.loc[t], X)
+        np.testing.assert_allclose(got.loc[t], ref, atol=1e-12, err_msg=str(t))
+    assert np.isnan(got.iloc[5, 3]) and np.isnan(got.iloc[7, 4])
+    pd.testing.assert_series_equal(got.iloc[10], f.iloc[10])
+
+def test_neutralize_panel_ridge():
+    f, beta, size, sectors = _neutralize_inputs(seed=1)
+    ridge = 3.0
+    got = neutralize_panel(f, {"beta": beta, "size": size}, sectors, ridge=ridge)
+    D = pd.get_dummies(sectors, dtype=float).to_numpy()
+    for t in range(len(f)):
+        y, E = f.iloc[t].to_numpy(), np.column_stack([beta.iloc[t], size])
+        m = ~np.isnan(y) & ~np.isnan(E).any(axis=1)
+        if m.sum() < D[m].any(axis=0).sum() + 3: continue
+        # penalized least squares on the exposures only, via an augmented system
+        X = np.vstack([np.hstack([D[m], E[m]]), np.hstack([np.zeros((2, D.shape[1])), np.sqrt(ridge) * np.eye(2)])])
+        coef, *_ = np.linalg.lstsq(X, np.concatenate([y[m], np.zeros(2)]), rcond=None)
+        np.testing.assert_allclose(got.iloc[t].to_numpy()[m], y[m] - np.hstack([D[m], E[m]]) @ coef, atol=1e-12)
+
+def test_rank_ic_matches_scipy_loop():
+    f, px = _ic_inputs()
+    fwd = forward_returns(px, 5)
+    got, ref = rank_ic(f, fwd), _rank_ic_loop(f, fwd)
+    assert got.isna().tolist() == ref.isna().tolist()
+    assert np.isnan(got.iloc[[3, 4, 6]]).all() and np.isfinite(got.iloc[5])
+    np.testing.assert_allclose(got.dropna(), ref.dropna(), rtol=0, atol=1e-12)
+    panel = ic_panel(f, px, horizons=(1, 5, 21))
+    for h in (1, 5, 21):
+        np.testing.assert_allclose(panel[h], _rank_ic_loop(f, forward_returns(px, h)), rtol=0, atol=1e-12)
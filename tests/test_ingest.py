@@ -0,0 +1,74 @@
+import json, threading, time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from strategy_backtester.data.alpha_vantage import fetch_daily_adjusted, raw_path
+from strategy_backtester.data.ingest import Ingestor, TokenBucket, ingest
+from strategy_backtester.data.store import PriceStore
+
+def _payload(sym):
+    bar = {"1. open": "1", "2. high": "2", "3. low": "0.5", "4. close": "1.5", "5. adjusted close": "1.4", "6. volume": "100"}
+    return {"Meta Data": {"2. Symbol": sym}, "Time Series (Daily)": {"2024-01-03": bar, "2024-01-02": bar}}
+
+class _Stub(BaseHTTPRequestHandler):
+    """Alpha Vantage lookalike: FLAKY answers 503 once, THROTTLED sends a rate-limit note once, BAD is an unknown symbol."""
+    hits = Counter()
+
+    def do_GET(self):
+        sym = parse_qs(urlparse(self.path).query)["symbol"][0]
+        _Stub.hits[sym] += 1
+        n = _Stub.hits[sym]
+        if sym == "FLAKY" and n == 1: return self._send(503, {})
+        if sym == "THROTTLED" and n == 1: return self._send(200, {"Note": "Thank you for using Alpha Vantage! ..."})
+        if sym == "BAD": return self._send(200, {"Error Message": "Invalid API call."})
+        self._send(200, _payload(sym))
+
+    def _send(self, code, obj):
+        body = json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json"); self.send_header("Content-Length", str(len(body)))
+        self.end_headers(); self.wfile.write(body)
+
+    def log_message(self, *a): pass
+
+@pytest.fixture
+def server():
+    _Stub.hits.clear()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_port}/query"
+    srv.shutdown(); srv.server_close()
+
+def test_ingest_retries_caches_and_skips_fresh(server, tmp_path):
+    kw = dict(raw_dir=tmp_path, api_key="demo", base_url=server, rate=1000, burst=10, backoff=0.01)
+    rep = ingest(["AAA", "FLAKY", "THROTTLED", "BAD", "aaa"], **kw)
+    assert rep["status"].to_dict() == {"AAA": "updated", "FLAKY": "updated", "THROTTLED": "updated", "BAD": "failed"}
+    assert rep.loc["FLAKY", "attempts"] == 2 and rep.loc["THROTTLED", "attempts"] == 2 and rep.loc["BAD", "attempts"] == 1
+    assert rep.loc["AAA", "last_date"] == "2024-01-03"
+    assert not raw_path("BAD", tmp_path).exists() and not list(tmp_path.glob("*.tmp"))
+
+    hits = sum(_Stub.hits.values())
+    rep = ingest(["AAA", "FLAKY"], **kw)
+    assert (rep["status"] == "fresh").all() and sum(_Stub.hits.values()) == hits
+
+    mtime = raw_path("AAA", tmp_path).stat().st_mtime_ns
+    assert ingest(["AAA"], force=True, **kw).loc["AAA", "status"] == "unchanged"
+    assert raw_path("AAA", tmp_path).stat().st_mtime_ns == mtime
+
+    df = fetch_daily_adjusted("AAA", raw_dir=tmp_path, api_key="demo", base_url=server)
+    assert list(df.index.strftime("%Y-%m-%d")) == ["2024-01-02", "2024-01-03"] and (df["adj_close"] == 1.4).all()
+    assert PriceStore(tmp_path / "store").ingest_raw(tmp_path) == 2  # sidecars are ignored by the offline loader
+
+def test_rate_limit(server, tmp_path):
+    t0 = time.perf_counter()
+    rep = ingest([f"S{i}" for i in range(6)], raw_dir=tmp_path, api_key="demo", base_url=server, rate=20, burst=1)
+    assert (rep["status"] == "updated").all()
+    assert time.perf_counter() - t0 >= 5 / 20 * 0.9
+
+def test_token_bucket_reserves_in_order():
+    now = [0.0]
+    b = TokenBucket(rate=2, capacity=2, clock=lambda: now[0])
+    assert [b.reserve() for _ in range(4)] == [0.0, 0.0, 0.5, 1.0]
+    now[0] = 10.0
+    assert b.reserve() == 0.0
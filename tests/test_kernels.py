@@ -0,0 +1,42 @@
+import numpy as np, pandas as pd
+import pytest
+from strategy_backtester.indicators import kernels as K
+
+W = 20
+
+@pytest.fixture(params=[True, False], ids=["numba", "numpy"])
+def panel(request, monkeypatch):
+    if request.param and not K.USE_NUMBA: pytest.skip("numba not installed")
+    monkeypatch.setattr(K, "USE_NUMBA", request.param)
+    rng = np.random.default_rng(0)
+    X = np.cumsum(rng.normal(0, 1, (400, 4)), axis=0) + 50
+    X[30:33, 0] = np.nan   # short gap
+    X[100:130, 1] = np.nan  # gap longer than the window
+    X[200:210, 2] = 5.0     # flat stretch
+    return X
+
+def _check(got, ref):
+    ref = ref.to_numpy()
+    assert (np.isnan(got) == np.isnan(ref)).all()
+    np.testing.assert_allclose(got[~np.isnan(got)], ref[~np.isnan(ref)], rtol=1e-10, atol=1e-10)
+
+def test_kernels_match_pandas(panel):
+    df = pd.DataFrame(panel)
+    r = df.rolling(W)
+    _check(K.rolling_mean(panel, W), r.mean())
+    _check(K.rolling_std(panel, W, ddof=0), r.std(ddof=0))
+    _check(K.rolling_std(panel, W), r.std())
+    _check(K.rolling_zscore(panel, W), (df - r.mean()) / r.std())
+    _check(K.ema(panel, 10), df.ewm(span=10, adjust=False).mean())
+    _check(K.lookback_returns(panel, 5), df / df.shift(5) - 1)
+    _check(K.rolling_mean(panel[:, 0], W), r.mean()[0])  # 1-D input
+    cols = [0, 2, 3]
+    _check(K.rolling_skew(panel, W)[:, cols], r.skew()[cols])
+
+def test_rolling_skew_recovers_after_long_nan_run(panel):
+    # documented deviation: pandas stays NaN after a NaN run >= window; the kernel resumes
+    got = K.rolling_skew(panel[:, 1], W)
+    assert pd.Series(panel[:, 1]).rolling(W).skew().iloc[130:].isna().all()
+    after = pd.Series(panel[130:, 1]).rolling(W).skew().to_numpy()
+    np.testing.assert_allclose(got[130:], after, rtol=1e-10, atol=1e-10)
+    assert np.isfinite(got[149:]).all()
@@ -0,0 +1,23 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.backtest.metrics import INFER_BARS, PERIODS_PER_YEAR, periods_per_year
+
+@pytest.mark.parametrize("freq,expected", [("daily", 252), ("B", 252), ("ME", 12), ("ms", 12), ("min", 98280),
+                                           ("5min", 19656), ("1h", 1638), ("W", 52), (None, 252), (12, 12)])
+def test_periods_per_year_names(freq, expected):
+    assert np.isclose(periods_per_year(freq), expected)
+
+@pytest.mark.parametrize("freq", ["m", "M", "5m", " 15M "])
+def test_bare_m_is_ambiguous(freq):
+    with pytest.raises(ValueError, match="ambiguous"):
+        periods_per_year(freq)
+
+@pytest.mark.parametrize("freq,expected", [("B", 252), ("W-FRI", 52), ("ME", 12), ("5min", 19656)])
+def test_infer_from_index(freq, expected):
+    assert np.isclose(periods_per_year("infer", pd.date_range("2020-01-01", periods=500, freq=freq)), expected)
+
+def test_infer_reads_leading_bars_only():
+    minutes = pd.date_range("2020-01-02 09:30", periods=INFER_BARS, freq="min")
+    days = pd.date_range("2021-01-01", periods=3 * INFER_BARS, freq="B")
+    assert periods_per_year("infer", minutes.append(days)) == PERIODS_PER_YEAR["minute"]
+    with pytest.raises(ValueError):
+        periods_per_year("infer", pd.RangeIndex(10))
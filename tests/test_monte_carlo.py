@@ -0,0 +1,44 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.backtest import metrics as M
+from strategy_backtester.portfolio.monte_carlo import bootstrap_metrics, _SEED_BLOCK
+from strategy_backtester.research.bootstrap import stationary_bootstrap_indices
+
+def _returns(T=500, seed=0):
+    return pd.Series(np.random.default_rng(seed).normal(3e-4, 0.01, T), index=pd.date_range("2020-01-01", periods=T, freq="B"))
+
+def _stationary_loop(starts, new, n):
+    out = np.empty_like(starts)
+    for s in range(starts.shape[0]):
+        for t in range(starts.shape[1]):
+            cur = starts[s, t] if t == 0 or new[s, t] else (cur + 1) % n
+            out[s, t] = cur
+    return out
+
+def test_stationary_indices_match_block_loop():
+    n, size, n_sims, p = 37, 120, 5, 0.15
+    rng = np.random.default_rng(7)
+    starts, new = rng.integers(0, n, size=(n_sims, size)), rng.random((n_sims, size)) < p
+    got = stationary_bootstrap_indices(n, size, p, n_sims, np.random.default_rng(7))
+    np.testing.assert_array_equal(got, _stationary_loop(starts, new, n))
+
+@pytest.mark.parametrize("method", ["iid", "stationary"])
+def test_chunked_equals_unchunked_for_a_fixed_seed(method):
+    r, n_sims = _returns(), 3 * _SEED_BLOCK + 5
+    whole = bootstrap_metrics(r, n_sims=n_sims, seed=3, method=method)
+    tiny = bootstrap_metrics(r, n_sims=n_sims, seed=3, method=method, mem_budget_mb=0.001)  # one seed block per chunk
+    pooled = bootstrap_metrics(r, n_sims=n_sims, seed=3, method=method, mem_budget_mb=2, max_workers=2)
+    assert whole.shape == (n_sims, 4)
+    pd.testing.assert_frame_equal(tiny, whole)
+    pd.testing.assert_frame_equal(pooled, whole)
+    assert not bootstrap_metrics(r, n_sims=n_sims, seed=4, method=method).equals(whole)
+
+def test_path_metrics_match_scalar_metrics():
+    r, length = _returns(), 250
+    got = bootstrap_metrics(r, n_sims=3, length=length, seed=11)
+    idx = np.random.default_rng(np.random.SeedSequence(11).spawn(1)[0]).integers(0, len(r), size=(3, length))
+    for i, row in got.iterrows():
+        path = pd.Series(r.to_numpy()[idx[i]])
+        assert row["CAGR"] == pytest.approx(M.annualized_return(path))
+        assert row["Vol"] == pytest.approx(M.annualized_vol(path))
+        assert row["Sharpe"] == pytest.approx(M.sharpe(path))
+        assert row["MaxDD"] == pytest.approx(M.max_drawdown(path))
@@ -0,0 +1,41 @@
+import numpy as np, pandas as pd, pytest
+from multiprocessing import shared_memory
+from strategy_backtester.backtest.engine import BacktestEngine
+from strategy_backtester.backtest.parallel import SharedPanel, run_universe
+from strategy_backtester.strategies import ma_crossover, momentum
+
+def _prices(T=300, N=4, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (T, N)), axis=0)),
+                        index=pd.date_range("2020-01-01", periods=T, freq="B"), columns=[f"S{i}" for i in range(N)])
+
+def test_shared_panel_round_trip_and_unlink():
+    px = _prices()
+    with SharedPanel(px) as panel:
+        shm = shared_memory.SharedMemory(name=panel.name)
+        try:
+            np.testing.assert_array_equal(np.ndarray(panel.shape, dtype=np.float64, buffer=shm.buf), px.to_numpy())
+        finally:
+            shm.close()
+        assert panel.columns == list(px.columns) and panel.index.equals(px.index)
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=panel.name)
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_run_universe_matches_engine_runs(max_workers):
+    px = _prices()
+    px.iloc[40:45, 2] = np.nan
+    eng = BacktestEngine(target_ann_vol=0.1, vol_window=20)
+    strategies = {"ma": ma_crossover.signals, "mom": momentum.signals}
+    params = [{"short": 10, "long": 40, "lookback": 20}, {"short": 5, "long": 30, "lookback": 60}]
+    out = run_universe(eng, px, strategies, params, max_workers=max_workers)
+    assert len(out.per_symbol) == 2 * 2 * px.shape[1] and len(out.portfolio) == 4
+    for sname, fn in strategies.items():
+        for p in params:
+            key = tuple(sorted(p.items()))
+            for sym in px.columns:
+                ref = eng.run_single(px[sym], fn, **p)
+                np.testing.assert_allclose(out.per_symbol[(sym, sname, key)].returns, ref.returns, atol=1e-15)
+            ref = eng.run_multi_equal_weight(px, {c: fn for c in px.columns}, **p)
+            np.testing.assert_allclose(out.portfolio[(sname, key)].returns, ref.returns, atol=1e-15)
+    assert len(out.summary()) == 4 and len(out.summary("symbol")) == 16
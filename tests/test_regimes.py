@@ -0,0 +1,51 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.research.regime import RegimeModel, regime_features
+
+def _rets(T=400, N=3, seed=0):
+    rng = np.random.default_rng(seed)
+    vol = np.where((np.arange(T) // 80) % 2, 0.03, 0.008)[:, None]  # alternating calm / stressed blocks
+    return pd.DataFrame(rng.normal(0, 1, (T, N)) * vol, index=pd.date_range("2020-01-01", periods=T, freq="B"),
+                        columns=[f"S{i}" for i in range(N)])
+
+def test_fit_orders_labels_by_volatility():
+    m = RegimeModel(k=3, feat_window=15).fit(_rets())
+    vol = m.centers_[:, 0] * m.scale_[0] + m.mean_[0]
+    assert (np.diff(vol) > 0).all() and m.counts_.sum() == len(m._rows(_rets()))
+
+def test_stream_labels_equal_predict():
+    rets = _rets()
+    rets.iloc[100:103, 1] = np.nan
+    m = RegimeModel(k=3, feat_window=15).fit(rets)
+    ref = m.predict(rets)
+    online = m.stream(n_assets=rets.shape[1])
+    feats = regime_features(rets, 15)
+    for t, row in enumerate(rets.to_numpy()):
+        np.testing.assert_array_equal(online.update(row), ref.iloc[t].to_numpy())
+        np.testing.assert_allclose(online.features(), feats[t], atol=1e-12)
+    assert (ref.iloc[:14] == -1).all().all() and (ref.iloc[14:] >= 0).all().all()
+    warm = m.stream(rets.shape[1]).warm(rets.iloc[:250])
+    np.testing.assert_array_equal(warm, ref.iloc[249].to_numpy())
+
+def test_save_load_round_trip(tmp_path):
+    rets = _rets()
+    m = RegimeModel(k=2, feat_window=10, seed=3).fit(rets)
+    m.save(tmp_path / "regimes.npz")
+    back = RegimeModel.load(tmp_path / "regimes.npz")
+    assert (back.k, back.feat_window, back.seed) == (2, 10, 3)
+    pd.testing.assert_frame_equal(back.predict(rets), m.predict(rets))
+    pd.testing.assert_series_equal(back.predict(rets["S0"]), m.predict(rets["S0"]))
+    with pytest.raises(RuntimeError): RegimeModel().predict(rets)
+
+def test_partial_fit_moves_centroids_to_running_means():
+    rets = _rets(seed=1)
+    m = RegimeModel(k=3, feat_window=15).fit(rets.iloc[:200])
+    centers, counts = m.centers_.copy(), m.counts_.copy()
+    new = rets.iloc[200:]
+    Z = (m._rows(new) - m.mean_) / m.scale_
+    lab = ((Z[:, None, :] - centers) ** 2).sum(axis=-1).argmin(axis=1)  # assigned with the pre-update centroids
+    m.partial_fit(new)
+    for j in range(3):
+        rows = Z[lab == j]
+        ref = centers[j] if len(rows) == 0 else (centers[j] * counts[j] + rows.sum(axis=0)) / (counts[j] + len(rows))
+        np.testing.assert_allclose(m.centers_[j], ref, atol=1e-12)
+        assert m.counts_[j] == counts[j] + len(rows)
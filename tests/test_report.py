@@ -0,0 +1,51 @@
+import re
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.backtest import metrics as M
+from strategy_backtester.utils.report import decimate_minmax, write_html_report, write_html_reports
+
+def _returns(T=3000, seed=0):
+    return pd.Series(np.random.default_rng(seed).normal(2e-4, 0.01, T), index=pd.date_range("2000-01-01", periods=T, freq="B"))
+
+def _decimate_loop(s, max_points):
+    b = -(-len(s) // (max_points // 2))
+    keep = {0, len(s) - 1}
+    for lo in range(0, len(s), b):
+        chunk = s.iloc[lo:lo + b]
+        if chunk.notna().any():
+            keep |= {lo + int(np.nanargmin(chunk.to_numpy())), lo + int(np.nanargmax(chunk.to_numpy()))}
+    return s.iloc[sorted(keep)]
+
+@pytest.mark.parametrize("n,max_points", [(3000, 200), (2999, 2000), (1001, 10), (50, 100)])
+def test_decimate_minmax_matches_bucket_loop(n, max_points):
+    s = M.equity_curve(_returns(n))
+    s.iloc[n // 3:n // 3 + 7] = np.nan
+    got = decimate_minmax(s, max_points)
+    if n <= max_points:
+        assert got is s
+        return
+    pd.testing.assert_series_equal(got, _decimate_loop(s, max_points))
+    assert len(got) <= max_points + 2 and got.max() == s.max() and got.min() == s.min()
+
+def _strip_timestamp(html):
+    return re.sub(r"Generated: [^<]*", "", html)
+
+def test_write_html_reports_pool_matches_in_process(tmp_path):
+    rets = {f"S{i}": _returns(800, seed=i) for i in range(3)}
+    jobs = lambda d: [{"returns": r, "title": s, "out_path": str(tmp_path / d / f"{s}.html"), "params": {"lookback": 20}}
+                      for s, r in rets.items()]
+    for d in ("serial", "pool"): (tmp_path / d).mkdir()
+    serial = write_html_reports(jobs("serial"), max_workers=1)
+    pooled = write_html_reports(jobs("pool"), max_workers=2, chunksize=1)
+    assert pooled == [j["out_path"] for j in jobs("pool")]
+    for a, b in zip(serial, pooled):
+        assert _strip_timestamp(open(a).read()) == _strip_timestamp(open(b).read())
+    html = open(serial[0]).read()
+    assert f"{M.sharpe(rets['S0']):.4f}" in html and "<td>lookback</td><td>20</td>" in html
+    assert html.count("data:image/png;base64,") == 3
+
+def test_write_html_report_reuses_derived_series(tmp_path):
+    r = _returns(600)
+    d = M.derived_series(r, 126)
+    a = write_html_report(r, "x", str(tmp_path / "a.html"))
+    b = write_html_report(r, "x", str(tmp_path / "b.html"), derived=d)
+    assert _strip_timestamp(open(a).read()) == _strip_timestamp(open(b).read())
@@ -0,0 +1,40 @@
+import numpy as np, pytest
+from strategy_backtester.portfolio import risk_models as rm
+
+def _covs(D=6, N=12, seed=0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for _ in range(D):
+        X = rng.normal(size=(200, N)) @ rng.normal(size=(N, N)) * 0.01
+        out.append(np.cov(X, rowvar=False))
+    return np.stack(out)
+
+@pytest.mark.parametrize("method", ["single", "ward"])
+def test_hrp_batch_matches_per_date(method):
+    covs = _covs()
+    W = rm.hrp_batch(covs, method=method, max_bytes=1)  # one date per bisection batch
+    ref = np.stack([rm.hrp_from_cov(c, method=method) for c in covs])
+    np.testing.assert_allclose(W, ref, rtol=1e-12)
+    np.testing.assert_allclose(rm.hrp_batch(covs, method=method), ref, rtol=1e-12)
+    assert np.allclose(W.sum(axis=1), 1) and (W > 0).all()
+
+def test_hrp_batch_reuses_linkage(monkeypatch):
+    base = _covs(D=3)
+    covs = np.repeat(base, 4, axis=0)  # each covariance held for 4 rebalance dates
+    calls = []
+    order = rm.hrp_order
+    monkeypatch.setattr(rm, "hrp_order", lambda *a, **k: calls.append(1) or order(*a, **k))
+    W = rm.hrp_batch(covs)
+    assert len(calls) == 3
+    np.testing.assert_allclose(W, np.repeat([rm.hrp_from_cov(c) for c in base], 4, axis=0), rtol=1e-12)
+    calls.clear()
+    fixed = [np.arange(12)] * len(covs)
+    W = rm.hrp_batch(covs, orders=fixed)
+    assert not calls
+    np.testing.assert_allclose(W[0], rm.hrp_from_cov(base[0], order=fixed[0]), rtol=1e-12)
+
+def test_hrp_batch_precomputed_dist():
+    covs = _covs(D=2)
+    dists = [rm.correlation_distance(rm._corr_from_cov(c)) for c in covs]
+    np.testing.assert_allclose(rm.hrp_batch(covs, dists=dists), rm.hrp_batch(covs), rtol=1e-12)
+    assert rm.hrp_batch(np.empty((0, 3, 3))).shape == (0, 3)
@@ -0,0 +1,41 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.portfolio.rolling import RollingOptimizer, _erc
+
+def _cov(N, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(400, N)) @ (np.eye(N) + 0.3 * rng.normal(size=(N, N)) / np.sqrt(N)) + rng.normal(size=(400, 1))
+    return np.cov(X * 0.01, rowvar=False)
+
+def _erc_cd(Sigma, tol=1e-13, max_iter=10_000):
+    # reference: cyclical coordinate descent, one closed-form positive root per name
+    N, d = len(Sigma), np.diag(Sigma)
+    y = 1.0 / np.sqrt(d)
+    for _ in range(max_iter):
+        y_old = y.copy()
+        for i in range(N):
+            c = Sigma[i] @ y - d[i] * y[i]
+            y[i] = (-c + np.sqrt(c * c + 4 * d[i] / N)) / (2 * d[i])
+        if np.abs(y - y_old).max() <= tol * y.max(): break
+    return y / y.sum()
+
+@pytest.mark.parametrize("N", [2, 7, 60])
+def test_erc_equalizes_risk_contributions(N):
+    S = _cov(N)
+    w, it = _erc(S, None, 1e-12)
+    rc = w * (S @ w)
+    assert (w > 0).all() and np.isclose(w.sum(), 1) and it < 20
+    np.testing.assert_allclose(rc, rc.mean(), rtol=1e-9)
+    np.testing.assert_allclose(w, _erc_cd(S), rtol=1e-8)
+    _, warm = _erc(S * 1.05, w, 1e-12)  # warm start from a nearby solution
+    assert warm <= it
+
+def test_rolling_risk_parity_rows_are_erc():
+    rng = np.random.default_rng(3)
+    idx = pd.date_range("2020-01-01", periods=400, freq="B")
+    rets = pd.DataFrame(rng.normal(0, 0.01, (400, 5)) * [1, 2, 3, 1, 0.5], index=idx)
+    opt = RollingOptimizer(120, "ME", method="risk_parity", shrinkage=None)
+    W = opt.run(rets)
+    for d in opt.info.index:
+        p = idx.get_loc(d)
+        S = rets.iloc[p - 119:p + 1].cov().to_numpy()
+        np.testing.assert_allclose(W.loc[d].to_numpy(), _erc_cd(S), rtol=1e-7)
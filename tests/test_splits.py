@@ -0,0 +1,76 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.research.splits import cpcv_paths, cpcv_ranges, purged_kfold, walk_forward_splits
+
+def _walk_forward_ref(idx, train_years=3, test_months=6, step_months=6, embargo_days=5):
+    # the boolean-mask splitter the range version replaced
+    start, end = idx.min(), idx.max()
+    cur_end = start + pd.DateOffset(years=train_years)
+    while cur_end + pd.DateOffset(months=test_months) <= end:
+        train = idx[(idx >= start) & (idx < cur_end)]
+        test_start = cur_end + pd.Timedelta(days=embargo_days)
+        test = idx[(idx >= test_start) & (idx < test_start + pd.DateOffset(months=test_months))]
+        if len(test) > 0: yield train, test
+        cur_end = cur_end + pd.DateOffset(months=step_months)
+
+def _purged_kfold_ref(idx, n_splits=5, embargo_days=5):
+    n, out, cur = len(idx), [], 0
+    sizes = np.full(n_splits, n // n_splits, dtype=int)
+    sizes[: n % n_splits] += 1
+    for fs in sizes:
+        lo, hi = cur, cur + fs
+        cur = hi
+        test = idx[lo:hi]
+        emb = pd.Timedelta(days=embargo_days)
+        train = idx[(idx < test.min() - emb) | (idx > test.max() + emb)]
+        out.append((train.intersection(idx[:lo].append(idx[hi:])), test))
+    return out
+
+INDEXES = {
+    "business": pd.date_range("2010-01-01", "2017-06-30", freq="B"),
+    "gappy": pd.date_range("2010-01-01", "2017-06-30", freq="D")[np.random.default_rng(0).random(2738) < 0.6],
+}
+
+@pytest.mark.parametrize("name", list(INDEXES))
+@pytest.mark.parametrize("kw", [{}, dict(train_years=2, test_months=3, step_months=1, embargo_days=0),
+                                dict(train_years=1, test_months=12, step_months=7, embargo_days=31)])
+def test_walk_forward_matches_baseline(name, kw):
+    idx = INDEXES[name]
+    got, ref = list(walk_forward_splits(idx, **kw)), list(_walk_forward_ref(idx, **kw))
+    assert len(got) == len(ref) > 0
+    for (tr, te), (tr0, te0) in zip(got, ref):
+        assert tr.equals(tr0) and te.equals(te0)
+
+@pytest.mark.parametrize("name", list(INDEXES))
+@pytest.mark.parametrize("n_splits,embargo_days", [(5, 5), (7, 0), (3, 40)])
+def test_purged_kfold_matches_baseline(name, n_splits, embargo_days):
+    idx = INDEXES[name]
+    for (tr, te), (tr0, te0) in zip(purged_kfold(idx, n_splits, embargo_days), _purged_kfold_ref(idx, n_splits, embargo_days), strict=True):
+        assert tr.equals(tr0) and te.equals(te0)
+
+@pytest.mark.parametrize("horizon_days,embargo_days", [(0, 0), (0, 5), (10, 5), (21, 0)])
+def test_cpcv_purges_label_horizon_and_embargo(horizon_days, embargo_days):
+    idx = INDEXES["gappy"][:900]
+    h, emb = pd.Timedelta(days=horizon_days), pd.Timedelta(days=embargo_days)
+    splits = cpcv_ranges(idx, n_groups=6, n_test_groups=2, horizon_days=horizon_days, embargo_days=embargo_days)
+    groups = np.array_split(np.arange(len(idx)), 6)
+    assert len(splits) == 15
+    for s in splits:
+        tr, te = s.train_positions(), s.test_positions()
+        test_groups = [g for g in groups if np.isin(g, te).all()]
+        assert len(test_groups) == 2 and np.array_equal(te, np.concatenate(test_groups))
+        # brute force: keep t unless its label [t, t + h] reaches a test group, or t falls in the
+        # embargo after the group's last label
+        t = idx.to_numpy()
+        drop = np.zeros(len(idx), dtype=bool)
+        for g in test_groups:
+            drop |= (t >= t[g[0]] - h) & (t <= t[g[-1]] + h + emb)
+        assert np.array_equal(tr, np.flatnonzero(~drop))
+        assert not np.isin(tr, te).any()
+
+def test_cpcv_paths_cover_every_group_once():
+    paths = cpcv_paths(6, 2)
+    splits = cpcv_ranges(pd.date_range("2020-01-01", periods=120, freq="B"), 6, 2)
+    assert len(paths) == 5 and len({p for path in paths for p in path}) == 30
+    for path in paths:
+        assert [g for _, g in path] == list(range(6))
+        assert all(np.isin(np.arange(20 * g, 20 * g + 20), splits[s].test_positions()).all() for s, g in path)
@@ -0,0 +1,28 @@
+import json, subprocess, sys, time
+import numpy as np, pandas as pd
+
+HEAVY = ("matplotlib", "scipy", "sklearn", "optuna")
+COLD_START_BUDGET_S = 3.0  # interpreter + pandas import dominate (~0.5s locally); generous for CI runners
+
+def _loaded_heavy(code: str):
+    out = subprocess.run([sys.executable, "-c", code + f"; print(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))"],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1]), out.stdout
+
+def test_cli_import_skips_heavy_deps():
+    heavy, _ = _loaded_heavy("import sys, json, strategy_backtester.cli")
+    assert heavy == []
+
+def test_no_plot_cold_start(tmp_path):
+    from strategy_backtester.data.store import PriceStore
+    idx = pd.bdate_range("2018-01-01", periods=750)
+    px = pd.DataFrame({"AAA": 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, len(idx))))}, index=idx)
+    store = tmp_path / "store"
+    PriceStore(store).write({"adj_close": px})
+    argv = ["sbe", "--symbols", "AAA", "--strategy", "momentum", "--no_plot", "--store", str(store)]
+    t0 = time.perf_counter()
+    heavy, stdout = _loaded_heavy(f"import sys, json; from strategy_backtester.cli import main; sys.argv = {argv!r}; main()")
+    elapsed = time.perf_counter() - t0
+    assert "Sharpe" in stdout
+    assert heavy == []
+    assert elapsed < COLD_START_BUDGET_S, f"--no_plot cold start took {elapsed:.2f}s"
@@ -0,0 +1,74 @@
+import numpy as np, pandas as pd, pytest
+from strategy_backtester.data.store import PriceStore
+
+def _panel(T=50, N=3, seed=0, start="2020-01-01"):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=T, freq="B").as_unit("ns")  # the store reads back ns dates
+    return pd.DataFrame(100 + rng.normal(size=(T, N)).cumsum(axis=0), index=idx, columns=[f"S{i}" for i in range(N)])
+
+def _on_memmap(df):
+    a = df.to_numpy()
+    while a is not None and not isinstance(a, np.memmap): a = a.base
+    return a is not None
+
+def test_write_load_round_trip_on_memmap(tmp_path):
+    px = _panel()
+    px.iloc[5, 1] = np.nan
+    store = PriceStore(tmp_path)
+    store.write({"adj_close": px, "volume": px * 10})
+    assert isinstance(store.array("volume"), np.memmap) and store.fields == ["adj_close", "volume"]
+    pd.testing.assert_frame_equal(store.load(), px, check_freq=False)
+    got = store.load(start=px.index[10], end=px.index[20])
+    pd.testing.assert_frame_equal(got, px.iloc[10:21], check_freq=False)
+    assert _on_memmap(got) and not _on_memmap(store.load(symbols=["S1"]))  # date slices stay views of the file
+    pd.testing.assert_frame_equal(store.load(symbols=["S2", "S0"]), px[["S2", "S0"]], check_freq=False)
+    with pytest.raises(KeyError): store.load(symbols=["XX"])
+    with pytest.raises(KeyError): store.array("close")
+
+def test_append_equals_one_write(tmp_path):
+    px = _panel(T=80)
+    full, parts = PriceStore(tmp_path / "full"), PriceStore(tmp_path / "parts")
+    full.write({"adj_close": px})
+    parts.write({"adj_close": px.iloc[:30]})
+    assert parts.append({"adj_close": px.iloc[20:60]}) == 30  # only dates after the last stored one
+    assert parts.append({"adj_close": px.iloc[:60]}) == 0
+    assert PriceStore(tmp_path / "parts").append({"adj_close": px.iloc[60:]}) == 20
+    parts = PriceStore(tmp_path / "parts")
+    pd.testing.assert_frame_equal(parts.load(), full.load())
+    assert (tmp_path / "parts" / "adj_close.f64").stat().st_size == px.size * 8
+
+def test_append_new_symbol_rewrites_and_keeps_stored_values(tmp_path):
+    px = _panel(T=40)
+    store = PriceStore(tmp_path)
+    store.write({"adj_close": px[["S0", "S1"]].iloc[:30]})
+    changed = px.copy()
+    changed.iloc[:30, 0] += 1  # stored rows win over incoming history
+    assert store.append({"adj_close": changed}) == 10
+    got = store.load()
+    assert list(got.columns) == ["S0", "S1", "S2"]
+    pd.testing.assert_frame_equal(got.iloc[:30, :2], px.iloc[:30, :2], check_freq=False)
+    pd.testing.assert_frame_equal(got.iloc[30:, :1], changed.iloc[30:, :1], check_freq=False)
+    pd.testing.assert_series_equal(got["S2"], px["S2"], check_freq=False)
+
+def test_interrupted_writes_leave_committed_rows(tmp_path):
+    px = _panel(T=60)
+    store = PriceStore(tmp_path)
+    store.write({"adj_close": px.iloc[:40]})
+    with open(tmp_path / "adj_close.f64", "ab") as f: f.write(b"\xff" * 100)  # crashed append before meta
+    (tmp_path / "meta.json.tmp").write_text("{partial")                        # crashed meta write
+    fresh = PriceStore(tmp_path)
+    assert len(fresh) == 40
+    pd.testing.assert_frame_equal(fresh.load(), px.iloc[:40], check_freq=False)
+    assert fresh.append({"adj_close": px}) == 20
+    pd.testing.assert_frame_equal(PriceStore(tmp_path).load(), px, check_freq=False)
+
+def test_ingest_raw_csv(tmp_path):
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    px = _panel(T=20, N=2)
+    for i, s in enumerate(["aaa", "bbb"]):
+        pd.DataFrame({"Adj Close": px.iloc[:, i], "Volume": 1000.0 + i}).rename_axis("date").to_csv(raw / f"{s}_daily.csv")
+    store = PriceStore(tmp_path / "store")
+    assert store.ingest_raw(raw) == 20 and store.symbols == ["AAA", "BBB"]
+    np.testing.assert_allclose(store.load().to_numpy(), px.to_numpy())
+    assert (store.load("volume").to_numpy() == [[1000.0, 1001.0]]).all()
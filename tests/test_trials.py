@@ -0,0 +1,89 @@
+import numpy as np, pandas as pd, pytest
+from scipy.stats import kurtosis, skew
+from strategy_backtester.research.sharpe import probabilistic_sharpe, sharpe_ci
+from strategy_backtester.research import trials as TR
+from strategy_backtester.research.trials import TrialRegistry, leader_clusters
+
+def _streams(T=500, k=50, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(rng.standard_t(5, (T, k)) * 0.01 + 0.0003, index=pd.date_range("2020-01-01", periods=T, freq="B"))
+
+def test_stats_match_per_series_formulas():
+    R = _streams(k=6)
+    R.iloc[:40, 2] = np.nan  # missing dates are dropped, as in research.sharpe
+    reg = TrialRegistry(dtype=np.float64)
+    reg.add_matrix(R, params=[{"i": i} for i in range(6)])
+    st = reg.stats(sr_bench=0.01, alpha=0.1)
+    for j in range(6):
+        r = R.iloc[:, j]
+        p, sr = probabilistic_sharpe(r, sr_bench=0.01)
+        (lo, hi), _ = sharpe_ci(r, alpha=0.1)
+        row = st.iloc[j]
+        assert row["i"] == j and row["n"] == r.count()
+        np.testing.assert_allclose([row["sr"], row["psr"], row["ci_lo"], row["ci_hi"]], [sr, p, lo, hi], rtol=1e-10)
+        np.testing.assert_allclose([row["skew"], row["kurt"]], [skew(r.dropna(), bias=False), kurtosis(r.dropna(), bias=False)], rtol=1e-10)
+
+def test_add_aligns_to_registry_dates():
+    R = _streams(T=50, k=2)
+    reg = TrialRegistry(R.index)
+    reg.add_matrix(R.iloc[:, :1])
+    t = reg.add(R.iloc[10:30, 1], a=1)  # shorter Series: NaN outside its dates
+    M = reg.matrix
+    assert t == 1 and reg.params[1] == {"a": 1} and reg.moments()["n"].tolist() == [50, 20]
+    assert np.isnan(M[:10, 1]).all() and np.isnan(M[30:, 1]).all()
+    np.testing.assert_allclose(M[10:30, 1], R.iloc[10:30, 1], rtol=1e-6)
+
+def test_effective_trials_counts_duplicate_streams_once():
+    base = _streams(k=5).to_numpy()
+    rng = np.random.default_rng(1)
+    copies = np.repeat(base, 4, axis=1) + rng.normal(0, 0.001, (len(base), 20))  # 4 near-copies of each
+    reg = TrialRegistry()
+    reg.add_matrix(copies)
+    reg.add_matrix(np.zeros((len(base), 1)))  # flat stream: not counted
+    n_eff, labels = reg.effective_trials()
+    assert n_eff == 5 and labels[-1] == -1
+    assert all(len(set(labels[4 * i:4 * i + 4])) == 1 for i in range(5))
+
+def test_deflated_sharpe_agrees_with_stats():
+    reg = TrialRegistry()
+    reg.add_matrix(_streams(k=50, seed=3))
+    st = reg.stats()
+    best = int(st["sr"].idxmax())
+    assert st.attrs["n_trials"] == 50
+    assert st.loc[best, "dsr"] < st.loc[best, "psr"]
+    assert np.isclose(reg.deflated_sharpe(best), st.loc[best, "dsr"])
+
+def _leaders_loop(Z, order, threshold):
+    # one trial at a time against every leader so far
+    labels, leaders = np.full(Z.shape[1], -1), []
+    for j in order:
+        hits = [i for i, l in enumerate(leaders) if Z[:, l] @ Z[:, j] >= threshold]
+        if hits: labels[j] = hits[0]
+        else: labels[j] = len(leaders); leaders.append(j)
+    return labels
+
+@pytest.mark.parametrize("block,dtype", [(1, np.float64), (7, np.float64), (64, np.float32), (1024, np.float64)])
+def test_leader_clusters_match_sequential_rule(block, dtype):
+    rng = np.random.default_rng(4)
+    base = rng.normal(size=(300, 12))
+    X = np.repeat(base, 5, axis=1) + rng.normal(0, 0.7, (300, 60))
+    mean, sd = X.mean(axis=0), X.std(axis=0)
+    order = rng.permutation(60)
+    ref = _leaders_loop((X - mean) / (sd * np.sqrt(300)), order, 0.5)
+    assert (leader_clusters(X, mean, sd * np.sqrt(300), order, 0.5, block, dtype) == ref).all()
+
+def test_clustering_is_cached_until_new_trials(monkeypatch):
+    calls = []
+    fn = TR.leader_clusters
+    monkeypatch.setattr(TR, "leader_clusters", lambda *a, **k: calls.append(1) or fn(*a, **k))
+    reg = TrialRegistry()
+    reg.add_matrix(_streams(k=30, seed=5))
+    st = reg.stats()
+    dsr = [reg.deflated_sharpe(i) for i in range(30)]
+    assert len(calls) == 1 and np.allclose(dsr, st["dsr"])
+    reg.effective_trials()[1][:] = 99  # callers get a copy of the cached labels
+    assert (reg.stats()["cluster"] < 99).all() and len(calls) == 1
+    reg.stats(threshold=0.5)
+    assert len(calls) == 2
+    reg.add_matrix(_streams(k=5, seed=6))
+    assert reg.stats().attrs["n_trials"] == 35 and len(calls) == 3
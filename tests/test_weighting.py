@@ -0,0 +1,39 @@
+import numpy as np, pandas as pd, pytest
+import scipy.sparse as sp
+from strategy_backtester.indicators.kernels import rolling_std
+from strategy_backtester.portfolio import weighting as WT
+from strategy_backtester.portfolio.rolling import RollingOptimizer
+
+def _inputs(T=400, N=12, seed=0):
+    rng = np.random.default_rng(seed)
+    R = rng.normal(0, 0.01, (T, N)) * rng.uniform(0.5, 3, N)
+    S = np.sign(rng.normal(size=(T, N))) * (rng.random((T, N)) < 0.6)
+    return R, S, pd.date_range("2020-01-01", periods=T, freq="B")
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("sparse", [False, True])
+def test_inverse_vol_blocks_match_full_panel(dtype, sparse):
+    R, S, _ = _inputs()
+    inv = 1.0 / rolling_std(R, 63)
+    inv[~np.isfinite(inv)] = 0
+    ref = S * inv
+    ref /= np.where(np.abs(ref).sum(axis=1) > 0, np.abs(ref).sum(axis=1), 1)[:, None]
+    S0 = sp.csr_matrix(S, dtype=dtype) if sparse else S.astype(dtype)
+    W = WT.inverse_vol(S0, R.astype(dtype), window=63, block=50)
+    assert W is S0 and W.dtype == dtype
+    np.testing.assert_allclose(W.toarray() if sparse else W, ref, rtol=1e-5 if dtype == np.float32 else 1e-10, atol=1e-7)
+
+def test_risk_parity_is_erc_among_active_names():
+    R, S, idx = _inputs()
+    W = WT.risk_parity(S.copy(), R, window=120, rebalance="ME", index=idx)
+    covs = {p: Sigma for p, Sigma, _, _ in RollingOptimizer(120, "ME").windows(pd.DataFrame(R, index=idx))}
+    pos = np.array(sorted(covs))
+    assert (W[:pos[0]] == 0).all()
+    for t in range(pos[0], len(W)):
+        names = np.flatnonzero(S[t])
+        assert np.array_equal(np.flatnonzero(W[t]), names) and np.array_equal(np.sign(W[t]), S[t])
+        Sigma = covs[pos[pos <= t][-1]][np.ix_(names, names)]
+        w = np.abs(W[t, names])
+        rc = w * (Sigma @ w)
+        np.testing.assert_allclose(rc, rc.mean(), rtol=1e-8)
+        assert np.isclose(w.sum(), 1)